@@ -4,8 +4,12 @@ from .opcode import *
 
 from .optimizer_jmp import OptimizerJmp
 
+from .optimizer_combined import OptimizerCombined
+
 from .instruction_exception import InstructionException
 
+from .machine_code_listener import MachineCodeListener, EmitWord
+
 from .program import *
 
 from .data_instruction import *
@@ -18,6 +22,8 @@ from .instruction_builder import InstructionBuilder
 
 from .instruction import Instruction
 
+from .memory_image import MemoryImage, MemoryImageBuilder
+
 from .formatters.asm_formatter import AsmFormatter
 from .formatters.hex_formatter import HexFormatter
 
@@ -1,10 +1,15 @@
-from typing import Optional
+from typing import Optional, Dict
 from assembler.expression import Context, ExpressionException
 from .instruction_interface import InstructionInterface
-from .machine_code_listener import MachineCodeListener
+from .machine_code_listener import EmitWord
+
+# Character representation of every word value which is not shown as #<value>
+_CHAR_REPR: Dict[int, str] = {val: chr(val) for val in range(32, 127)}
+_CHAR_REPR.update({ord('\n'): '\\n', ord('\r'): '\\r', ord('\t'): '\\t', ord('\0'): '\\0'})
 
 class DataInstruction(InstructionInterface):
     """Used to store a data word in program memory (Von Neumann style)."""
+    __slots__ = ('_value', '_line_num', '_label', '_abs_addr')
 
     def __init__(self, value: int, line_num: int, label: Optional[str]):
         self._value = value
@@ -32,10 +37,10 @@ class DataInstruction(InstructionInterface):
     def label(self) -> Optional[str]:
         return self._label
 
-    def create_machine_code(self, context: Context, machine_code_listener: MachineCodeListener):
+    def create_machine_code(self, context: Context, emit: EmitWord):
         # Data instructions just emit their value directly
         # Mask to 16 bits if the architecture requires it
-        machine_code_listener.add(self._value & 0xFFFF)
+        emit(self._value & 0xFFFF)
 
     @property
     def macro_description(self) -> Optional[str]:
@@ -48,13 +53,7 @@ class DataInstruction(InstructionInterface):
     def _get_char_repr(self) -> str:
         """Helper for __str__ to represent the value as a character if possible."""
         val = self._value & 0xFFFF
-        if 32 <= val <= 126:
-            return chr(val)
-        else:
-            escape_map = {
-                ord('\n'): '\\n', ord('\r'): '\\r', ord('\t'): '\\t', ord('\0'): '\\0'
-            }
-            return escape_map.get(val, f"#{val}")
+        return _CHAR_REPR.get(val) or f"#{val}"
 
     def __str__(self) -> str:
         char_repr = self._get_char_repr()
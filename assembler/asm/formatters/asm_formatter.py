@@ -6,6 +6,17 @@ from assembler.asm.instruction_interface import InstructionInterface
 from assembler.asm.instruction_visitor import InstructionVisitor
 from assembler.asm.machine_code_listener import MachineCodeListener
 
+class CodeCollector(MachineCodeListener):
+    """Prints every emitted word as hex into the listing."""
+    __slots__ = ('formatter',)
+
+    def __init__(self, formatter: 'AsmFormatter'):
+        self.formatter = formatter
+
+    def add(self, instr: int):
+        self.formatter._print_hex(instr)
+        self.formatter._print(" ")
+
 class AsmFormatter(InstructionVisitor):
     """Formats a Program into a human-readable assembly listing."""
 
@@ -16,6 +27,7 @@ class AsmFormatter(InstructionVisitor):
         self._column_offset = 0 if include_line_numbers else 6
         self._act_col = 0
         self._addr_to_line_map: Dict[int, int] = {} # Store mapping created during formatting
+        self._emit = CodeCollector(self).add # Reused for every visited instruction
 
     @property
     def addr_to_line_map(self) -> Dict[int, int]:
@@ -76,18 +88,8 @@ class AsmFormatter(InstructionVisitor):
         self._print_hex(addr)
         self._print(": ")
 
-        class CodeCollector(MachineCodeListener):
-            def __init__(self, formatter: 'AsmFormatter'):
-                self.codes = []
-                self.formatter = formatter
-            def add(self, instr: int):
-                self.codes.append(instr)
-                self.formatter._print_hex(instr)
-                self.formatter._print(" ")
-
-        code_collector = CodeCollector(self)
         try:
-            i.create_machine_code(context, code_collector)
+            i.create_machine_code(context, self._emit)
         except ExpressionException as e:
              self._print(f"<CodeGen Error: {e}>") # Show error in listing
 
@@ -115,7 +117,7 @@ class AsmFormatter(InstructionVisitor):
             if ins.constant is not None and opcode.arguments.has_const:
                 try:
                      # Get value directly if possible
-                     const_val = ins.constant.get_value(context)
+                     const_val = ins.get_constant_value(context)
                      self._tab(55)
                      self._print(f"; 0x{const_val & 0xFFFF:x}")
                 except ExpressionException:
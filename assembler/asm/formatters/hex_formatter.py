@@ -1,53 +1,62 @@
 import sys
-from typing import TextIO, Dict, List
+from typing import TextIO, List, Optional
 from assembler.expression import Context, ExpressionException
 from assembler.asm.instruction_interface import InstructionInterface
-from assembler.asm.instruction_visitor import InstructionVisitor
-from assembler.asm.machine_code_listener import MachineCodeListener
+from assembler.asm.memory_image import MemoryImage, MemoryImageBuilder
 
-class HexFormatter(InstructionVisitor):
+# Lookup table of the hex line for every possible 16-bit word, built on first use
+_HEX16: Optional[List[str]] = None
+
+def _hex16_table() -> List[str]:
+    global _HEX16
+    if _HEX16 is None:
+        _HEX16 = [f"{i:x}\n" for i in range(0x10000)]
+    return _HEX16
+
+class HexFormatter(MemoryImageBuilder):
     """Formats the program into Logisim-compatible hex format."""
 
+    _WRITE_CHUNK = 8192 # Words per write() call, bounds the size of the joined string
+
     def __init__(self, out: TextIO = sys.stdout):
+        # Buffer output in a dense image to handle .org gaps
+        super().__init__(MemoryImage())
         self._out = out
-        self._addr = 0
-        self._output_buffer: Dict[int, int] = {} # Buffer output to handle .org gaps
-        self._max_addr = -1
 
     def visit(self, instr: InstructionInterface, context: Context) -> bool:
-        instr_addr = context.instr_addr
-
-        class CodeCollector(MachineCodeListener):
-            def __init__(self, buffer: Dict[int, int], start_addr: int):
-                self.buffer = buffer
-                self.current_addr = start_addr
-                self.max_addr = start_addr -1
-
-            def add(self, code: int):
-                self.buffer[self.current_addr] = code & 0xFFFF # Ensure 16-bit
-                self.max_addr = max(self.max_addr, self.current_addr)
-                self.current_addr += 1
-
-        collector = CodeCollector(self._output_buffer, instr_addr)
         try:
-            instr.create_machine_code(context, collector)
-            self._max_addr = max(self._max_addr, collector.max_addr)
+            return super().visit(instr, context)
         except ExpressionException as e:
              # Re-raise exception to stop processing, include line number
              e.set_line_number(instr.line_number)
              print(f"\nError generating hex: {e}", file=sys.stderr)
              raise e
-        return True
 
     def finalize(self):
         """Writes the buffered output to the stream, filling gaps with 0."""
-        print("v2.0 raw", file=self._out)
-        if not self._output_buffer:
-            return # Empty program
-
-        # Determine the actual highest address used + 1
-        program_size = self._max_addr + 1
-
-        for addr in range(program_size):
-            code = self._output_buffer.get(addr, 0) # Default to 0 for gaps
-            print(f"{code:x}", file=self._out)
+        image = self._image
+        buf = image.words
+        hex16 = _hex16_table()
+        write = self._out.write
+        chunk = HexFormatter._WRITE_CHUNK
+
+        pending = ["v2.0 raw\n"]
+        pending_words = 0
+        pos = 0
+        # Runs cover the written words; everything between them is a .org gap of zeros
+        for start, end in sorted(image.runs):
+            while pos < end:
+                count = min(end - pos, chunk - pending_words)
+                if pos < start:
+                    count = min(count, start - pos)
+                    pending.append("0\n" * count)
+                else:
+                    pending.append("".join([hex16[code] for code in buf[pos:pos + count]]))
+                pos += count
+                pending_words += count
+                if pending_words == chunk:
+                    write("".join(pending))
+                    pending = []
+                    pending_words = 0
+        if pending:
+            write("".join(pending))
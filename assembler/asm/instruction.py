@@ -1,12 +1,16 @@
 from typing import Optional
-from assembler.expression import Expression, Context, ExpressionException, Constant
+from assembler.expression import Expression, Evaluator, Context, ExpressionException, Constant
 from .register import Register
 from .opcode import Opcode, ALUBSel, ImmExtMode
 from .instruction_interface import InstructionInterface
-from .machine_code_listener import MachineCodeListener
+from .machine_code_listener import EmitWord
 
 class Instruction(InstructionInterface):
     """Represents a standard machine instruction."""
+    __slots__ = ('_opcode', '_dest_reg', '_source_reg', '_constant', '_label', '_macro_description',
+                 '_comment', '_line_number', '_abs_addr', '_rd_rs_byte',
+                 '_alu_b_sel', '_imm_ext_mode', '_opcode_hi', '_size',
+                 '_encoder', '_const_eval')
 
     def __init__(self, opcode: Opcode, dest_reg: Register, source_reg: Register, constant: Optional[Expression]):
         self._opcode = opcode
@@ -18,11 +22,46 @@ class Instruction(InstructionInterface):
         self._comment: Optional[str] = None
         self._line_number: int = 0
         self._abs_addr: int = -1
+        self._const_eval: Optional[Evaluator] = None # Compiled constant, built on first evaluation
+        # Registers never change, so the default Rd << 4 | Rs byte is fixed
+        self._rd_rs_byte: int = source_reg.value | (dest_reg.value << 4)
+        self._cache_opcode_layout()
+
+    def _cache_opcode_layout(self):
+        """Caches the opcode-derived encoding details used by size and create_machine_code."""
+        opcode = self._opcode
+        self._alu_b_sel: ALUBSel = opcode.alu_b_sel
+        self._imm_ext_mode: ImmExtMode = opcode.imm_ext_mode
+        self._opcode_hi: int = opcode.value << 8
+        # Instructions using ImReg take two words (opcode word + constant word)
+        self._size: int = 2 if self._alu_b_sel == ALUBSel.ImReg else 1
+        # Encoder for the low byte of the opcode word; None means the default Rd << 4 | Rs
+        self._encoder = _select_encoder(self._alu_b_sel, self._imm_ext_mode)
 
     @property
     def size(self) -> int:
-        # Instructions using ImReg take two words (opcode word + constant word)
-        return 2 if self._opcode.alu_b_sel == ALUBSel.ImReg else 1
+        return self._size
+
+    def clone(self) -> 'Instruction':
+        """Returns a new instruction with the same encoding, but without label, comments and position."""
+        i = Instruction.__new__(Instruction)
+        i._opcode = self._opcode
+        i._dest_reg = self._dest_reg
+        i._source_reg = self._source_reg
+        i._constant = self._constant
+        i._label = None
+        i._macro_description = None
+        i._comment = None
+        i._line_number = 0
+        i._abs_addr = -1
+        i._const_eval = self._const_eval # Same constant, same compiled function
+        i._rd_rs_byte = self._rd_rs_byte
+        i._alu_b_sel = self._alu_b_sel
+        i._imm_ext_mode = self._imm_ext_mode
+        i._opcode_hi = self._opcode_hi
+        i._size = self._size
+        i._encoder = self._encoder
+        return i
 
     def set_line_number(self, line_number: int) -> 'Instruction':
         self._line_number = line_number
@@ -71,6 +110,7 @@ class Instruction(InstructionInterface):
     @opcode.setter
     def opcode(self, value: Opcode):
          self._opcode = value
+         self._cache_opcode_layout()
 
     @property
     def source_reg(self) -> Register:
@@ -84,94 +124,44 @@ class Instruction(InstructionInterface):
     def constant(self) -> Optional[Expression]:
         return self._constant
 
-    def _is_const_invalid(self, value: int, bits: int, signed: bool) -> bool:
+    def get_constant_value(self, context: Context) -> int:
+        """Evaluates the constant in the given context."""
+        evaluate = self._const_eval
+        if evaluate is None:
+            evaluate = self._const_eval = self._constant.compile()
+        return evaluate(context)
+
+    def try_get_constant_value(self, context: Context) -> Optional[int]:
+        """Like get_constant_value, but returns None if the constant cannot be evaluated yet."""
+        return self._constant.try_get_value(context)
+
+    @staticmethod
+    def _is_const_invalid(value: int, bits: int, signed: bool) -> bool:
         """Checks if a constant value fits within the specified bit width."""
+        # Any bit set above the field width means the value does not fit. For signed
+        # values, biasing by 2^(bits-1) maps [-2^(bits-1), 2^(bits-1)) onto [0, 2^bits).
         if signed:
-            min_val = -(1 << (bits - 1))
-            max_val = (1 << (bits - 1)) - 1
-            return not (min_val <= value <= max_val)
-        else:
-            min_val = 0
-            max_val = (1 << bits) - 1
-            return not (min_val <= value <= max_val)
-
-    def create_machine_code(self, context: Context, mc: MachineCodeListener):
+            value += 1 << (bits - 1)
+        return (value & ~((1 << bits) - 1)) != 0
+
+    def create_machine_code(self, context: Context, emit: EmitWord):
         try:
             con = 0
             if self._constant is not None:
-                con = self._constant.get_value(context)
+                con = self.get_constant_value(context)
 
             # Default encoding: opcode | dest << 4 | source
-            mcode = self._source_reg.value | (self._dest_reg.value << 4)
-
-            alu_b_sel = self._opcode.alu_b_sel
-
-            if alu_b_sel == ALUBSel.instrSourceAndDest:
-                # Branch instructions: constant is relative offset
-                # Offset = TargetAddr - CurrentAddr - 1
-                ofs = con - context.instr_addr - 1
-                if self._is_const_invalid(ofs, 8, True): # 8-bit signed offset
-                    raise ExpressionException(f"branch target out of range ({ofs})")
-                mcode = ofs & 0xFF # Use lower 8 bits for offset
-
-            elif alu_b_sel == ALUBSel.instrSource:
-                # Short immediate (dest holds low nibble const): Rd << 4 | const
-                if self._is_const_invalid(con, 4, False): # 4-bit unsigned const
-                    raise ExpressionException(f"short constant too large ({con})")
-                mcode = (con & 0xF) | (self._dest_reg.value << 4)
-
-            elif alu_b_sel == ALUBSel.instrDest:
-                 # Short immediate (source holds low nibble const): const << 4 | Rs
-                if self._is_const_invalid(con, 4, False): # 4-bit unsigned const
-                    raise ExpressionException(f"short constant too large ({con})")
-                mcode = self._source_reg.value | ((con & 0xF) << 4)
-
-            elif alu_b_sel == ALUBSel.ImReg:
-                # Two-word instruction: emit constant first, then opcode word
-                # Constant word format: 1_cccccccccccccc (15 bits value)
-                # Check limits based on ImmExtMode
-                imm_ext = self._opcode.imm_ext_mode
-                const_bit = 0
-
-                if imm_ext == ImmExtMode.extend: # e.g., LDD, STD (signed displacement)
-                    if self._is_const_invalid(con, 15, True):
-                        raise ExpressionException(f"displacement constant too large ({con})")
-                else: # e.g., LDI, ADDI (unsigned or handled differently)
-                     # Check if fits in 16 bits initially, specific checks below
-                     if self._is_const_invalid(con, 16, False): # Allow full 16-bit range for immediate ops initially
-                        # Allow signed 16 bit for now as well
-                        if self._is_const_invalid(con, 16, True):
-                           raise ExpressionException(f"constant out of 16-bit range ({con})")
-
-                # Emit the constant word (lower 15 bits + high bit marker)
-                mc.add((con & 0x7FFF) | 0x8000)
-
-                # Determine the 'constBit' for the opcode word based on the 16th bit (sign for extend?)
-                if (con & 0x8000) != 0:
-                     const_bit = 1
-
-                # Modify opcode word based on ImmExtMode
-                if imm_ext == ImmExtMode.src0: # Constant effectively replaces source reg operand
-                    # Opcode word: Op | Rd << 4 | constBit
-                    mcode = const_bit | (self._dest_reg.value << 4)
-                elif imm_ext == ImmExtMode.dest0: # Constant effectively replaces dest reg operand
-                    # Opcode word: Op | constBit << 4 | Rs
-                    mcode = self._source_reg.value | (const_bit << 4)
-                # else: ImmExtMode.extend uses default mcode (Rd/Rs for addressing)
+            encoder = self._encoder
+            mcode = self._rd_rs_byte if encoder is None else encoder(self, con, context, emit)
 
             # Combine with opcode value (shifted to high byte)
-            # Enum members have implicit 'value' which is their ordinal position
-            mcode |= (self._opcode.value << 8)
-            mc.add(mcode)
+            mcode |= self._opcode_hi
+            emit(mcode)
 
         except ExpressionException as e:
             e.set_line_number(self._line_number)
             raise e
-        except Exception as e:
-             # Wrap other potential errors
-             new_e = ExpressionException(f"Error during machine code generation: {e}")
-             new_e.set_line_number(self._line_number)
-             raise new_e from e
+        # Other errors propagate unchanged; Program.traverse wraps them with the line number
 
 
     def __str__(self) -> str:
@@ -182,22 +172,12 @@ class Instruction(InstructionInterface):
         s = f"{s:<9}" if self._label else " " * 9
 
         s += f"{self._opcode.name:<6} " # Pad opcode name
-        try:
-            # Need MnemonicArguments to format correctly
-            from .mnemonic_arguments import MnemonicArguments
-            args_str = self._opcode.arguments.format(self)
-            s += args_str
-        except Exception: # If formatting fails (e.g., during init)
-            s += "<error formatting args>"
-
-        if self._constant is not None and self._opcode.arguments.has_const:
-             try:
-                  # Try to get value if possible (may fail if context missing)
-                  const_val_str = f" ; 0x{self._constant.get_value(None) & 0xFFFF:x}" \
-                                  if isinstance(self._constant, Constant) else ""
-                  s += f"{const_val_str}"
-             except:
-                  pass # Ignore if value cannot be resolved yet
+        arguments = self._opcode.arguments
+        s += arguments.format(self)
+
+        if self._constant is not None and arguments.has_const and isinstance(self._constant, Constant):
+            # Literal constants get their value as a comment
+            s += f" ; 0x{self._constant.get_value(None) & 0xFFFF:x}"
 
         return s.rstrip() # Remove trailing space if no const comment
 
@@ -208,3 +188,78 @@ class Instruction(InstructionInterface):
                 f"label={self._label}, line={self._line_number})")
 
 
+# --- Encoders for the low byte of the opcode word, selected by ALUBSel ---
+# Each takes (instruction, constant value, context, emit) and returns the low byte.
+
+def _encode_branch(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # Branch instructions: constant is relative offset
+    # Offset = TargetAddr - CurrentAddr - 1
+    ofs = con - context.instr_addr - 1
+    if Instruction._is_const_invalid(ofs, 8, True): # 8-bit signed offset
+        raise ExpressionException(f"branch target out of range ({ofs})")
+    return ofs & 0xFF # Use lower 8 bits for offset
+
+def _encode_short_source(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # Short immediate (dest holds low nibble const): Rd << 4 | const
+    if Instruction._is_const_invalid(con, 4, False): # 4-bit unsigned const
+        raise ExpressionException(f"short constant too large ({con})")
+    return (con & 0xF) | (i._dest_reg.value << 4)
+
+def _encode_short_dest(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # Short immediate (source holds low nibble const): const << 4 | Rs
+    if Instruction._is_const_invalid(con, 4, False): # 4-bit unsigned const
+        raise ExpressionException(f"short constant too large ({con})")
+    return i._source_reg.value | ((con & 0xF) << 4)
+
+def _check_imm16(con: int):
+    # e.g., LDI, ADDI: allow the full unsigned 16-bit range and signed 16 bit as well
+    if Instruction._is_const_invalid(con, 16, False) and Instruction._is_const_invalid(con, 16, True):
+        raise ExpressionException(f"constant out of 16-bit range ({con})")
+
+# Two-word ImReg instructions emit the constant word first, then the opcode word.
+# Constant word format: 1_ccccccccccccccc (lower 15 bits); bit 15 of the constant goes
+# into the opcode word as 'constBit'. The encoders are specialized per ImmExtMode.
+
+def _encode_imreg_src0(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # Constant effectively replaces source reg operand: Op | Rd << 4 | constBit
+    _check_imm16(con)
+    emit((con & 0x7FFF) | 0x8000)
+    return ((con >> 15) & 1) | (i._dest_reg.value << 4)
+
+def _encode_imreg_dest0(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # Constant effectively replaces dest reg operand: Op | constBit << 4 | Rs
+    _check_imm16(con)
+    emit((con & 0x7FFF) | 0x8000)
+    return i._source_reg.value | (((con >> 15) & 1) << 4)
+
+def _encode_imreg_extend(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # e.g., LDD, STD: signed displacement, Rd/Rs keep their default places for addressing
+    if Instruction._is_const_invalid(con, 15, True):
+        raise ExpressionException(f"displacement constant too large ({con})")
+    emit((con & 0x7FFF) | 0x8000)
+    return i._rd_rs_byte
+
+def _encode_imreg_res(i: Instruction, con: int, context: Context, emit: EmitWord) -> int:
+    # Reserved mode: 16-bit constant, Rd/Rs keep their default places
+    _check_imm16(con)
+    emit((con & 0x7FFF) | 0x8000)
+    return i._rd_rs_byte
+
+_ENCODERS = {
+    ALUBSel.instrSourceAndDest: _encode_branch,
+    ALUBSel.instrSource: _encode_short_source,
+    ALUBSel.instrDest: _encode_short_dest,
+}
+
+_IMREG_ENCODERS = {
+    ImmExtMode.src0: _encode_imreg_src0,
+    ImmExtMode.dest0: _encode_imreg_dest0,
+    ImmExtMode.extend: _encode_imreg_extend,
+    ImmExtMode.res: _encode_imreg_res,
+}
+
+def _select_encoder(alu_b_sel: ALUBSel, imm_ext_mode: ImmExtMode):
+    """Returns the encoder specialized for this opcode shape, None for the default Rd << 4 | Rs."""
+    if alu_b_sel == ALUBSel.ImReg:
+        return _IMREG_ENCODERS[imm_ext_mode]
+    return _ENCODERS.get(alu_b_sel)
@@ -1,12 +1,18 @@
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from assembler.expression import Expression, Constant, Neg
 from .register import Register
 from .opcode import Opcode
 from .instruction import Instruction
 from .instruction_exception import InstructionException
 
+# Prototype instructions for operand combinations without a symbolic constant.
+# build() hands out clones, so labels and line numbers are never shared.
+_PROTOTYPES: Dict[Tuple, Instruction] = {}
+_MAX_PROTOTYPES = 4096
+
 class InstructionBuilder:
     """A builder to create an Instruction with validation."""
+    __slots__ = ('_opcode', '_source', '_dest', '_constant')
 
     def __init__(self, opcode: Opcode):
         self._opcode = opcode
@@ -44,7 +50,7 @@ class InstructionBuilder:
     def neg_constant(self) -> 'InstructionBuilder':
         if self._constant is None:
              raise InstructionException(f"Cannot negate non-existent constant for {self._opcode.name}")
-        self._constant = Neg(self._constant)
+        self._constant = Neg.of(self._constant)
         return self
 
     def build(self) -> Instruction:
@@ -60,5 +66,20 @@ class InstructionBuilder:
         dest = self._dest if self._dest is not None else Register.R0
         source = self._source if self._source is not None else Register.R0
 
-        return Instruction(self._opcode, dest, source, self._constant)
+        constant = self._constant
+        if constant is None:
+            key = (self._opcode, dest, source)
+        elif type(constant) is Constant:
+            key = (self._opcode, dest, source, constant.get_value(None), constant.is_char)
+        else:
+            return Instruction(self._opcode, dest, source, constant)
+
+        proto = _PROTOTYPES.get(key)
+        if proto is None:
+            proto = Instruction(self._opcode, dest, source, constant)
+            if len(_PROTOTYPES) < _MAX_PROTOTYPES:
+                _PROTOTYPES[key] = proto
+            else:
+                return proto
+        return proto.clone()
 
@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 from assembler.expression import Context, ExpressionException
-from .machine_code_listener import MachineCodeListener
+from .machine_code_listener import EmitWord
 
 class InstructionInterface(ABC):
     """Interface to access an instruction or data item in the program."""
+    __slots__ = ()
 
     @property
     @abstractmethod
@@ -31,8 +32,8 @@ class InstructionInterface(ABC):
         pass
 
     @abstractmethod
-    def create_machine_code(self, context: Context, machine_code_listener: MachineCodeListener):
-        """Emits the generated code to the given listener."""
+    def create_machine_code(self, context: Context, emit: EmitWord):
+        """Emits the generated code by calling emit once per word."""
         pass
 
     @property
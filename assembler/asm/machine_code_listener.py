@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Protocol, Callable
 
 class MachineCodeListener(Protocol):
     """Protocol for listeners receiving generated machine instructions."""
@@ -6,3 +6,6 @@ class MachineCodeListener(Protocol):
         """Adds an instruction word to the machine program."""
         ...
 
+# Callable receiving each generated word, usually the bound add of a MachineCodeListener
+EmitWord = Callable[[int], None]
+
@@ -0,0 +1,74 @@
+from array import array
+from typing import List, Tuple
+from assembler.expression import Context
+from .instruction_interface import InstructionInterface
+from .instruction_visitor import InstructionVisitor
+from .machine_code_listener import MachineCodeListener
+
+class MemoryImage(MachineCodeListener):
+    """Dense 16-bit program memory image, indexed by address. Unwritten words read as 0."""
+    __slots__ = ('_words', '_addr', '_size', '_runs', '_run_start')
+
+    def __init__(self, capacity: int = 1024):
+        self._words = array('H', bytes(2 * max(capacity, 1)))
+        self._addr = 0
+        self._size = 0
+        self._runs: List[Tuple[int, int]] = [] # Closed runs of consecutively written words
+        self._run_start = 0
+
+    def seek(self, addr: int):
+        """Sets the address the next added word is stored at."""
+        if addr != self._addr:
+            # Not continuing where the last word went: close the current run
+            if self._addr > self._run_start:
+                self._runs.append((self._run_start, self._addr))
+            self._run_start = addr
+        self._addr = addr
+
+    def add(self, instr: int):
+        addr = self._addr
+        words = self._words
+        if addr >= len(words):
+            # Grow geometrically so that addr becomes a valid index
+            cap = len(words)
+            while cap <= addr:
+                cap *= 2
+            words.frombytes(bytes(2 * (cap - len(words))))
+        words[addr] = instr & 0xFFFF # Ensure 16-bit
+        addr += 1
+        if addr > self._size:
+            self._size = addr
+        self._addr = addr
+
+    @property
+    def size(self) -> int:
+        """Returns the highest written address + 1."""
+        return self._size
+
+    @property
+    def runs(self) -> List[Tuple[int, int]]:
+        """Returns the (start, end) address ranges words were written to, in write order."""
+        if self._addr > self._run_start:
+            return self._runs + [(self._run_start, self._addr)]
+        return list(self._runs)
+
+    @property
+    def words(self) -> array:
+        """Returns the words from address 0 up to the highest written address."""
+        return self._words[:self._size]
+
+class MemoryImageBuilder(InstructionVisitor):
+    """Visitor which emits the machine code of every instruction into a MemoryImage."""
+
+    def __init__(self, image: MemoryImage):
+        self._image = image
+        self._emit = image.add
+
+    @property
+    def image(self) -> MemoryImage:
+        return self._image
+
+    def visit(self, instr: InstructionInterface, context: Context) -> bool:
+        self._image.seek(context.instr_addr)
+        instr.create_machine_code(context, self._emit)
+        return True
@@ -1,6 +1,6 @@
 # This requires the Parser class later for the parse method implementation
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Dict
+from typing import TYPE_CHECKING, Dict, List, Callable
 from .instruction import Instruction
 from .instruction_exception import InstructionException
 from assembler.expression import Expression, Constant, Operate, Operation, ExpressionException, Neg
@@ -14,6 +14,7 @@ if TYPE_CHECKING:
 
 class MnemonicArguments(ABC):
     """Describes the arguments an opcode expects."""
+    __slots__ = ('_has_source', '_has_dest', '_has_const')
     def __init__(self, has_source: bool, has_dest: bool, has_const: bool):
         self._has_source = has_source
         self._has_dest = has_dest
@@ -41,44 +42,84 @@ class MnemonicArguments(ABC):
         """String representation for documentation."""
         pass
 
+    def _format_steps(self) -> List[Callable[[Instruction], str]]:
+        """Returns the formatters whose joined results format these arguments."""
+        return [self.format]
+
+    def _parse_steps(self) -> List[Callable[['InstructionBuilder', 'Parser'], None]]:
+        """Returns the parse steps which, run in order, parse these arguments."""
+        return [self.parse]
+
+def _format_literal(char: str) -> Callable[[Instruction], str]:
+    return lambda i: char
+
+def _parse_literal(char: str) -> Callable[['InstructionBuilder', 'Parser'], None]:
+    return lambda ib, p: p.consume(char)
+
+def _run_format_steps(steps: List[Callable[[Instruction], str]], i: Instruction) -> str:
+    return "".join([step(i) for step in steps])
+
+def _run_parse_steps(steps: List[Callable[['InstructionBuilder', 'Parser'], None]], ib: 'InstructionBuilder', p: 'Parser'):
+    for step in steps:
+        step(ib, p)
+
+class _StatelessArguments(MnemonicArguments):
+    """Base for argument kinds without per-instance state; each subclass has a single instance."""
+    __slots__ = ()
+
+    def __new__(cls):
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
 # --- Concrete Implementations ---
 
-class Nothing(MnemonicArguments):
+class Nothing(_StatelessArguments):
+    __slots__ = ()
     def __init__(self): super().__init__(False, False, False)
     def format(self, i: Instruction) -> str: return ""
     def parse(self, ib: 'InstructionBuilder', p: 'Parser'): return # No args
     def __str__(self) -> str: return ""
 
-class Source(MnemonicArguments):
+class Source(_StatelessArguments):
+    __slots__ = ()
     def __init__(self): super().__init__(True, False, False)
     def format(self, i: Instruction) -> str: return i.source_reg.name
     def parse(self, ib: 'InstructionBuilder', p: 'Parser'): ib.set_source(p.parse_reg())
     def __str__(self) -> str: return "Rs"
 
-class Dest(MnemonicArguments):
+class Dest(_StatelessArguments):
+    __slots__ = ()
     def __init__(self): super().__init__(False, True, False)
     def format(self, i: Instruction) -> str: return i.dest_reg.name
     def parse(self, ib: 'InstructionBuilder', p: 'Parser'): ib.set_dest(p.parse_reg())
     def __str__(self) -> str: return "Rd"
 
-class Const(MnemonicArguments):
+class Const(_StatelessArguments):
+    __slots__ = ()
     def __init__(self): super().__init__(False, False, True)
     def format(self, i: Instruction) -> str: return str(i.constant) if i.constant else "[const]"
     def parse(self, ib: 'InstructionBuilder', p: 'Parser'): ib.set_constant(p.parse_expression())
     def __str__(self) -> str: return "[const]"
 
 class Brace(MnemonicArguments):
+    __slots__ = ('inner', '_format_list', '_parse_list')
     def __init__(self, inner: MnemonicArguments):
         super().__init__(inner.has_source, inner.has_dest, inner.has_const)
         self.inner = inner
-    def format(self, i: Instruction) -> str: return f"[{self.inner.format(i)}]"
-    def parse(self, ib: 'InstructionBuilder', p: 'Parser'):
-        p.consume('[')
-        self.inner.parse(ib, p)
-        p.consume(']')
+        # Flatten nested arguments once so format/parse don't recurse
+        self._format_list = [_format_literal('[')] + inner._format_steps() + [_format_literal(']')]
+        self._parse_list = [_parse_literal('[')] + inner._parse_steps() + [_parse_literal(']')]
+    def format(self, i: Instruction) -> str: return _run_format_steps(self._format_list, i)
+    def parse(self, ib: 'InstructionBuilder', p: 'Parser'): _run_parse_steps(self._parse_list, ib, p)
+    def _format_steps(self) -> List[Callable[[Instruction], str]]: return self._format_list
+    def _parse_steps(self) -> List[Callable[['InstructionBuilder', 'Parser'], None]]: return self._parse_list
     def __str__(self) -> str: return f"[{self.inner}]"
 
 class Concat(MnemonicArguments):
+    __slots__ = ('before', 'char', 'after', '_format_list', '_parse_list')
     def __init__(self, before: MnemonicArguments, char: str, after: MnemonicArguments):
         super().__init__(before.has_source or after.has_source,
                          before.has_dest or after.has_dest,
@@ -86,18 +127,22 @@ class Concat(MnemonicArguments):
         self.before = before
         self.char = char
         self.after = after
-    def format(self, i: Instruction) -> str: return f"{self.before.format(i)}{self.char}{self.after.format(i)}"
-    def parse(self, ib: 'InstructionBuilder', p: 'Parser'):
-        self.before.parse(ib, p)
-        p.consume(self.char)
-        self.after.parse(ib, p)
+        # Flatten nested arguments once so format/parse don't recurse
+        self._format_list = before._format_steps() + [_format_literal(char)] + after._format_steps()
+        self._parse_list = before._parse_steps() + [_parse_literal(char)] + after._parse_steps()
+    def format(self, i: Instruction) -> str: return _run_format_steps(self._format_list, i)
+    def parse(self, ib: 'InstructionBuilder', p: 'Parser'): _run_parse_steps(self._parse_list, ib, p)
+    def _format_steps(self) -> List[Callable[[Instruction], str]]: return self._format_list
+    def _parse_steps(self) -> List[Callable[['InstructionBuilder', 'Parser'], None]]: return self._parse_list
     def __str__(self) -> str: return f"{self.before}{self.char}{self.after}"
 
 class Comma(Concat):
+    __slots__ = ()
     def __init__(self, before: MnemonicArguments, after: MnemonicArguments):
         super().__init__(before, ',', after)
 
 class Plus(Concat):
+    __slots__ = ()
     # Specifically for Rd+[const] or Rs+[const] patterns inside braces
     def __init__(self, reg_part: MnemonicArguments, const_part: Const):
         if not isinstance(const_part, Const):
@@ -147,6 +192,10 @@ class Plus(Concat):
 
         return f"{self.before.format(i)}{op_char}{val_str}"
 
+    # The sign handling above can't be expressed as flat steps, so Plus stays a single step
+    def _format_steps(self) -> List[Callable[[Instruction], str]]: return [self.format]
+    def _parse_steps(self) -> List[Callable[['InstructionBuilder', 'Parser'], None]]: return [self.parse]
+
 
 # --- Pre-defined instances ---
 # These are created once MnemonicArguments and its subclasses are defined.
@@ -1,7 +1,7 @@
 import sys
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 from typing import Optional, Dict, Tuple, Callable, List, TextIO
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
 # Forward declaration for type hints
 class MnemonicArguments: pass
@@ -14,10 +14,10 @@ class WriteIO(Enum): No = 0; Yes = 1
 class Break(Enum): No = 0; Yes = 1
 class SourceToAluA(Enum): No = 0; Yes = 1
 class Branch(Enum): No = 0; BRC = 1; BRZ = 2; BRN = 3; uncond = 4; BRNC = 5; BRNZ = 6; BRNN = 7
-class ALUBSel(Enum): Source = 0; Rom = 1; ImReg = 2; Zero = 3; res = 4; instrSource = 5; instrSourceAndDest = 6; instrDest = 7
+class ALUBSel(IntEnum): Source = 0; Rom = 1; ImReg = 2; Zero = 3; res = 4; instrSource = 5; instrSourceAndDest = 6; instrDest = 7
 class ALUToBus(Enum): No = 0; Yes = 1
 class SrcToBus(Enum): No = 0; Yes = 1
-class ImmExtMode(Enum): extend = 0; res = 1; src0 = 2; dest0 = 3
+class ImmExtMode(IntEnum): extend = 0; res = 1; src0 = 2; dest0 = 3
 class ALUCmd(Enum):
     PassInB = 0; ADD = 1; SUB = 2; AND = 3; OR = 4; XOR = 5; NOT = 6; NEG = 7
     LSL = 8; LSR = 9; ASR = 10; SWAP = 11; SWAPN = 12; MUL = 13; res4 = 14; res5 = 15
@@ -29,7 +29,27 @@ class JmpAbs(Enum): No = 0; Yes = 1
 class RetI(Enum): No = 0; Yes = 1
 class StoreFlags(Enum): No = 0; Yes = 1
 
-@dataclass(frozen=True) # Use dataclass for Flags, make it immutable
+# Bit width of each signal in the control word. Assigned after the class
+# bodies, since a name defined inside an Enum body would become a member.
+ReadRam._BITS = 1
+ReadIO._BITS = 1
+WriteRam._BITS = 1
+WriteIO._BITS = 1
+Break._BITS = 1
+SourceToAluA._BITS = 1
+Branch._BITS = 3
+ALUBSel._BITS = 3
+ALUToBus._BITS = 1
+SrcToBus._BITS = 1
+ImmExtMode._BITS = 2
+ALUCmd._BITS = 5
+EnRegWrite._BITS = 1
+StorePC._BITS = 1
+JmpAbs._BITS = 1
+RetI._BITS = 1
+StoreFlags._BITS = 1
+
+@dataclass(frozen=True, eq=False) # Use dataclass for Flags, make it immutable
 class Flags:
     rr: ReadRam = ReadRam.No
     wr: WriteRam = WriteRam.No
@@ -49,141 +69,187 @@ class Flags:
     brk: Break = Break.No
     str_flags: StoreFlags = StoreFlags.No
 
+    def __post_init__(self):
+        # The control word encodes every field, so equality and hashing can use it alone
+        object.__setattr__(self, '_control_word', _pack_control_word(self))
+
+    @property
+    def control_word(self) -> int:
+        return self._control_word
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Flags):
+            return NotImplemented
+        return self._control_word == other._control_word
+
+    def __hash__(self) -> int:
+        return hash(self._control_word)
+
 # --- Control Word Builder Helper ---
 class ControlWordBuilder:
+    __slots__ = ('_pos', '_control_word', '_sb')
+
     def __init__(self, out: bool = False):
-        self._out = out
         self._pos = 0
         self._control_word = 0
-        self._sb: List[str] = []
+        self._sb: Optional[List[str]] = [] if out else None # Bit layout, only collected for output
 
     def add(self, e: Enum) -> 'ControlWordBuilder':
         enum_type = type(e)
-        num_constants = len(enum_type)
-        # Calculate width based on number of enum members
-        if num_constants <= 2:
-            width = 1
-        elif num_constants <= 4:
-            width = 2
-        elif num_constants <= 8:
-            width = 3
-        elif num_constants <= 16:
-             width = 4
-        elif num_constants <= 32:
-             width = 5 # ALUCmd needs 5 bits (26 values)
-        else:
-            raise ValueError(f"Unsupported enum size: {enum_type.__name__} has {num_constants} members")
+        width = enum_type._BITS
 
         self._control_word |= (e.value << self._pos)
 
-        if self._out:
+        sb = self._sb
+        if sb is not None:
             pos_str = f"{self._pos}" if width == 1 else f"{self._pos}-{self._pos + width - 1}"
-            self._sb.append(f"{pos_str}\t:{enum_type.__name__}")
+            sb.append(f"{pos_str}\t:{enum_type.__name__}")
             print(f"{pos_str}\t:{enum_type.__name__}", file=sys.stderr) # Print to stderr for debug/info
 
         self._pos += width
         return self
 
     def get_control_word(self) -> int:
-        if self._sb:
+        if self._sb is not None:
              print("Splitter: " + ",".join([s.split('\t:')[0] for s in self._sb]), file=sys.stderr)
         # print(f"Total control word bits: {self._pos}") # Debug
         return self._control_word
 
-# Opcode Definition needs to import MnemonicArguments later
-_mnemonics = {} # Placeholder, will be populated after MnemonicArguments is defined
+# Flags fields in control word order, starting at bit 0
+_CONTROL_WORD_FIELDS: Tuple[str, ...] = (
+    'alu_b_sel', 'src_to_bus', 'alu_cmd', 'en_reg_write', 'str_flags', 'alu_to_bus',
+    'imm_ext_mode', 'br', 'source_to_alu_a', 'rr', 'wr', 'jmp_abs', 'wio', 'rio',
+    'store_pc', 'brk', 'ret_i')
+
+def _field_offsets() -> Tuple[Tuple[str, int], ...]:
+    """Returns the (field name, first bit) pairs of the control word."""
+    types = {f.name: f.type for f in fields(Flags)}
+    offsets = []
+    pos = 0
+    for name in _CONTROL_WORD_FIELDS:
+        offsets.append((name, pos))
+        pos += types[name]._BITS
+    return tuple(offsets)
+
+_FIELD_OFFSETS = _field_offsets()
+
+def _pack_control_word(flags: Flags) -> int:
+    """Packs the signals into a control word, the fast path of ControlWordBuilder."""
+    cw = 0
+    for name, ofs in _FIELD_OFFSETS:
+        cw |= getattr(flags, name).value << ofs
+    return cw
+
+# MNEMONIC_ARG_LOOKUP, bound on first use since mnemonic_arguments depends on this module
+_MNEMONIC_LOOKUP: Optional[Dict[str, MnemonicArguments]] = None
+
+def _load_mnemonics() -> Dict[str, MnemonicArguments]:
+    global _MNEMONIC_LOOKUP
+    from .mnemonic_arguments import MNEMONIC_ARG_LOOKUP
+    _MNEMONIC_LOOKUP = MNEMONIC_ARG_LOOKUP
+    return _MNEMONIC_LOOKUP
 
 class Opcode(Enum):
     # Assign explicit integer values matching the original order (0-based)
-    NOP = 0, "Does nothing.", lambda: _mnemonics['NOTHING'], Flags()
-    MOV = 1, "Move the content of Rs to register Rd.", lambda: _mnemonics['DEST_SOURCE'], Flags(src_to_bus=SrcToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ADD = 2, "Adds the content of register Rs to register Rd without carry.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.ADD, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ADC = 3, "Adds the content of register Rs to register Rd with carry.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.ADC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    SUB = 4, "Subtracts the content of register Rs from register Rd without carry.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    SBC = 5, "Subtracts the content of register Rs from register Rd with carry.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    AND = 6, "Stores Rs and Rd in register Rd.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.AND, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    OR = 7, "Stores Rs or Rd in register Rd.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.OR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    EOR = 8, "Stores Rs xor Rd in register Rd.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.XOR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    LDI = 9, "Loads Register Rd with the constant value [const].", lambda: _mnemonics['DEST_CONST'], Flags(alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    LDIs = 10, "Loads Register Rd with the constant value [const].", lambda: _mnemonics['DEST_CONST'], Flags(alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    ADDI = 11, "Adds the constant [const] to register Rd without carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.ADD, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    ADDIs = 12, "Adds the constant [const] to register Rd without carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.ADD, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    ADCI = 13, "Adds the constant [const] to register Rd with carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.ADC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    ADCIs = 14, "Adds the constant [const] to register Rd with carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.ADC, alu_to_bus=ALUToBus.Yes, str_flags=StoreFlags.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    SUBI = 15, "Subtracts a constant [const] from register Rd without carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    SUBIs = 16, "Subtracts a constant [const] from register Rd without carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    SBCI = 17, "Subtracts a constant [const] from register Rd with carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SBC, alu_to_bus=ALUToBus.Yes, str_flags=StoreFlags.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    SBCIs = 18, "Subtracts a constant [const] from register Rd with carry.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    NEG = 19, "Stores the two's complement of Rd in register Rd.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.NEG, str_flags=StoreFlags.No, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ANDI = 20, "Stores Rd and [const] in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.AND, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    ANDIs = 21, "Stores Rd and [const] in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.AND, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    ORI = 22, "Stores Rd or [const] in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.OR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    ORIs = 23, "Stores Rd or [const] in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.OR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    EORI = 24, "Stores Rd xor [const] in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.XOR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    EORIs = 25, "Stores Rd xor [const] in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.XOR, alu_to_bus=ALUToBus.Yes, str_flags=StoreFlags.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    NOT = 26, "Stores not Rd in register Rd.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.NOT, str_flags=StoreFlags.No, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    MUL = 27, "Multiplies the content of register Rs with register Rd and stores result in Rd.", lambda: _mnemonics['DEST_SOURCE'], Flags(alu_cmd=ALUCmd.MUL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    MULI = 28, "Multiplies the constant [const] with register Rd and stores result in Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.MUL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    MULIs = 29, "Multiplies the constant [const] with register Rd and stores result in Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.MUL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
-    CMP = 30, "Subtracts the content of register Rs from register Rd without carry, does not store the result.", lambda: _mnemonics['DEST_SOURCE'], Flags(str_flags=StoreFlags.Yes, alu_cmd=ALUCmd.SUB)
-    CPC = 31, "Subtracts the content of register Rs from register Rd with carry, does not store the result.", lambda: _mnemonics['DEST_SOURCE'], Flags(str_flags=StoreFlags.Yes, alu_cmd=ALUCmd.SBC)
-    CPI = 32, "Subtracts a constant [const] from register Rd without carry, does not store the result.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    CPIs = 33, "Subtracts a constant [const] from register Rd without carry, does not store the result.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_b_sel=ALUBSel.instrSource)
-    CPCI = 34, "Subtracts a constant [const] from register Rd with carry, does not store the result.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
-    CPCIs = 35, "Subtracts a constant [const] from register Rd with carry, does not store the result.", lambda: _mnemonics['DEST_CONST'], Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, alu_b_sel=ALUBSel.instrSource)
-    LSL = 36, "Shifts register Rd by one bit to the left. A zero bit is filled in and the highest bit is moved to the carry bit.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.LSL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    LSR = 37, "Shifts register Rd by one bit to the right. A zero bit is filled in and the lowest bit is moved to the carry bit.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.LSR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ROL = 38, "Shifts register Rd by one bit to the left. The carry bit is filled in and the highest bit is moved to the carry bit.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.ROL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ROR = 39, "Shifts register Rd by one bit to the right. The carry bit is filled in and the lowest bit is moved to the carry bit.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.ROR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ASR = 40, "Shifts register Rd by one bit to the right. The MSB remains unchanged and the lowest bit is moved to the carry bit.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.ASR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    SWAP = 41, "Swaps the high and low byte in register Rd.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.SWAP, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    SWAPN = 42, "Swaps the high and low nibbles of both bytes in register Rd.", lambda: _mnemonics['DEST'], Flags(alu_cmd=ALUCmd.SWAPN, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    ST = 43, "Stores the content of register Rs to the memory at the address [Rd].", lambda: _mnemonics['BDEST_SOURCE'], Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, alu_b_sel=ALUBSel.Zero, alu_cmd=ALUCmd.ADD)
-    LD = 44, "Loads the value at memory address [Rs] to register Rd.", lambda: _mnemonics['DEST_BSOURCE'], Flags(rr=ReadRam.Yes, alu_b_sel=ALUBSel.Zero, alu_cmd=ALUCmd.ADD, source_to_alu_a=SourceToAluA.Yes, en_reg_write=EnRegWrite.Yes)
-    STS = 45, "Stores the content of register Rs to memory at the location given by [const].", lambda: _mnemonics['CONST_SOURCE'], Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, imm_ext_mode=ImmExtMode.dest0, alu_b_sel=ALUBSel.ImReg)
-    STSs = 46, "Stores the content of register Rs to memory at the location given by [const].", lambda: _mnemonics['CONST_SOURCE'], Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, alu_b_sel=ALUBSel.instrDest)
-    LDS = 47, "Loads the memory value at the location given by [const] to register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(rr=ReadRam.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, en_reg_write=EnRegWrite.Yes)
-    LDSs = 48, "Loads the memory value at the location given by [const] to register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(rr=ReadRam.Yes, alu_b_sel=ALUBSel.instrSource, en_reg_write=EnRegWrite.Yes)
-    STD = 49, "Stores the content of register Rs to the memory at the address (Rd+[const]).", lambda: _mnemonics['BDEST_BCONST_SOURCE'], Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, imm_ext_mode=ImmExtMode.extend, alu_b_sel=ALUBSel.ImReg, alu_cmd=ALUCmd.ADD)
-    LDD = 50, "Loads the value at memory address (Rs+[const]) to register Rd.", lambda: _mnemonics['DEST_BSOURCE_BCONST'], Flags(rr=ReadRam.Yes, imm_ext_mode=ImmExtMode.extend, alu_b_sel=ALUBSel.ImReg, alu_cmd=ALUCmd.ADD, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes)
-    LPM = 51, "Loads the value at program address [Rs] to register Rd. In a single cycle machine this requires dual ported program memory.", lambda: _mnemonics['DEST_BSOURCE'], Flags(alu_b_sel=ALUBSel.Rom, alu_cmd=ALUCmd.PassInB, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
-    BRCS = 52, "Jumps to the address given by [const] if carry flag is set.", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRC)
-    BREQ = 53, "Jumps to the address given by [const] if zero flag is set.", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRZ)
-    BRMI = 54, "Jumps to the address given by [const] if negative flag is set.", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRN)
-    BRCC = 55, "Jumps to the address given by [const] if carry flag is clear.", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRNC)
-    BRNE = 56, "Jumps to the address given by [const] if zero flag is clear.", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRNZ)
-    BRPL = 57, "Jumps to the address given by [const] if negative flag is clear.", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRNN)
-    RCALL = 58, "Jumps to the address given by [const], the return address is stored in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, store_pc=StorePC.Yes, en_reg_write=EnRegWrite.Yes, jmp_abs=JmpAbs.Yes)
-    RRET = 59, "Jumps to the address given by register Rs.", lambda: _mnemonics['SOURCE'], Flags(jmp_abs=JmpAbs.Yes) # Note: RRET uses Rs as address source, but doesn't fit standard ALU path well. Control unit handles this.
-    JMP = 60, "Jumps to the address given by [const].", lambda: _mnemonics['CONST'], Flags(imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, jmp_abs=JmpAbs.Yes)
-    JMPs = 61, "Jumps to the address given by [const].", lambda: _mnemonics['CONST'], Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.uncond)
-    OUT = 62, "Writes the content of register Rs to io location given by [const].", lambda: _mnemonics['CONST_SOURCE'], Flags(imm_ext_mode=ImmExtMode.dest0, alu_b_sel=ALUBSel.ImReg, src_to_bus=SrcToBus.Yes, wio=WriteIO.Yes)
-    OUTs = 63, "Writes the content of register Rs to io location given by [const].", lambda: _mnemonics['CONST_SOURCE'], Flags(alu_b_sel=ALUBSel.instrDest, src_to_bus=SrcToBus.Yes, wio=WriteIO.Yes)
-    OUTR = 64, "Writes the content of register Rs to the io location [Rd].", lambda: _mnemonics['BDEST_SOURCE'], Flags(alu_cmd=ALUCmd.ADD, alu_b_sel=ALUBSel.Zero, src_to_bus=SrcToBus.Yes, wio=WriteIO.Yes)
-    IN = 65, "Reads the io location given by [const] and stores it in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes, rio=ReadIO.Yes) # SourceToAluA might be wrong here, depends on how IO read path works. Assuming data bus -> reg.
-    INs = 66, "Reads the io location given by [const] and stores it in register Rd.", lambda: _mnemonics['DEST_CONST'], Flags(alu_b_sel=ALUBSel.instrSource, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes, rio=ReadIO.Yes) # Assuming ReadIO puts data on bus
-    INR = 67, "Reads the io location given by (Rs) and stores it in register Rd.", lambda: _mnemonics['DEST_BSOURCE'], Flags(alu_b_sel=ALUBSel.Zero, alu_cmd=ALUCmd.ADD, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes, rio=ReadIO.Yes) # Address from Rs -> ALU -> AddrBus, ReadIO puts data on bus
-    BRK = 68, "Stops execution by stopping the simulator.", lambda: _mnemonics['NOTHING'], Flags(brk=Break.Yes)
-    RETI = 69, "Return from Interrupt.", lambda: _mnemonics['NOTHING'], Flags(jmp_abs=JmpAbs.Yes, ret_i=RetI.Yes) # RETI needs special handling in control unit/sequencer
-
-    # Store the original tuple value for potential debugging if needed
-    _raw_value = None
-
-    def __new__(cls, value, desc='', factory= lambda: _mnemonics['NOTHING'], flgs=Flags()):
+    NOP = 0, "Does nothing.", 'NOTHING', Flags()
+    MOV = 1, "Move the content of Rs to register Rd.", 'DEST_SOURCE', Flags(src_to_bus=SrcToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ADD = 2, "Adds the content of register Rs to register Rd without carry.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.ADD, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ADC = 3, "Adds the content of register Rs to register Rd with carry.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.ADC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    SUB = 4, "Subtracts the content of register Rs from register Rd without carry.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    SBC = 5, "Subtracts the content of register Rs from register Rd with carry.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    AND = 6, "Stores Rs and Rd in register Rd.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.AND, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    OR = 7, "Stores Rs or Rd in register Rd.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.OR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    EOR = 8, "Stores Rs xor Rd in register Rd.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.XOR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    LDI = 9, "Loads Register Rd with the constant value [const].", 'DEST_CONST', Flags(alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    LDIs = 10, "Loads Register Rd with the constant value [const].", 'DEST_CONST', Flags(alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    ADDI = 11, "Adds the constant [const] to register Rd without carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.ADD, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    ADDIs = 12, "Adds the constant [const] to register Rd without carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.ADD, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    ADCI = 13, "Adds the constant [const] to register Rd with carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.ADC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    ADCIs = 14, "Adds the constant [const] to register Rd with carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.ADC, alu_to_bus=ALUToBus.Yes, str_flags=StoreFlags.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    SUBI = 15, "Subtracts a constant [const] from register Rd without carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    SUBIs = 16, "Subtracts a constant [const] from register Rd without carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    SBCI = 17, "Subtracts a constant [const] from register Rd with carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SBC, alu_to_bus=ALUToBus.Yes, str_flags=StoreFlags.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    SBCIs = 18, "Subtracts a constant [const] from register Rd with carry.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    NEG = 19, "Stores the two's complement of Rd in register Rd.", 'DEST', Flags(alu_cmd=ALUCmd.NEG, str_flags=StoreFlags.No, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ANDI = 20, "Stores Rd and [const] in register Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.AND, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    ANDIs = 21, "Stores Rd and [const] in register Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.AND, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    ORI = 22, "Stores Rd or [const] in register Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.OR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    ORIs = 23, "Stores Rd or [const] in register Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.OR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    EORI = 24, "Stores Rd xor [const] in register Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.XOR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    EORIs = 25, "Stores Rd xor [const] in register Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.XOR, alu_to_bus=ALUToBus.Yes, str_flags=StoreFlags.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    NOT = 26, "Stores not Rd in register Rd.", 'DEST', Flags(alu_cmd=ALUCmd.NOT, str_flags=StoreFlags.No, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    MUL = 27, "Multiplies the content of register Rs with register Rd and stores result in Rd.", 'DEST_SOURCE', Flags(alu_cmd=ALUCmd.MUL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    MULI = 28, "Multiplies the constant [const] with register Rd and stores result in Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.MUL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    MULIs = 29, "Multiplies the constant [const] with register Rd and stores result in Rd.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.MUL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes, alu_b_sel=ALUBSel.instrSource)
+    CMP = 30, "Subtracts the content of register Rs from register Rd without carry, does not store the result.", 'DEST_SOURCE', Flags(str_flags=StoreFlags.Yes, alu_cmd=ALUCmd.SUB)
+    CPC = 31, "Subtracts the content of register Rs from register Rd with carry, does not store the result.", 'DEST_SOURCE', Flags(str_flags=StoreFlags.Yes, alu_cmd=ALUCmd.SBC)
+    CPI = 32, "Subtracts a constant [const] from register Rd without carry, does not store the result.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    CPIs = 33, "Subtracts a constant [const] from register Rd without carry, does not store the result.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SUB, str_flags=StoreFlags.Yes, alu_b_sel=ALUBSel.instrSource)
+    CPCI = 34, "Subtracts a constant [const] from register Rd with carry, does not store the result.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg)
+    CPCIs = 35, "Subtracts a constant [const] from register Rd with carry, does not store the result.", 'DEST_CONST', Flags(alu_cmd=ALUCmd.SBC, str_flags=StoreFlags.Yes, alu_b_sel=ALUBSel.instrSource)
+    LSL = 36, "Shifts register Rd by one bit to the left. A zero bit is filled in and the highest bit is moved to the carry bit.", 'DEST', Flags(alu_cmd=ALUCmd.LSL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    LSR = 37, "Shifts register Rd by one bit to the right. A zero bit is filled in and the lowest bit is moved to the carry bit.", 'DEST', Flags(alu_cmd=ALUCmd.LSR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ROL = 38, "Shifts register Rd by one bit to the left. The carry bit is filled in and the highest bit is moved to the carry bit.", 'DEST', Flags(alu_cmd=ALUCmd.ROL, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ROR = 39, "Shifts register Rd by one bit to the right. The carry bit is filled in and the lowest bit is moved to the carry bit.", 'DEST', Flags(alu_cmd=ALUCmd.ROR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ASR = 40, "Shifts register Rd by one bit to the right. The MSB remains unchanged and the lowest bit is moved to the carry bit.", 'DEST', Flags(alu_cmd=ALUCmd.ASR, str_flags=StoreFlags.Yes, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    SWAP = 41, "Swaps the high and low byte in register Rd.", 'DEST', Flags(alu_cmd=ALUCmd.SWAP, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    SWAPN = 42, "Swaps the high and low nibbles of both bytes in register Rd.", 'DEST', Flags(alu_cmd=ALUCmd.SWAPN, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    ST = 43, "Stores the content of register Rs to the memory at the address [Rd].", 'BDEST_SOURCE', Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, alu_b_sel=ALUBSel.Zero, alu_cmd=ALUCmd.ADD)
+    LD = 44, "Loads the value at memory address [Rs] to register Rd.", 'DEST_BSOURCE', Flags(rr=ReadRam.Yes, alu_b_sel=ALUBSel.Zero, alu_cmd=ALUCmd.ADD, source_to_alu_a=SourceToAluA.Yes, en_reg_write=EnRegWrite.Yes)
+    STS = 45, "Stores the content of register Rs to memory at the location given by [const].", 'CONST_SOURCE', Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, imm_ext_mode=ImmExtMode.dest0, alu_b_sel=ALUBSel.ImReg)
+    STSs = 46, "Stores the content of register Rs to memory at the location given by [const].", 'CONST_SOURCE', Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, alu_b_sel=ALUBSel.instrDest)
+    LDS = 47, "Loads the memory value at the location given by [const] to register Rd.", 'DEST_CONST', Flags(rr=ReadRam.Yes, imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, en_reg_write=EnRegWrite.Yes)
+    LDSs = 48, "Loads the memory value at the location given by [const] to register Rd.", 'DEST_CONST', Flags(rr=ReadRam.Yes, alu_b_sel=ALUBSel.instrSource, en_reg_write=EnRegWrite.Yes)
+    STD = 49, "Stores the content of register Rs to the memory at the address (Rd+[const]).", 'BDEST_BCONST_SOURCE', Flags(wr=WriteRam.Yes, src_to_bus=SrcToBus.Yes, imm_ext_mode=ImmExtMode.extend, alu_b_sel=ALUBSel.ImReg, alu_cmd=ALUCmd.ADD)
+    LDD = 50, "Loads the value at memory address (Rs+[const]) to register Rd.", 'DEST_BSOURCE_BCONST', Flags(rr=ReadRam.Yes, imm_ext_mode=ImmExtMode.extend, alu_b_sel=ALUBSel.ImReg, alu_cmd=ALUCmd.ADD, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes)
+    LPM = 51, "Loads the value at program address [Rs] to register Rd. In a single cycle machine this requires dual ported program memory.", 'DEST_BSOURCE', Flags(alu_b_sel=ALUBSel.Rom, alu_cmd=ALUCmd.PassInB, alu_to_bus=ALUToBus.Yes, en_reg_write=EnRegWrite.Yes)
+    BRCS = 52, "Jumps to the address given by [const] if carry flag is set.", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRC)
+    BREQ = 53, "Jumps to the address given by [const] if zero flag is set.", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRZ)
+    BRMI = 54, "Jumps to the address given by [const] if negative flag is set.", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRN)
+    BRCC = 55, "Jumps to the address given by [const] if carry flag is clear.", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRNC)
+    BRNE = 56, "Jumps to the address given by [const] if zero flag is clear.", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRNZ)
+    BRPL = 57, "Jumps to the address given by [const] if negative flag is clear.", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.BRNN)
+    RCALL = 58, "Jumps to the address given by [const], the return address is stored in register Rd.", 'DEST_CONST', Flags(imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, store_pc=StorePC.Yes, en_reg_write=EnRegWrite.Yes, jmp_abs=JmpAbs.Yes)
+    RRET = 59, "Jumps to the address given by register Rs.", 'SOURCE', Flags(jmp_abs=JmpAbs.Yes) # Note: RRET uses Rs as address source, but doesn't fit standard ALU path well. Control unit handles this.
+    JMP = 60, "Jumps to the address given by [const].", 'CONST', Flags(imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, jmp_abs=JmpAbs.Yes)
+    JMPs = 61, "Jumps to the address given by [const].", 'CONST', Flags(alu_b_sel=ALUBSel.instrSourceAndDest, br=Branch.uncond)
+    OUT = 62, "Writes the content of register Rs to io location given by [const].", 'CONST_SOURCE', Flags(imm_ext_mode=ImmExtMode.dest0, alu_b_sel=ALUBSel.ImReg, src_to_bus=SrcToBus.Yes, wio=WriteIO.Yes)
+    OUTs = 63, "Writes the content of register Rs to io location given by [const].", 'CONST_SOURCE', Flags(alu_b_sel=ALUBSel.instrDest, src_to_bus=SrcToBus.Yes, wio=WriteIO.Yes)
+    OUTR = 64, "Writes the content of register Rs to the io location [Rd].", 'BDEST_SOURCE', Flags(alu_cmd=ALUCmd.ADD, alu_b_sel=ALUBSel.Zero, src_to_bus=SrcToBus.Yes, wio=WriteIO.Yes)
+    IN = 65, "Reads the io location given by [const] and stores it in register Rd.", 'DEST_CONST', Flags(imm_ext_mode=ImmExtMode.src0, alu_b_sel=ALUBSel.ImReg, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes, rio=ReadIO.Yes) # SourceToAluA might be wrong here, depends on how IO read path works. Assuming data bus -> reg.
+    INs = 66, "Reads the io location given by [const] and stores it in register Rd.", 'DEST_CONST', Flags(alu_b_sel=ALUBSel.instrSource, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes, rio=ReadIO.Yes) # Assuming ReadIO puts data on bus
+    INR = 67, "Reads the io location given by (Rs) and stores it in register Rd.", 'DEST_BSOURCE', Flags(alu_b_sel=ALUBSel.Zero, alu_cmd=ALUCmd.ADD, en_reg_write=EnRegWrite.Yes, source_to_alu_a=SourceToAluA.Yes, rio=ReadIO.Yes) # Address from Rs -> ALU -> AddrBus, ReadIO puts data on bus
+    BRK = 68, "Stops execution by stopping the simulator.", 'NOTHING', Flags(brk=Break.Yes)
+    RETI = 69, "Return from Interrupt.", 'NOTHING', Flags(jmp_abs=JmpAbs.Yes, ret_i=RetI.Yes) # RETI needs special handling in control unit/sequencer
+
+    def __new__(cls, value, desc='', arg_key='NOTHING', flgs=Flags()):
         member = object.__new__(cls)
         member._value_ = value
-        member._raw_value = (value, desc, factory, flgs)
         return member
 
-    def __init__(self, value, desc='', factory= lambda: _mnemonics['NOTHING'], flgs=Flags()):
-        _, desc, factory, flgs = self._raw_value
-        self._description = self._add_const_limit(desc, flgs.alu_b_sel)
-        self._arg_factory = factory
+    def __init__(self, value, desc='', arg_key='NOTHING', flgs=Flags()):
+        self._raw_description = desc
+        self._description: Optional[str] = None # Built on first access
+        self._arg_key = arg_key # Key into MNEMONIC_ARG_LOOKUP
         self._flags = flgs
         self._arguments: Optional[MnemonicArguments] = None
+        # Control words and the signals read while assembling never change, keep them at hand
+        self._control_word: int = flgs.control_word
+        self._alu_b_sel: ALUBSel = flgs.alu_b_sel
+        self._imm_ext_mode: ImmExtMode = flgs.imm_ext_mode
+        self._alu_to_bus: ALUToBus = flgs.alu_to_bus
+        self._src_to_bus: SrcToBus = flgs.src_to_bus
+        self._read_ram: ReadRam = flgs.rr
+        self._write_ram: WriteRam = flgs.wr
+        self._read_io: ReadIO = flgs.rio
+        self._write_io: WriteIO = flgs.wio
+        self._store_pc: StorePC = flgs.store_pc
+        self._en_reg_write: EnRegWrite = flgs.en_reg_write
 
     @property
     def description(self) -> str:
+        if self._description is None:
+            self._description = self._add_const_limit(self._raw_description, self._alu_b_sel)
         return self._description
 
     @property
@@ -194,11 +260,8 @@ class Opcode(Enum):
     def arguments(self) -> MnemonicArguments:
         # Lazy initialization of arguments
         if self._arguments is None:
-             # Need to import MnemonicArguments here to avoid circular dependency at module level
-             from .mnemonic_arguments import MnemonicArguments, MNEMONIC_ARG_LOOKUP
-             global _mnemonics # Allow modification of the global placeholder
-             _mnemonics = MNEMONIC_ARG_LOOKUP # Populate the lookup now
-             self._arguments = self._arg_factory()
+             lookup = _MNEMONIC_LOOKUP if _MNEMONIC_LOOKUP is not None else _load_mnemonics()
+             self._arguments = lookup[self._arg_key]
         return self._arguments
 
     def _add_const_limit(self, description: str, alu_b_sel: ALUBSel) -> str:
@@ -210,66 +273,69 @@ class Opcode(Enum):
             return description
 
     def create_control_word(self, out: bool = False) -> int:
+        if not out:
+            return self._control_word
+        return self._build_control_word(out)
+
+    def _build_control_word(self, out: bool) -> int:
         f = self._flags
-        return (ControlWordBuilder(out)
-                .add(f.alu_b_sel)
-                .add(f.src_to_bus)
-                .add(f.alu_cmd)
-                .add(f.en_reg_write)
-                .add(f.str_flags)
-                .add(f.alu_to_bus)
-                .add(f.imm_ext_mode)
-                .add(f.br)
-                .add(f.source_to_alu_a)
-                .add(f.rr)
-                .add(f.wr)
-                .add(f.jmp_abs)
-                .add(f.wio)
-                .add(f.rio)
-                .add(f.store_pc)
-                .add(f.brk)
-                .add(f.ret_i)
-                .get_control_word()
-               )
+        builder = ControlWordBuilder(out)
+        for name in _CONTROL_WORD_FIELDS:
+            builder.add(getattr(f, name))
+        return builder.get_control_word()
 
     @property
-    def alu_b_sel(self) -> ALUBSel: return self._flags.alu_b_sel
+    def alu_b_sel(self) -> ALUBSel: return self._alu_b_sel
     @property
-    def alu_to_bus(self) -> ALUToBus: return self._flags.alu_to_bus
+    def alu_to_bus(self) -> ALUToBus: return self._alu_to_bus
     @property
-    def src_to_bus(self) -> SrcToBus: return self._flags.src_to_bus
+    def src_to_bus(self) -> SrcToBus: return self._src_to_bus
     @property
-    def read_ram(self) -> ReadRam: return self._flags.rr
+    def read_ram(self) -> ReadRam: return self._read_ram
     @property
-    def write_ram(self) -> WriteRam: return self._flags.wr
+    def write_ram(self) -> WriteRam: return self._write_ram
     @property
-    def read_io(self) -> ReadIO: return self._flags.rio
+    def read_io(self) -> ReadIO: return self._read_io
     @property
-    def write_io(self) -> WriteIO: return self._flags.wio
+    def write_io(self) -> WriteIO: return self._write_io
     @property
-    def store_pc(self) -> StorePC: return self._flags.store_pc
+    def store_pc(self) -> StorePC: return self._store_pc
     @property
-    def en_reg_write(self) -> EnRegWrite: return self._flags.en_reg_write
+    def en_reg_write(self) -> EnRegWrite: return self._en_reg_write
     @property
-    def imm_ext_mode(self) -> ImmExtMode: return self._flags.imm_ext_mode
+    def imm_ext_mode(self) -> ImmExtMode: return self._imm_ext_mode
 
     @classmethod
     def parse_str(cls, name: str) -> Optional['Opcode']:
-        try:
-            return cls[name.upper()]
-        except KeyError:
-            return None
+        opcode = _NAME_TO_OPCODE.get(name)
+        if opcode is None:
+            opcode = _NAME_TO_OPCODE.get(name.upper()) # Mixed case
+        return opcode
+
+    @staticmethod
+    def from_value(value: int) -> 'Opcode':
+        """Returns the opcode with the given value, e.g. the high byte of an instruction word."""
+        if 0 <= value < len(_VALUE_TO_OPCODE):
+            return _VALUE_TO_OPCODE[value]
+        raise ValueError(f"{value} is not a valid Opcode")
 
     @staticmethod
     def write_control_words(out: TextIO):
-        print("v2.0 raw", file=out)
-        for oc in Opcode:
-            if oc == Opcode._raw_value:
-                continue
-            print(f"{oc.create_control_word(False):x}", file=out)
+        out.write(_CONTROL_WORDS_IMAGE)
 
     def __str__(self) -> str:
         # Access arguments property to ensure it's initialized
         args_str = str(self.arguments) if self.arguments else "<args_uninitialized>"
         return f"{self.name} {args_str}\n\t{self.description}"
 
+# Opcodes by name, lets parse_str reject non-opcodes without raising KeyError.
+# Any case of a name matches, but the mixed case short forms (LDIs...) are not matched.
+# Holds the upper and lower case names, so the usual spellings need no case conversion.
+_NAME_TO_OPCODE: Dict[str, Opcode] = {oc.name: oc for oc in Opcode if oc.name.isupper()}
+_NAME_TO_OPCODE.update({name.lower(): oc for name, oc in list(_NAME_TO_OPCODE.items())})
+
+# Opcodes indexed by value, the values are dense starting at 0
+_VALUE_TO_OPCODE: List[Opcode] = list(Opcode)
+
+# Logisim image of all control words, the words never change after import
+_CONTROL_WORDS_IMAGE: str = "v2.0 raw\n" + "".join([f"{oc._control_word:x}\n" for oc in Opcode])
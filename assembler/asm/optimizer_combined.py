@@ -0,0 +1,44 @@
+from assembler.expression import Context
+from .instruction import Instruction
+from .instruction_visitor import InstructionVisitor
+from .opcode import Opcode
+from .optimizer_jmp import shorten_jmp
+from .optimizer_short import _SHORT_TABLE, shorten_constant
+
+class OptimizerCombined(InstructionVisitor):
+    """Does the work of OptimizerShort and OptimizerJmp in a single traversal."""
+    def __init__(self):
+        self._optimized = False
+
+    @property
+    def was_optimized(self) -> bool:
+        return self._optimized
+
+    def visit(self, instruction: 'InstructionInterface', context: Context) -> bool:
+        if type(instruction) is Instruction and shorten(instruction, context): # Instruction has no subclasses
+            self._optimized = True
+        return True
+
+def has_short_form(instruction: Instruction) -> bool:
+    """Returns True if the instruction is a long form which shorten() may replace."""
+    op = instruction.opcode
+    return _SHORT_TABLE[op.value] is not None or op == Opcode.JMP
+
+def shorten(instruction: Instruction, context: Context) -> bool:
+    """Replaces the instruction by its short version if possible. Returns True if it was changed."""
+    op = instruction.opcode
+    op_short = _SHORT_TABLE[op.value]
+    if op_short is not None:
+        return shorten_constant(instruction, op_short, context)
+    if op == Opcode.JMP:
+        return shorten_jmp(instruction, context)
+    return False
+
+def lengthen(instruction: Instruction, long_op: Opcode, context: Context) -> bool:
+    """Switches a shortened instruction back to long_op if its constant no longer fits
+    the short form. Returns True if it was changed."""
+    short_op = instruction.opcode
+    instruction.opcode = long_op
+    if shorten(instruction, context):
+        return False # Still fits, shorten() restored the short form
+    return short_op != long_op
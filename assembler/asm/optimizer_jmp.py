@@ -1,4 +1,4 @@
-from assembler.expression import Context, ExpressionException
+from assembler.expression import Context
 from .instruction import Instruction
 from .instruction_visitor import InstructionVisitor
 from .opcode import Opcode
@@ -13,28 +13,26 @@ class OptimizerJmp(InstructionVisitor):
         return self._optimized
 
     def visit(self, instruction: 'InstructionInterface', context: Context) -> bool:
-        if isinstance(instruction, Instruction):
-            op = instruction.opcode
-            if op == Opcode.JMP:
-                if instruction.constant is None: return True # Should not happen if built correctly
-
-                try:
-                    con = instruction.constant.get_value(context)
-                    # Offset = TargetAddr - CurrentAddr - 1 (for relative jump)
-                    ofs = con - context.instr_addr - 1
-                    # JMPs uses 8-bit signed offset (-128 to 127)
-                    if -128 <= ofs <= 127:
-                        instruction.opcode = Opcode.JMPs
-                        # We need to indicate that an optimization happened,
-                        # but also stop traversal for this instruction
-                        # as its size might change implicitly in the next pass.
-                        # The Program's optimization loop handles re-traversal.
-                        self._optimized = True
-                        # Return True to continue traversal, Program loop handles iteration
-                except ExpressionException as e:
-                     # If constant cannot be resolved yet, skip optimization
-                     # print(f"Warning: Could not resolve JMP target at line {instruction.line_number}: {e}")
-                     pass
+        if type(instruction) is Instruction:
+            if instruction.opcode == Opcode.JMP and shorten_jmp(instruction, context):
+                # We need to indicate that an optimization happened. As the size
+                # of the instruction changes, the Program's optimization loop
+                # handles re-traversal.
+                self._optimized = True
         return True
 
+def shorten_jmp(instruction: Instruction, context: Context) -> bool:
+    """Switches a JMP to JMPs if the target is near enough. Returns True if it was changed."""
+    if instruction.constant is None: return False # Should not happen if built correctly
+
+    con = instruction.try_get_constant_value(context)
+    if con is None:
+        return False # Target not resolved yet, skip optimization
 
+    # Offset = TargetAddr - CurrentAddr - 1 (for relative jump)
+    ofs = con - context.instr_addr - 1
+    # JMPs uses 8-bit signed offset (-128 to 127)
+    if -128 <= ofs <= 127:
+        instruction.opcode = Opcode.JMPs
+        return True
+    return False
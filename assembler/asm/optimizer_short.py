@@ -1,30 +1,40 @@
-from typing import Dict
-from assembler.expression import Context, ExpressionException
+from typing import Dict, List, Optional
+from assembler.expression import Context
 from .instruction import Instruction
 from .instruction_visitor import InstructionVisitor
 from .opcode import Opcode, ALUBSel
 
+# Map from long-form opcode to short-form opcode
+_SHORT_CONSTANT_MAP: Dict[Opcode, Opcode] = {
+        Opcode.LDI: Opcode.LDIs,
+        Opcode.OUT: Opcode.OUTs,
+        Opcode.ADDI: Opcode.ADDIs,
+        Opcode.ADCI: Opcode.ADCIs,
+        Opcode.SUBI: Opcode.SUBIs,
+        Opcode.SBCI: Opcode.SBCIs,
+        Opcode.ANDI: Opcode.ANDIs,
+        Opcode.ORI: Opcode.ORIs,
+        Opcode.EORI: Opcode.EORIs,
+        Opcode.CPI: Opcode.CPIs,
+        Opcode.CPCI: Opcode.CPCIs,
+        Opcode.LDS: Opcode.LDSs,
+        Opcode.STS: Opcode.STSs,
+        Opcode.MULI: Opcode.MULIs,
+        Opcode.IN: Opcode.INs,
+        }
+
+def _build_short_table() -> List[Optional[Opcode]]:
+    """Returns the map as a list indexed by opcode value, None if there is no short form."""
+    table: List[Optional[Opcode]] = [None] * (max(op.value for op in Opcode) + 1)
+    for long_op, short_op in _SHORT_CONSTANT_MAP.items():
+        table[long_op.value] = short_op
+    return table
+
+_SHORT_TABLE = _build_short_table()
+
 class OptimizerShort(InstructionVisitor):
     """Tries to replace long constant instructions with short versions."""
     def __init__(self):
-        # Map from long-form opcode to short-form opcode
-        self._short_constant_map: Dict[Opcode, Opcode] = {
-                Opcode.LDI: Opcode.LDIs,
-                Opcode.OUT: Opcode.OUTs,
-                Opcode.ADDI: Opcode.ADDIs,
-                Opcode.ADCI: Opcode.ADCIs,
-                Opcode.SUBI: Opcode.SUBIs,
-                Opcode.SBCI: Opcode.SBCIs,
-                Opcode.ANDI: Opcode.ANDIs,
-                Opcode.ORI: Opcode.ORIs,
-                Opcode.EORI: Opcode.EORIs,
-                Opcode.CPI: Opcode.CPIs,
-                Opcode.CPCI: Opcode.CPCIs,
-                Opcode.LDS: Opcode.LDSs,
-                Opcode.STS: Opcode.STSs,
-                Opcode.MULI: Opcode.MULIs,
-                Opcode.IN: Opcode.INs,
-                }
         self._optimized = False # Track if any change was made
 
     @property
@@ -32,22 +42,22 @@ class OptimizerShort(InstructionVisitor):
         return self._optimized
 
     def visit(self, instruction: 'InstructionInterface', context: Context) -> bool:
-        if isinstance(instruction, Instruction):
-            op = instruction.opcode
-            op_short = self._short_constant_map.get(op)
-
-            if op_short is not None:
-                if instruction.constant is None: return True # Should have constant
-
-                try:
-                    con = instruction.constant.get_value(context)
-                    # Short instructions use 4-bit unsigned constants (0-15)
-                    if 0 <= con <= 15:
-                        if instruction.opcode != op_short: # Check if already optimized
-                            instruction.opcode = op_short
-                            self._optimized = True
-                except ExpressionException as e:
-                    # If constant cannot be resolved yet, skip optimization
-                    # print(f"Warning: Could not resolve constant at line {instruction.line_number}: {e}")
-                    pass
+        if type(instruction) is Instruction:
+            op_short = _SHORT_TABLE[instruction.opcode.value]
+            if op_short is not None and shorten_constant(instruction, op_short, context):
+                self._optimized = True
+        return True
+
+def shorten_constant(instruction: Instruction, op_short: Opcode, context: Context) -> bool:
+    """Switches the instruction to op_short if its constant fits. Returns True if it was changed."""
+    if instruction.constant is None: return False # Should have constant
+
+    con = instruction.try_get_constant_value(context)
+    if con is None:
+        return False # Constant cannot be resolved yet, skip optimization
+
+    # Short instructions use 4-bit unsigned constants (0-15)
+    if 0 <= con <= 15 and instruction.opcode != op_short: # Check if already optimized
+        instruction.opcode = op_short
         return True
+    return False
@@ -1,7 +1,9 @@
 import io
-from typing import List, Optional, Dict, Tuple, Set
-from collections import defaultdict, OrderedDict
+from array import array
+from typing import List, Optional, Dict, Tuple, Set, Iterable
+from collections import OrderedDict
 import os
+from itertools import accumulate
 
 from assembler.expression import Context, ExpressionException, Constant
 from .instruction import Instruction
@@ -10,13 +12,15 @@ from .instruction_interface import InstructionInterface
 from .instruction_builder import InstructionBuilder
 from .instruction_visitor import InstructionVisitor
 from .instruction_exception import InstructionException
-from .optimizer_jmp import OptimizerJmp
-from .optimizer_short import OptimizerShort
+from .optimizer_combined import OptimizerCombined, has_short_form, shorten, lengthen
+from .memory_image import MemoryImage, MemoryImageBuilder
 from .opcode import Opcode
 from .register import Register
 
 class PendingString:
     """Helper to manage labels/comments added before the instruction."""
+    __slots__ = ('name', 'str_val')
+
     def __init__(self, name: str):
         self.name = name
         self.str_val: Optional[str] = None
@@ -46,41 +50,32 @@ class PendingString:
 class Program:
     """Represents an entire assembly program."""
 
-    def __init__(self):
+    def __init__(self, merge_sp_adjust: bool = False):
         self._prog: List[InstructionInterface] = []
+        # Merge neighbouring SP adjustments of macro expansions, see add_sp_adjust
+        self._merge_sp_adjust = merge_sp_adjust
         self._context = Context()
-        # For Harvard arch: data values mapped to list of RAM addresses
-        self._data_map: Dict[int, List[int]] = defaultdict(list)
+        # For Harvard arch: data values and their RAM addresses, in parallel lists
+        self._data_values: List[int] = []
+        self._data_addrs: List[int] = []
         self._ram_pos: int = 0
         self._pending_label = PendingString("label")
         self._pending_macro_desc = PendingString("description")
         self._pending_comment = PendingString("comment")
         self._current_line_number: int = 0
         self._pending_addr: int = -1
-        self._addr_to_line_map: Dict[int, int] = {}
+        # Source line number of every address, -1 where no instruction starts
+        self._addr_lines = array('l')
         self._von_neumann: bool = False
         self._ram_start_address: int = 0 # Address where data starts in Von Neumann
 
 
-    def add_pending_comment(self, comment: str):
-        # Allow multiple comments to accumulate, separated by newline
-        current = self._pending_comment.get() # Use get to consume previous if any
-        new_comment = comment.strip()
-        if current:
-            # Store consumed value back before appending
-            self._pending_comment.set(current + "\n" + new_comment)
-        else:
-            self._pending_comment.set(new_comment)
-
-
     def set_line_number(self, line_number: int):
         self._current_line_number = line_number
 
     def add(self, i: Instruction):
         """Adds a standard instruction to the program."""
-        i.label = self._pending_label.get()
-        i.macro_description = self._pending_macro_desc.get()
-        i.comment = self._pending_comment.get() # Set comment if pending
+        self._drain_pending(i)
 
         if self._pending_addr >= 0:
             i.abs_addr = self._pending_addr
@@ -91,13 +86,67 @@ class Program:
 
         self._prog.append(i)
 
+    def extend(self, instructions: List[Instruction]):
+        """Adds several newly built instructions. Like add() called for each of them, the
+        pending label, comments, line number and address go to the first one."""
+        if instructions:
+            self.add(instructions[0])
+            self._prog.extend(instructions[1:])
+
+    def add_sp_adjust(self, i: Instruction):
+        """Adds an instruction which adds a literal constant to SP (ADDI, SUBI or their short forms).
+
+        Only if the program was created with merge_sp_adjust: if the last instruction is
+        such an adjustment too and was generated inside a macro expansion, both are merged
+        into one, or dropped if they cancel out. This changes the addresses of the following
+        instructions and the flags the expansion leaves behind, so it is only correct if no
+        address computed with an offset (label+N, _ADDR_, _SKIP_ADDR_ etc.) lands behind the
+        merged adjustment and no code tests the flags of an expanded PUSH or POP."""
+        prog = self._prog
+        last = prog[-1] if prog else None
+        if (not self._merge_sp_adjust or type(last) is not Instruction or last.line_number != 0
+                or last.label or last.macro_description or last.abs_addr >= 0
+                or self._pending_label.str_val or self._pending_addr >= 0):
+            self.add(i)
+            return
+        last_delta = _sp_delta(last)
+        if last_delta is None:
+            self.add(i)
+            return
+
+        delta = last_delta + _sp_delta(i)
+        if delta == 0 and not last.comment:
+            prog.pop() # The adjustments cancel out
+            return
+        merged = (InstructionBuilder(Opcode.ADDI if delta >= 0 else Opcode.SUBI)
+                  .set_dest(Register.SP).set_constant_int(abs(delta)).build())
+        shorten(merged, self._context)
+        merged.comment = last.comment
+        prog[-1] = merged
+
+    def _drain_pending(self, i: Instruction):
+        """Moves the pending label, macro description and comment to the instruction."""
+        # Same as PendingString.get(), without the call overhead
+        pending = self._pending_label
+        i.label = pending.str_val
+        pending.str_val = None
+        pending = self._pending_macro_desc
+        i.macro_description = pending.str_val
+        pending.str_val = None
+        pending = self._pending_comment
+        i.comment = pending.str_val # Set comment if pending
+        pending.str_val = None
+
     def add_data_instruction(self, value: int):
          """Adds a data word directly into the program memory (Von Neumann)."""
          if not self._von_neumann:
               raise InstructionException(".data only allowed in Von Neumann mode (after .dorg)")
 
-         label = self._pending_label.get() # Get pending label
-         macro_desc = self._pending_macro_desc.get() # Consume pending
+         # Consume pending label and macro description, the comment stays pending
+         pending = self._pending_label
+         label = pending.str_val
+         pending.str_val = None
+         self._pending_macro_desc.str_val = None
 
          data_instr = DataInstruction(value, self._current_line_number, label)
 
@@ -117,35 +166,35 @@ class Program:
             return
 
         last_item = self._prog[-1]
-        # Ensure the last item can have a comment set
-        if not hasattr(last_item, 'comment') or not callable(getattr(last_item, 'comment', None)):
-             # Add a setter if missing, or handle error/warning
-             # Assuming Instruction and DataInstruction have settable comments now.
-             pass
-
-
         existing = last_item.comment
         new_comment = comment.strip() # Already stripped by tokenizer? Ensure it is.
         # Append same-line comment to any existing (likely preceding) comment.
-        if existing:
-            last_item.comment = existing + "\n" + new_comment # Use newline separator
-        else:
-            last_item.comment = new_comment
-
+        last_item.comment = existing + "\n" + new_comment if existing else new_comment
 
-    def traverse(self, visitor: InstructionVisitor):
-        """Traverses the program, calling the visitor for each instruction."""
+    def traverse(self, visitor: InstructionVisitor, record_lines: bool = True):
+        """Traverses the program, calling the visitor for each instruction.
+        If record_lines is set, the address to line number map is rebuilt."""
         addr = 0
-        self._addr_to_line_map.clear()
+        addr_lines = self._addr_lines
+        if record_lines:
+            del addr_lines[:]
         last_addr = -1
-
-        for i, instr in enumerate(self._prog):
+        prog = self._prog
+        # Sizes only change when an instruction is visited, so the sizes of the
+        # instruction and the ones following it are still valid when it is visited
+        sizes = [instr.size for instr in prog]
+        sizes.extend((0, 0)) # Past the end of the program
+        context = self._context
+        set_instr_addrs = context.set_instr_addrs
+        visit = visitor.visit
+
+        for i, instr in enumerate(prog):
             try:
                 abs_addr = instr.abs_addr
                 if abs_addr >= 0:
                     if abs_addr < addr:
                         # Allow setting current address, but not jumping back strictly
-                        if abs_addr == last_addr and i>0 and self._prog[i-1].abs_addr == abs_addr:
+                        if abs_addr == last_addr and i>0 and prog[i-1].abs_addr == abs_addr:
                              # OK: Multiple instructions at same org address (e.g. label)
                              pass
                         else:
@@ -156,19 +205,18 @@ class Program:
                     # For now, just jump the address counter. Hex formatter must handle gaps.
                     addr = abs_addr
 
-                self._context.set_instr_addr(addr)
                 # Calculate addresses for relative jumps/calls if needed by expressions
-                next_addr = addr + self._calc_rel_addr(i, 1)
-                skip_addr = addr + self._calc_rel_addr(i, 2)
-                skip2_addr = addr + self._calc_rel_addr(i, 3)
-                self._context.set_identifier(Context.NEXT_ADDR, next_addr)
-                self._context.set_identifier(Context.SKIP_ADDR, skip_addr)
-                self._context.set_identifier(Context.SKIP2_ADDR, skip2_addr)
-
-                if not visitor.visit(instr, self._context):
+                next_addr = addr + sizes[i]
+                skip_addr = next_addr + sizes[i + 1]
+                set_instr_addrs(addr, next_addr, skip_addr, skip_addr + sizes[i + 2])
+
+                if not visit(instr, context):
                     break
 
-                self._addr_to_line_map[addr] = instr.line_number
+                if record_lines:
+                    if addr >= len(addr_lines):
+                        addr_lines.extend([-1] * (addr + 1024 - len(addr_lines)))
+                    addr_lines[addr] = instr.line_number
                 last_addr = addr
                 addr += instr.size
 
@@ -181,16 +229,6 @@ class Program:
                  new_e.set_line_number(instr.line_number)
                  raise new_e from e
 
-    def _calc_rel_addr(self, current_index: int, num_instructions_ahead: int) -> int:
-        """Calculates the address offset for a number of instructions ahead."""
-        offset = 0
-        for j in range(num_instructions_ahead):
-            idx = current_index + j
-            if idx >= len(self._prog):
-                break # Reached end of program
-            offset += self._prog[idx].size
-        return offset
-
     def _append_harvard_data(self):
         """Generates instructions to load Harvard data into RAM."""
         # Sort data map by value to potentially group loads? No, sort by address needed.
@@ -198,7 +236,7 @@ class Program:
         # This approach is complex. Let's stick to Von Neumann for simplicity first.
         # If Harvard needed:
         #   data_instructions = []
-        #   for value, addrs in sorted(self._data_map.items()):
+        #   for value, addrs in itertools.groupby(sorted(zip(self._data_values, self._data_addrs)), ...):
         #      # Create LDI R?, value
         #      ldi = InstructionBuilder(Opcode.LDI).set_dest(Register.R0).set_constant_int(value).build()
         #      ldi.set_line_number(0) # Mark as generated
@@ -210,7 +248,7 @@ class Program:
         #          data_instructions.append(sts)
         #   # Insert these at the beginning or end? End is safer.
         #   self._prog.extend(data_instructions)
-        if self._data_map:
+        if self._data_values:
              print("Warning: Harvard data (.word/.long/.data without .dorg) is not fully implemented for code generation in this Python version.")
         pass # Keep harvard logic minimal for now
 
@@ -259,10 +297,28 @@ class Program:
              if label:
                   self.add_ram(label, 0) # Add label pointing to current ram_pos
 
-             current_ram_addr = self._ram_pos
-             self._data_map[value].append(current_ram_addr)
+             self._data_values.append(value)
+             self._data_addrs.append(self._ram_pos)
              self._ram_pos += 1 # Allocate one word in RAM
 
+    def add_data_bulk(self, values: Iterable[int]):
+         """Adds constant data words, same as calling add_data for every value."""
+         if self._von_neumann:
+             for value in values:
+                 self.add_data_instruction(value)
+             return
+         data_values = self._data_values
+         count = len(data_values)
+         data_values.extend(values)
+         count = len(data_values) - count
+         if count:
+             label = self._pending_label.get() # Consume label if present
+             if label:
+                  self.add_ram(label, 0) # Add label pointing to current ram_pos
+             ram_pos = self._ram_pos
+             self._data_addrs.extend(range(ram_pos, ram_pos + count))
+             self._ram_pos = ram_pos + count
+
     def add_data_label(self, ident: str):
         """Adds a label for the next data item."""
         if self._von_neumann:
@@ -277,13 +333,14 @@ class Program:
     def set_pending_macro_description(self, description: str):
         self._pending_macro_desc.set(description)
 
-    def add_pending_comment(self, comment: str):
-        # Allow multiple comments to accumulate
-        current = self._pending_comment.get()
-        if current:
-            self._pending_comment.set(current + "\n" + comment.strip())
+    def add_pending_comment(self, *comments: str):
+        # Allow multiple comments to accumulate, separated by newline
+        pending = self._pending_comment
+        text = "\n".join([comment.strip() for comment in comments])
+        if pending.str_val:
+            pending.str_val += "\n" + text
         else:
-            self._pending_comment.set(comment.strip())
+            pending.str_val = text
 
 
     def add_pending_origin(self, addr: int):
@@ -295,7 +352,7 @@ class Program:
          """Sets the RAM start address and switches to Von Neumann mode."""
          if ram_start < 0:
               raise ValueError("RAM start address cannot be negative")
-         if self._ram_pos != 0 or self._data_map: # Check if RAM/data already defined
+         if self._ram_pos != 0 or self._data_values: # Check if RAM/data already defined
              raise ExpressionException(".dorg must be used before any .word, .long, .data directives")
          self._ram_start_address = ram_start
          self._ram_pos = ram_start # Data starts here
@@ -310,69 +367,138 @@ class Program:
 
     def get_line_by_addr(self, addr: int) -> int:
         """Gets the source line number for a given machine code address."""
-        return self._addr_to_line_map.get(addr, -1)
+        addr_lines = self._addr_lines
+        return addr_lines[addr] if 0 <= addr < len(addr_lines) else -1
 
     def optimize_and_link(self) -> 'Program':
         """Performs optimization and linking passes."""
         if not self._von_neumann:
             self._append_harvard_data() # Generate data loading code if needed
 
-        # 1. First pass: Determine addresses and add labels to context
-        self.traverse(LinkAddVisitor())
-
-        # 2. Optimize short constants (replace LDI with LDIs etc.)
-        self.traverse(OptimizerShort())
+        # The first pass adds the labels, which detects duplicates, and replaces
+        # long literal constants by their short versions (LDI with LDIs etc.).
+        # Everything depending on addresses is shortened once the labels are known
+        self.traverse(LinkOptimizeVisitor(), record_lines=False)
+        self._shorten_until_stable()
+        return self
 
-        # 3. Iteratively optimize jumps and update addresses
+    def _shorten_until_stable(self):
+        """Repeats shortening the remaining long instructions until no size changes.
+
+        Instead of traversing the whole program, each round recomputes the
+        addresses, updates the labels and re-examines only the instructions
+        whose constant depends on addresses. Shortening an instruction moves the
+        labels behind it, which can move the constant of an instruction shortened
+        before out of the short range, e.g. 'end - 28' may drop below 0. Such an
+        instruction goes back to its long form for good, so every instruction
+        changes at most twice and the rounds come to an end."""
+        prog = self._prog
+        context = self._context
+        # Resolve the label slots once, the rounds only store the new addresses
+        labels = [(i, context.slot_of(instr.label)) for i, instr in enumerate(prog) if instr.label]
+        # Long opcode of every instruction which may be shortened
+        long_ops = {i: instr.opcode for i, instr in enumerate(prog)
+                    if type(instr) is Instruction and has_short_form(instr)}
+        work = list(long_ops)
+        # Only shortening changes a size and .org addresses never change, so the
+        # rounds work on these arrays instead of the instruction objects
+        orgs = [(i, instr.abs_addr) for i, instr in enumerate(prog) if instr.abs_addr >= 0]
+        sizes = [instr.size for instr in prog]
+        sizes.extend((0, 0)) # Past the end of the program
         while True:
-            # Update labels based on potentially changed instruction sizes
-            self.traverse(LinkSetVisitor())
-            # Try to optimize long jumps to short jumps
-            jmp_optimizer = OptimizerJmp()
-            self.traverse(jmp_optimizer)
-            if not jmp_optimizer.was_optimized:
-                break # No more jump optimizations possible
-
-        # 4. Final pass to set correct addresses for code generation
-        self.traverse(LinkSetVisitor())
-        return self
+            addrs = self._instruction_addresses(sizes, orgs)
+            for i, slot in labels:
+                context.set_slot(slot, addrs[i])
+            if not work:
+                break
+
+            changed = False
+            pending = []
+            for i in work:
+                instr = prog[i]
+                addr = addrs[i]
+                next_addr = addr + sizes[i]
+                skip_addr = next_addr + sizes[i + 1]
+                context.set_instr_addrs(addr, next_addr, skip_addr, skip_addr + sizes[i + 2])
+                long_op = long_ops[i]
+                if instr.opcode != long_op:
+                    if lengthen(instr, long_op, context):
+                        sizes[i] = instr.size
+                        changed = True
+                        continue # Stays long, the long form takes every value
+                elif shorten(instr, context):
+                    sizes[i] = instr.size
+                    changed = True
+                if type(instr.constant) is not Constant or long_op == Opcode.JMP:
+                    pending.append(i) # Literal constants never change, unlike addresses
+            work = pending
+            if not changed:
+                break # Labels were set from the final sizes
+        self._record_lines(addrs)
+
+    def _record_lines(self, addrs: List[int]):
+        """Rebuilds the address to line number map from the final instruction addresses."""
+        addr_lines = self._addr_lines
+        del addr_lines[:]
+        if addrs:
+            addr_lines.extend([-1] * (addrs[-1] + 1)) # .org only moves forward
+        for addr, instr in zip(addrs, self._prog):
+            addr_lines[addr] = instr.line_number
+
+    def _instruction_addresses(self, sizes: List[int], orgs: List[Tuple[int, int]]) -> List[int]:
+        """Returns the address of every instruction, following .org like traverse does.
+        orgs holds the index and address of every instruction with an absolute address."""
+        addrs: List[int] = []
+        start = 0
+        addr = 0
+        for index, abs_addr in orgs:
+            addrs.extend(accumulate(sizes[start:index], initial=addr))
+            addrs.pop() # The address after the run, replaced by the .org address
+            start = index
+            addr = abs_addr
+        addrs.extend(accumulate(sizes[start:len(self._prog)], initial=addr))
+        addrs.pop()
+        return addrs
+
+    def create_memory_image(self) -> MemoryImage:
+        """Generates the machine code of the linked program into a dense memory image."""
+        image = MemoryImage()
+        self.traverse(MemoryImageBuilder(image))
+        return image
 
     def __str__(self) -> str:
         return "\n".join(str(i) for i in self._prog) + "\n"
 
     def write_addr_list(self, filename: str):
-        """Writes a map file (address -> line number) in JSON format."""
-        # Sort by address for readability
-        sorted_map = sorted(self._addr_to_line_map.items())
-        try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("[\n")
-                first = True
-                for addr, line in sorted_map:
-                    if line > 0: # Only include lines with actual source mapping
-                        if not first:
-                            f.write(",\n")
-                        f.write(f'  {{"addr":{addr},"line":{line}}}')
-                        first = False
-                f.write("\n]\n")
-        except IOError as e:
-             print(f"Error writing address list file {filename}: {e}")
+        """Writes a map file (address -> line number) in JSON format.
+        Raises OSError if the file cannot be written, like the hex and listing output."""
+        # The map is indexed by address, so it is in address order already
+        entries = [f'  {{"addr":{addr},"line":{line}}}' for addr, line in enumerate(self._addr_lines)
+                   if line > 0] # Only include lines with actual source mapping
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write("[\n" + ",\n".join(entries) + "\n]\n")
 
 
+# Sign of the constant of the instructions which add a constant to a register
+_ADJUST_SIGN = {Opcode.ADDI: 1, Opcode.ADDIs: 1, Opcode.SUBI: -1, Opcode.SUBIs: -1}
+
+def _sp_delta(i: Instruction) -> Optional[int]:
+    """Returns the literal amount the instruction adds to SP, or None if it is no such adjustment."""
+    sign = _ADJUST_SIGN.get(i.opcode)
+    if sign is None or i.dest_reg != Register.SP or type(i.constant) is not Constant:
+        return None
+    return sign * i.constant.get_value(None)
+
 # --- Visitor Implementations (nested or separate classes) ---
-class LinkAddVisitor(InstructionVisitor):
-    """Visitor to add labels to the context during the first pass."""
+class LinkOptimizeVisitor(OptimizerCombined):
+    """Visitor which adds the labels to the context and optimizes in the same pass.
+    Only literal constants are shortened here. Labels and the relative offsets of
+    jumps are not final yet, so instructions depending on addresses are left to
+    the later rounds."""
     def visit(self, instruction: InstructionInterface, context: Context) -> bool:
         if instruction.label:
             context.add_identifier(instruction.label, context.instr_addr)
+        if (type(instruction) is Instruction and type(instruction.constant) is Constant
+                and instruction.opcode != Opcode.JMP):
+            return super().visit(instruction, context)
         return True
-
-class LinkSetVisitor(InstructionVisitor):
-    """Visitor to update label addresses in the context."""
-    def visit(self, instruction: InstructionInterface, context: Context) -> bool:
-        if instruction.label:
-            # Use set_identifier to allow updates after optimization changed sizes
-            context.set_identifier(instruction.label, context.instr_addr)
-        return True
-
-
@@ -20,11 +20,14 @@ class Register(Enum):
 
     @classmethod
     def parse_str(cls, name: str) -> 'Register | None':
-        try:
-            return cls[name.upper()]
-        except KeyError:
-            return None
+        reg = _REG_BY_NAME.get(name)
+        if reg is None:
+            reg = _REG_BY_NAME.get(name.upper()) # Mixed case
+        return reg
 
     def __str__(self) -> str:
         return self.name
 
+# Registers by upper and lower case name, the usual spellings need no case conversion
+_REG_BY_NAME = {r.name: r for r in Register}
+_REG_BY_NAME.update({r.name.lower(): r for r in Register})
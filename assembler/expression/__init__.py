@@ -1,6 +1,6 @@
 from .not_op import NotOp
 from .neg import Neg
-from .expression import Expression
+from .expression import Expression, Evaluator
 from .operate import Operation, Operate
 from .context import Context
 from .identifier import Identifier
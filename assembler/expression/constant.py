@@ -1,10 +1,18 @@
 import math
 from typing import Optional
-from .expression import Expression
+from .expression import Expression, Evaluator
 from .context import Context
 
+# Escape special characters for string representation
+_ESCAPE_MAP = {
+        '\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b',
+        '\'': '\\\'', '\"': '\\"', '\\': '\\\\', '\0': '\\0' # Add explicit handling for \0
+        }
+
 class Constant(Expression):
     """Represents a constant integer or character value."""
+    __slots__ = ('_value', '_is_char')
+
     def __init__(self, value: int | str):
         if isinstance(value, str):
             if len(value) != 1:
@@ -23,22 +31,29 @@ class Constant(Expression):
     def get_value(self, context: Optional[Context]) -> int:
         return self._value
 
+    def try_get_value(self, context: Optional[Context]) -> Optional[int]:
+        return self._value
+
+    def compile(self) -> Evaluator:
+        value = self._value
+        return lambda context: value
+
+    @property
+    def is_char(self) -> bool:
+        """True if the constant was given as a character literal."""
+        return self._is_char
+
     def __str__(self) -> str:
-        if self._is_char:
-            char = chr(self._value)
-            # Escape special characters for string representation
-            escape_map = {
-                    '\n': '\\n', '\r': '\\r', '\t': '\\t', '\b': '\\b',
-                    '\'': '\\\'', '\"': '\\"', '\\': '\\\\', '\0': '\\0' # Add explicit handling for \0
-                    }
-            if char in escape_map:
-                return f"'{escape_map[char]}'"
-            elif 32 <= self._value < 127: # Printable ASCII
-                return f"'{char}'"
-            else: # Other non-printable or non-ASCII
-                return f"'\\x{self._value:02x}'" # Represent as hex escape
-        else:
+        if not self._is_char:
             return str(self._value)
+        char = chr(self._value)
+        escaped = _ESCAPE_MAP.get(char)
+        if escaped is not None:
+            return f"'{escaped}'"
+        elif 32 <= self._value < 127: # Printable ASCII
+            return f"'{char}'"
+        else: # Other non-printable or non-ASCII
+            return f"'\\x{self._value:02x}'" # Represent as hex escape
 
     def __repr__(self) -> str:
         return f"Constant({self.__str__()})"
@@ -1,9 +1,11 @@
 from .expression_exception import ExpressionException
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 class Context:
     """The context needed to evaluate an expression, holding identifiers and the current address."""
+    __slots__ = ('_values', '_instr_addr', '_slots', '_names')
+
     # Static identifiers (class variables)
     SKIP_ADDR = "_SKIP_ADDR_"
     NEXT_ADDR = "_NEXT_ADDR_"
@@ -11,24 +13,55 @@ class Context:
     ADDR = "_ADDR_"
 
     def __init__(self):
-        self._identifier: Dict[str, int] = {}
+        # Every identifier name (lower case) is interned to a slot index of this context,
+        # so an Identifier can look up its slot once and index the values directly.
+        # _slots also maps every spelling seen so far, so known names are found without lower()
+        self._slots: Dict[str, int] = dict(_SPECIAL_SLOTS)
+        self._names: List[str] = list(_SPECIAL_NAMES)
+        # Only the special slots, the others are added when they are set
+        self._values: List[Optional[int]] = [None] * _SPECIAL_SLOT_COUNT
         self._instr_addr: int = 0
-        self._identifier[Context.ADDR.lower()] = 0 # Initialize ADDR
+        self._values[_ADDR_SLOT] = 0 # Initialize ADDR
+
+    def slot_of(self, name: str) -> int:
+        """Returns the slot index of the named value (case-insensitive) in this context."""
+        slots = self._slots
+        slot = slots.get(name)
+        if slot is None:
+            key = name.lower()
+            slot = slots.get(key)
+            if slot is None:
+                slot = slots[key] = len(self._names)
+                self._names.append(key)
+            slots[name] = slot
+        return slot
 
     def get(self, name: str) -> int:
         """Returns the named value."""
-        key = name.lower() # Convert to lower case for lookup
-        value = self._identifier.get(key)
-        if value is None:
-            # Keep original case in error message
-            raise ExpressionException(f"'{name}' not found")
-        return value
+        return self.get_slot(self.slot_of(name), name)
+
+    def get_slot(self, slot: int, name: str) -> int:
+        """Returns the value in the given slot, name is only used for the error message."""
+        values = self._values
+        if slot < len(values):
+            value = values[slot]
+            if value is not None:
+                return value
+        # Keep original case in error message
+        raise ExpressionException(f"'{name}' not found")
 
+    def lookup(self, name: str) -> Optional[int]:
+        """Returns the named value, or None if it is not defined."""
+        return self.lookup_slot(self.slot_of(name))
+
+    def lookup_slot(self, slot: int) -> Optional[int]:
+        """Returns the value in the given slot, or None if it is not defined."""
+        values = self._values
+        return values[slot] if slot < len(values) else None
 
     def add_identifier(self, name: str, value: int) -> 'Context':
         """Adds an identifier (case-insensitive). Raises error if exists with a different value."""
-        key = name.lower() # Convert to lower case
-        existing_value = self._identifier.get(key)
+        existing_value = self.lookup(name)
         if existing_value is not None and existing_value != value:
             # Show original case in error message
             raise ExpressionException(f"Label '{name}' defined twice (case-insensitive) with different values: {existing_value} and {value}")
@@ -36,17 +69,32 @@ class Context:
 
     def set_identifier(self, name: str, value: int) -> 'Context':
         """Sets a named value (case-insensitive), overwriting if it exists."""
-        key = name.lower() # Convert to lower case
-        self._identifier[key] = value
-        # Update special identifiers case-insensitively too
-        if name == Context.ADDR: self._instr_addr = value
+        return self.set_slot(self.slot_of(name), value)
+
+    def set_slot(self, slot: int, value: int) -> 'Context':
+        """Sets the value in the given slot, overwriting if it exists."""
+        values = self._values
+        if slot >= len(values):
+            values.extend([None] * (slot + 1 - len(values)))
+        values[slot] = value
+        if slot == _ADDR_SLOT: self._instr_addr = value
         return self
 
     def set_instr_addr(self, instr_addr: int) -> 'Context':
         """Sets the address of the actual instruction."""
         self._instr_addr = instr_addr
-        # Use set_identifier to handle case correctly
-        return self.set_identifier(Context.ADDR, instr_addr)
+        self._values[_ADDR_SLOT] = instr_addr
+        return self
+
+    def set_instr_addrs(self, instr_addr: int, next_addr: int, skip_addr: int, skip2_addr: int) -> 'Context':
+        """Sets the address of the actual instruction and the addresses of the following ones."""
+        values = self._values
+        values[_ADDR_SLOT] = instr_addr
+        values[_NEXT_ADDR_SLOT] = next_addr
+        values[_SKIP_ADDR_SLOT] = skip_addr
+        values[_SKIP2_ADDR_SLOT] = skip2_addr
+        self._instr_addr = instr_addr
+        return self
 
     @property
     def instr_addr(self) -> int:
@@ -54,4 +102,11 @@ class Context:
         return self._instr_addr
 
     def __str__(self) -> str:
-        return f"Context(addr={self._instr_addr}, identifiers={self._identifier})"
+        identifiers = {self._names[slot]: value for slot, value in enumerate(self._values) if value is not None}
+        return f"Context(addr={self._instr_addr}, identifiers={identifiers})"
+
+# The special identifiers get the first slots of every context
+_SPECIAL_NAMES = [name.lower() for name in (Context.ADDR, Context.NEXT_ADDR, Context.SKIP_ADDR, Context.SKIP2_ADDR)]
+_SPECIAL_SLOTS = {name: slot for slot, name in enumerate(_SPECIAL_NAMES)}
+_ADDR_SLOT, _NEXT_ADDR_SLOT, _SKIP_ADDR_SLOT, _SKIP2_ADDR_SLOT = range(len(_SPECIAL_NAMES))
+_SPECIAL_SLOT_COUNT = len(_SPECIAL_NAMES)
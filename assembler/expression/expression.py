@@ -3,10 +3,15 @@ from .context import Context
 from .expression_exception import ExpressionException
 
 
-from typing import Optional
+from typing import Optional, Callable
+
+# A compiled expression, evaluates it in the given context
+Evaluator = Callable[[Optional[Context]], int]
 
 class Expression(ABC):
     """Base class for all expressions."""
+    __slots__ = ()
+
     @abstractmethod
     def get_value(self, context: Optional[Context]) -> int:
         """
@@ -15,6 +20,17 @@ class Expression(ABC):
         """
         pass
 
+    def try_get_value(self, context: Optional[Context]) -> Optional[int]:
+        """Returns the integer value of this expression, or None if it cannot be evaluated yet."""
+        try:
+            return self.get_value(context)
+        except ExpressionException:
+            return None
+
+    def compile(self) -> Evaluator:
+        """Returns a function which evaluates this expression like get_value does."""
+        return self.get_value
+
     @abstractmethod
     def __str__(self) -> str:
         pass
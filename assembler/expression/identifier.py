@@ -1,19 +1,51 @@
-from typing import Optional
-from .expression import Expression
+from typing import List, Optional
+from .expression import Expression, Evaluator
 from .context import Context
 from .expression_exception import ExpressionException
 
 class Identifier(Expression):
     """Represents an identifier (label or variable name) in an expression."""
+    __slots__ = ('name', '_names', '_slot')
+
     def __init__(self, name: str):
         if not name:
             raise ValueError("Identifier name cannot be empty")
         self.name = name
+        # Slot of the name in the context whose name table is _names
+        self._names: Optional[List[str]] = None
+        self._slot: int = -1
+
+    def _slot_in(self, context: Context) -> int:
+        """Returns the slot of the name in the context, resolved again for another name table."""
+        names = context._names
+        if self._names is not names:
+            self._slot = context.slot_of(self.name)
+            self._names = names
+        return self._slot
 
     def get_value(self, context: Optional[Context]) -> int:
         if context is None:
             raise ExpressionException(f"Context required to evaluate identifier '{self.name}'")
-        return context.get(self.name)
+        return context.get_slot(self._slot_in(context), self.name)
+
+    def compile(self) -> Evaluator:
+        name = self.name
+        ident = self
+        def evaluate(context: Optional[Context]) -> int:
+            if context is None:
+                raise ExpressionException(f"Context required to evaluate identifier '{name}'")
+            # Inlined check of _slot_in, the slot is almost always resolved already
+            slot = ident._slot if ident._names is context._names else ident._slot_in(context)
+            # Inlined lookup_slot, get_slot only raises the error for undefined names
+            values = context._values
+            value = values[slot] if slot < len(values) else None
+            return value if value is not None else context.get_slot(slot, name)
+        return evaluate
+
+    def try_get_value(self, context: Optional[Context]) -> Optional[int]:
+        if context is None:
+            return None
+        return context.lookup_slot(self._slot_in(context))
 
     def __str__(self) -> str:
         return self.name
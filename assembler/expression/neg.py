@@ -1,17 +1,39 @@
 from typing import Optional
-from .expression import Expression
+from .expression import Expression, Evaluator
 from .context import Context
 from .expression_exception import ExpressionException
 from .operate import Operate # For check_brace
+from .constant import Constant
 
 class Neg(Expression):
     """Expression which negates another expression."""
+    __slots__ = ('value',)
+
     def __init__(self, value: Expression):
         self.value = value
 
+    @staticmethod
+    def of(value: Expression) -> Expression:
+        """Returns the negation of value, folded into a constant if value is a positive number.
+        Other operands are kept in a Neg, so the expression prints as written."""
+        if type(value) is Constant and not value.is_char and value.get_value(None) > 0:
+            return Constant(-value.get_value(None))
+        return Neg(value)
+
     def get_value(self, context: Optional[Context]) -> int:
         return -self.value.get_value(context)
 
+    def try_get_value(self, context: Optional[Context]) -> Optional[int]:
+        value = self.value.try_get_value(context)
+        return None if value is None else -value
+
+    def compile(self) -> Evaluator:
+        folded = self.try_get_value(None)
+        if folded is not None:
+            return lambda context: folded # Independent of the context
+        value = self.value.compile()
+        return lambda context: -value(context)
+
     def __str__(self) -> str:
         return f"-{Operate.check_brace(self.value)}"
 
@@ -1,11 +1,13 @@
 from typing import Optional
-from .expression import Expression
+from .expression import Expression, Evaluator
 from .context import Context
 from .expression_exception import ExpressionException
 from .operate import Operate # For check_brace
 
 class NotOp(Expression): # Renamed from Not to avoid conflict
     """Performs a bitwise not on an expression."""
+    __slots__ = ('value',)
+
     def __init__(self, value: Expression):
         self.value = value
 
@@ -13,6 +15,17 @@ class NotOp(Expression): # Renamed from Not to avoid conflict
         # Python's ~ operator works correctly for two's complement bitwise NOT
         return ~self.value.get_value(context)
 
+    def try_get_value(self, context: Optional[Context]) -> Optional[int]:
+        value = self.value.try_get_value(context)
+        return None if value is None else ~value
+
+    def compile(self) -> Evaluator:
+        folded = self.try_get_value(None)
+        if folded is not None:
+            return lambda context: folded # Independent of the context
+        value = self.value.compile()
+        return lambda context: ~value(context)
+
     def __str__(self) -> str:
         return f"~{Operate.check_brace(self.value)}"
 
@@ -1,6 +1,7 @@
+import operator
 from enum import Enum
-from typing import Optional
-from .expression import Expression
+from typing import Optional, Callable, Dict
+from .expression import Expression, Evaluator
 from .context import Context
 from .expression_exception import ExpressionException
 
@@ -17,30 +18,55 @@ class Operation(Enum):
     def op_str(self) -> str:
         return self.value
 
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise ExpressionException("Division by zero")
+    # Integer division
+    return a // b
+
+# Implementation of each operation
+_OP_TABLE: Dict[Operation, Callable[[int, int], int]] = {
+    Operation.OR: operator.or_,
+    Operation.AND: operator.and_,
+    Operation.XOR: operator.xor,
+    Operation.ADD: operator.add,
+    Operation.SUB: operator.sub,
+    Operation.MUL: operator.mul,
+    Operation.DIV: _div,
+}
+
 class Operate(Expression):
     """Represents a binary operation between two expressions."""
+    __slots__ = ('a', 'op', 'b', '_fn')
+
     def __init__(self, a: Expression, op: Operation, b: Expression):
         self.a = a
         self.op = op
         self.b = b
+        self._fn = _OP_TABLE.get(op)
+        if self._fn is None:
+            raise ExpressionException(f"Operation {op} not supported!")
 
     def get_value(self, context: Optional[Context]) -> int:
-        av = self.a.get_value(context)
-        bv = self.b.get_value(context)
-        match self.op:
-            case Operation.OR:  return av | bv
-            case Operation.AND: return av & bv
-            case Operation.XOR: return av ^ bv
-            case Operation.ADD: return av + bv
-            case Operation.SUB: return av - bv
-            case Operation.MUL: return av * bv
-            case Operation.DIV:
-                if bv == 0:
-                    raise ExpressionException("Division by zero")
-                # Integer division
-                return av // bv
-        # Should not happen if enum is exhaustive
-        raise ExpressionException(f"Operation {self.op.name} not supported!")
+        return self._fn(self.a.get_value(context), self.b.get_value(context))
+
+    def try_get_value(self, context: Optional[Context]) -> Optional[int]:
+        a = self.a.try_get_value(context)
+        if a is None:
+            return None
+        b = self.b.try_get_value(context)
+        if b is None or (b == 0 and self.op is Operation.DIV):
+            return None
+        return self._fn(a, b)
+
+    def compile(self) -> Evaluator:
+        folded = self.try_get_value(None)
+        if folded is not None:
+            return lambda context: folded # Independent of the context
+        a = self.a.compile()
+        b = self.b.compile()
+        fn = self._fn
+        return lambda context: fn(a(context), b(context))
 
     @staticmethod
     def check_brace(expr: Expression) -> str:
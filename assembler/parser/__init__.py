@@ -1,4 +1,4 @@
 # This file can be empty or expose elements
-from .parser import Parser
+from .parser import Parser, read_source
 from .parser_exception import ParserException
 from .macro import Macro
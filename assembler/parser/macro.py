@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 class Macro(ABC):
     """Abstract base class for assembler macros (pseudo-instructions)."""
+    __slots__ = ('_name', '_args', '_description')
+
     def __init__(self, name: str, args: MnemonicArguments, description: str):
         self._name = name
         self._args = args
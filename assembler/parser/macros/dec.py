@@ -1,7 +1,19 @@
+from typing import TYPE_CHECKING
 from assembler.asm import Program, InstructionBuilder, Register, Opcode, InstructionException, MnemonicArguments
+from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
 from ..macro import Macro
+
+if TYPE_CHECKING:
+    from ..parser import Parser
+
+# Prototype instructions, the program gets clones as it sets labels and line numbers on them
+_DEC = {r: InstructionBuilder(Opcode.SUBIs).set_dest(r).set_constant_int(1).build() for r in Register}
+# Macro descriptions for the listing, by register
+_DESCRIPTIONS = {r: f"DEC {r.name}" for r in Register}
+
 class Dec(Macro):
-    def __init__(self): from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP; super().__init__("DEC", MNEMONIC_ARG_LOOKUP['DEST'], "decreases the given register by one")
+    __slots__ = ()
+    def __init__(self):
+        super().__init__("DEC", MNEMONIC_ARG_LOOKUP['DEST'], "decreases the given register by one")
     def parse_macro(self, p: Program, name: str, parser: 'Parser'):
-        from ..parser import Parser
-        r = parser.parse_reg(); p.set_pending_macro_description(f"{self.name} {r.name}"); p.add(InstructionBuilder(Opcode.SUBIs).set_dest(r).set_constant_int(1).build())
+        r = parser.parse_reg(); p.set_pending_macro_description(_DESCRIPTIONS[r]); p.add(_DEC[r].clone())
@@ -1,15 +1,26 @@
+from typing import TYPE_CHECKING
 from assembler.asm import Program, InstructionBuilder, Register, Opcode, MnemonicArguments
+from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
 from ..macro import Macro
+
+if TYPE_CHECKING:
+    from ..parser import Parser
+
+# Prototype instructions, the program gets clones as it sets labels and line numbers on them
+_STORE_R0 = InstructionBuilder(Opcode.STD).set_dest(Register.SP).set_source(Register.R0).set_constant_int(-1).build()
+_READ_FLAGS = InstructionBuilder(Opcode.IN).set_dest(Register.R0).set_constant_int(0).build()
+_STORE_FLAGS = InstructionBuilder(Opcode.STD).set_dest(Register.SP).set_source(Register.R0).set_constant_int(-2).build()
+_DEC_SP = InstructionBuilder(Opcode.SUBIs).set_dest(Register.SP).set_constant_int(2).build()
+
 class EnterISR(Macro):
-    def __init__(self): from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP; super().__init__("ENTERI", MNEMONIC_ARG_LOOKUP['NOTHING'], "pushes R0 and the flags to the stack")
+    __slots__ = ()
+    def __init__(self):
+        super().__init__("ENTERI", MNEMONIC_ARG_LOOKUP['NOTHING'], "pushes R0 and the flags to the stack")
     def parse_macro(self, p: Program, name: str, parser: 'Parser'):
-        from ..parser import Parser
         p.set_pending_macro_description(self.name)
-        # STD [SP-1], R0  -- Store R0 first
-        p.add(InstructionBuilder(Opcode.STD).set_dest(Register.SP).set_source(Register.R0).set_constant_int(-1).build())
-        # IN R0, 0        -- Read flags from IO port 0 into R0
-        p.add(InstructionBuilder(Opcode.IN).set_dest(Register.R0).set_constant_int(0).build())
-        # STD [SP-2], R0  -- Store flags
-        p.add(InstructionBuilder(Opcode.STD).set_dest(Register.SP).set_source(Register.R0).set_constant_int(-2).build())
-        # SUBI SP, 2      -- Adjust stack pointer
-        p.add(InstructionBuilder(Opcode.SUBIs).set_dest(Register.SP).set_constant_int(2).build())
+        p.extend([
+            _STORE_R0.clone(),    # STD [SP-1], R0  -- Store R0 first
+            _READ_FLAGS.clone(),  # IN R0, 0        -- Read flags from IO port 0 into R0
+            _STORE_FLAGS.clone(), # STD [SP-2], R0  -- Store flags
+            _DEC_SP.clone(),      # SUBI SP, 2      -- Adjust stack pointer
+        ])
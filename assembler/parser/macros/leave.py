@@ -1,10 +1,20 @@
+from typing import TYPE_CHECKING
 from assembler.asm import Program, InstructionBuilder, Register, Opcode, MnemonicArguments
+from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
 from ..macro import Macro
 from .pop import pop_instruction
+
+if TYPE_CHECKING:
+    from ..parser import Parser
+
+# Prototype instructions, the program gets clones as it sets labels and line numbers on them
+_RESTORE_SP = InstructionBuilder(Opcode.MOV).set_dest(Register.SP).set_source(Register.BP).build()
+
 class Leave(Macro):
-    def __init__(self): from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP; super().__init__("LEAVE", MNEMONIC_ARG_LOOKUP['NOTHING'], "moves BP to SP and pops BP from the stack")
+    __slots__ = ()
+    def __init__(self):
+        super().__init__("LEAVE", MNEMONIC_ARG_LOOKUP['NOTHING'], "moves BP to SP and pops BP from the stack")
     def parse_macro(self, p: Program, name: str, parser: 'Parser'):
-        from ..parser import Parser
         p.set_pending_macro_description(self.name)
-        p.add(InstructionBuilder(Opcode.MOV).set_dest(Register.SP).set_source(Register.BP).build())
+        p.add(_RESTORE_SP.clone())
         pop_instruction(Register.BP, p)
@@ -1,16 +1,28 @@
+from typing import TYPE_CHECKING
 from assembler.asm import Program, InstructionBuilder, Register, Opcode, MnemonicArguments
+from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
 from ..macro import Macro
+
+if TYPE_CHECKING:
+    from ..parser import Parser
+
+# Prototype instructions, the program gets clones as it sets labels and line numbers on them
+_INC_SP = InstructionBuilder(Opcode.ADDIs).set_dest(Register.SP).set_constant_int(2).build()
+_LOAD_FLAGS = InstructionBuilder(Opcode.LDD).set_dest(Register.R0).set_source(Register.SP).set_constant_int(-2).build()
+_WRITE_FLAGS = InstructionBuilder(Opcode.OUT).set_source(Register.R0).set_constant_int(0).build()
+_LOAD_R0 = InstructionBuilder(Opcode.LDD).set_dest(Register.R0).set_source(Register.SP).set_constant_int(-1).build()
+
 class LeaveISR(Macro):
-    def __init__(self): from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP; super().__init__("LEAVEI", MNEMONIC_ARG_LOOKUP['NOTHING'], "pops R0 and the flags from the stack")
+    __slots__ = ()
+    def __init__(self):
+        super().__init__("LEAVEI", MNEMONIC_ARG_LOOKUP['NOTHING'], "pops R0 and the flags from the stack")
     def parse_macro(self, p: Program, name: str, parser: 'Parser'):
-        from ..parser import Parser
         p.set_pending_macro_description(self.name)
         # ADDI SP, 2       -- Adjust stack pointer first
-        p.add(InstructionBuilder(Opcode.ADDIs).set_dest(Register.SP).set_constant_int(2).build())
-        # LDD R0, [SP-2]   -- Load flags from stack into R0 (address is now relative to adjusted SP)
-        p.add(InstructionBuilder(Opcode.LDD).set_dest(Register.R0).set_source(Register.SP).set_constant_int(-2).build())
-        # OUT 0, R0        -- Write flags to IO port 0
-        p.add(InstructionBuilder(Opcode.OUT).set_source(Register.R0).set_constant_int(0).build())
-        # LDD R0, [SP-1]   -- Load original R0 from stack
-        p.add(InstructionBuilder(Opcode.LDD).set_dest(Register.R0).set_source(Register.SP).set_constant_int(-1).build())
+        p.add_sp_adjust(_INC_SP.clone())
+        p.extend([
+            _LOAD_FLAGS.clone(),  # LDD R0, [SP-2]   -- Load flags from stack into R0 (address is now relative to adjusted SP)
+            _WRITE_FLAGS.clone(), # OUT 0, R0        -- Write flags to IO port 0
+            _LOAD_R0.clone(),     # LDD R0, [SP-1]   -- Load original R0 from stack
+        ])
 
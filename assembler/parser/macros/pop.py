@@ -1,24 +1,33 @@
+from typing import TYPE_CHECKING
 import io
 from assembler.asm import Program, InstructionBuilder, Register, Opcode, InstructionException, MnemonicArguments
+from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
 from assembler.expression import ExpressionException, Constant
 from ..macro import Macro
 from ..parser_exception import ParserException
 
+if TYPE_CHECKING:
+    from ..parser import Parser
+
+# Prototype instructions, the program gets clones as it sets labels and line numbers on them
+_LOAD = {r: InstructionBuilder(Opcode.LD).set_dest(r).set_source(Register.SP).build() for r in Register}
+# Macro descriptions for the listing, by register
+_DESCRIPTIONS = {r: f"POP {r.name}" for r in Register}
+_INC_SP = InstructionBuilder(Opcode.ADDIs).set_dest(Register.SP).set_constant_int(1).build()
+
 def pop_instruction(reg: Register, p: Program):
     """Helper function to generate POP instructions."""
-    p.add(InstructionBuilder(Opcode.LD).set_dest(reg).set_source(Register.SP).build())
-    p.add(InstructionBuilder(Opcode.ADDIs).set_dest(Register.SP).set_constant_int(1).build())
+    p.extend([_LOAD[reg].clone(), _INC_SP.clone()])
 
 class Pop(Macro):
+    __slots__ = ()
     def __init__(self):
-        from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
         super().__init__("POP", MNEMONIC_ARG_LOOKUP['DEST'],
                          "copy value from the stack to the given register, adds one to the stack pointer")
 
     def parse_macro(self, p: Program, name: str, parser: 'Parser'):
-        from ..parser import Parser
         reg = parser.parse_reg()
-        p.set_pending_macro_description(f"{self.name} {reg.name}")
+        p.set_pending_macro_description(_DESCRIPTIONS[reg])
         pop_instruction(reg, p)
 
 # ... Create all other macro files similarly ...
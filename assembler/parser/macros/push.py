@@ -1,25 +1,34 @@
+from typing import TYPE_CHECKING
 import io
 from assembler.asm import Program, InstructionBuilder, Register, Opcode, InstructionException, MnemonicArguments
+from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
 from assembler.expression import ExpressionException, Constant
 from ..macro import Macro
 from ..parser_exception import ParserException
 
+if TYPE_CHECKING:
+    from ..parser import Parser
+
+# Prototype instructions, the program gets clones as it sets labels and line numbers on them
+_DEC_SP = InstructionBuilder(Opcode.SUBIs).set_dest(Register.SP).set_constant_int(1).build()
+_STORE = {r: InstructionBuilder(Opcode.ST).set_dest(Register.SP).set_source(r).build() for r in Register}
+# Macro descriptions for the listing, by register
+_DESCRIPTIONS = {r: f"PUSH {r.name}" for r in Register}
+
 def push_instruction(reg: Register, p: Program):
     """Helper function to generate PUSH instructions."""
-    p.add(InstructionBuilder(Opcode.SUBIs).set_dest(Register.SP).set_constant_int(1).build())
-    p.add(InstructionBuilder(Opcode.ST).set_dest(Register.SP).set_source(reg).build())
+    p.add_sp_adjust(_DEC_SP.clone())
+    p.add(_STORE[reg].clone())
 
 class Push(Macro):
+    __slots__ = ()
     def __init__(self):
-        # Need MnemonicArguments instance here
-        from assembler.asm.mnemonic_arguments import MNEMONIC_ARG_LOOKUP
         super().__init__("PUSH", MNEMONIC_ARG_LOOKUP['SOURCE'],
                          "copies the value in the given register to the stack, decreases the stack pointer by one")
 
     def parse_macro(self, p: Program, name: str, parser: 'Parser'):
-        from ..parser import Parser # Use '..' for relative import within package
         reg = parser.parse_reg()
-        p.set_pending_macro_description(f"{self.name} {reg.name}")
+        p.set_pending_macro_description(_DESCRIPTIONS[reg])
         push_instruction(reg, p)
 
 # (Create similar files for Pop, Call, Ret, Inc, Dec, Enter, Leave, SCall, EnterISR, LeaveISR)
@@ -1,10 +1,11 @@
-import io
 import os
 import re
+import sys
 
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import TextIO, Optional, Dict, Tuple, List, Type, Union
+from typing import TextIO, Optional, Dict, Tuple, List, Type, Union, Callable
 from enum import Enum, auto
 
 from assembler.asm import (
@@ -41,59 +42,108 @@ class TokenType(Enum):
 
 
 # --- Tokenizer ---
-# Simple regex-based tokenizer for this assembly language
+# Simple regex-based tokenizer for this assembly language.
+# Whitespace and newlines are skipped by the regex itself, every match is a significant
+# token. Line numbers are looked up from the positions of the newlines afterwards.
 TOKEN_SPEC = [
-    (TokenType.COMMENT, r';[^\r\n]*|/\*.*?\*/'), # Line comments or block comments
+    (TokenType.COMMENT, r';[^\r\n]*|/\*[^*]*(?:\*(?!/)[^*]*)*\*/'), # Line comments or block comments
     (TokenType.LABELDEF,r'([a-zA-Z_][a-zA-Z0-9_]*):'),# Label definition (ends with :)
-    (TokenType.STRING,  r'"([^"\\]*(?:\\.[^"\\]*)*)"'), # Double-quoted strings
-    (TokenType.CHAR,    r"'([^'\\]*(?:\\.[^'\\]*)*)'"), # Single-quoted char
+    (TokenType.STRING,  r'"([^"\\]*(?:\\[\s\S][^"\\]*)*)"'), # Double-quoted strings
+    (TokenType.CHAR,    r"'([^'\\]*(?:\\[\s\S][^'\\]*)*)'"), # Single-quoted char
     (TokenType.HEX,     r'0x[0-9a-fA-F]+'),           # Hexadecimal number
     (TokenType.BIN,     r'0b[01]+'),                  # Binary number
     (TokenType.DEC,     r'[0-9]+'),                   # Decimal number
     (TokenType.DOTCMD,  r'\.[a-zA-Z_]+'),             # Directive like .data, .org
     (TokenType.WORD,    r'[a-zA-Z_][a-zA-Z0-9_]*'),   # Identifiers, opcodes, registers
     (TokenType.OP,      r'[+\-*/&|^~()\[\],]'),       # Operators and punctuation
-    (TokenType.NEWLINE, r'[\r\n]+'),                  # Newline
-    (TokenType.SKIP,    r'[ \t]+'),                   # Skip whitespace
     (TokenType.MISMATCH,r'.'),                        # Any other character
 ]
-TOK_REGEX = '|'.join(f'(?P<{pair[0].name}>{pair[1]})' for pair in TOKEN_SPEC)
-
-@dataclass
+# A match without a group is the whitespace at the end of the code
+TOK_REGEX = r'[ \t\r\n]*(?:' + '|'.join(f'(?P<{pair[0].name}>{pair[1]})' for pair in TOKEN_SPEC) + r'|\Z)'
+TOK_RE = re.compile(TOK_REGEX, re.MULTILINE)
+NEWLINE_RE = re.compile(r'\n')
+# Token type of every group name in TOK_REGEX
+_GROUP_TO_TYPE: Dict[str, TokenType] = {pair[0].name: pair[0] for pair in TOKEN_SPEC}
+
+# Binary operators by token value: (precedence, operation), a higher precedence binds tighter
+_BINARY_OPS: Dict[str, Tuple[int, Operation]] = {
+    'or': (1, Operation.OR),   # Assumes 'or' is tokenized as WORD 'or'
+    'xor': (2, Operation.XOR), # Assumes 'xor' is tokenized as WORD 'xor'
+    'and': (3, Operation.AND), # Assumes 'and' is tokenized as WORD 'and'
+    '+': (4, Operation.ADD),
+    '-': (4, Operation.SUB),
+    '*': (5, Operation.MUL),
+    '/': (5, Operation.DIV),
+}
+
+@dataclass(slots=True)
 class Token:
     type: TokenType
     value: str
     line: int
     column: int
+    number: Optional[int] = None # Value of a HEX, BIN or DEC token
+
+# Base of the number tokens
+_NUMBER_BASES: Dict[TokenType, int] = {TokenType.DEC: 10, TokenType.HEX: 16, TokenType.BIN: 2}
+# Tokens whose values are interned, they are used as dict keys and compared against constants
+_INTERNED_TYPES = frozenset((TokenType.WORD, TokenType.DOTCMD, TokenType.OP))
 
+# Escaped form of every ASCII char for the comments of .data strings
+_ESCAPE_TABLE: List[str] = [chr(i) if 32 <= i < 127 else f"\\x{i:02x}" for i in range(128)]
+_ESCAPE_TABLE[ord('"')] = '\\"'
+_ESCAPE_TABLE[ord('\\')] = '\\\\'
+_ESCAPE_TABLE[ord('\n')] = '\\n'
+_ESCAPE_TABLE[ord('\r')] = '\\r'
+_ESCAPE_TABLE[ord('\t')] = '\\t'
 
 def tokenize(code: str) -> List[Token]:
-    line_num = 1
-    line_start = 0
+    # Start offset of every line, the line of a token is found by bisecting its offset
+    line_starts = [0]
+    line_starts.extend([mo.end() for mo in NEWLINE_RE.finditer(code)])
     tokens = []
-    for mo in re.finditer(TOK_REGEX, code, re.DOTALL | re.MULTILINE):
-        kind = TokenType.from_str(mo.lastgroup)
-        value = mo.group()
-        column = mo.start() - line_start
-        if kind == TokenType.NEWLINE:
-            line_start = mo.end()
-            line_num += value.count('\n')
-        elif kind == TokenType.SKIP: # Only skip whitespace
-            pass
-        elif kind == TokenType.MISMATCH:
+    # Locals for the loop, it runs once per token
+    append = tokens.append
+    group_to_type = _GROUP_TO_TYPE
+    number_bases = _NUMBER_BASES
+    interned_types = _INTERNED_TYPES
+    intern = sys.intern
+    MISMATCH = TokenType.MISMATCH
+    LABELDEF, STRING, CHAR = TokenType.LABELDEF, TokenType.STRING, TokenType.CHAR
+    for mo in TOK_RE.finditer(code):
+        group = mo.lastgroup
+        if group is None: # Trailing whitespace
+            break
+        kind = group_to_type[group]
+        start = mo.start(group)
+        value = mo.group(group)
+        line_num = bisect_right(line_starts, start)
+        if kind is MISMATCH:
             raise ParserException(f'Unexpected character: {value!r}', line_num)
+        number = None
+        if kind in interned_types: value = intern(value)
+        elif kind is LABELDEF: value = intern(value[:-1])
+        elif kind is STRING: value = value[1:-1].encode().decode('unicode_escape')
+        elif kind is CHAR:
+            value = value[1:-1].encode().decode('unicode_escape')
+            if len(value) != 1: raise ParserException(f"Invalid character literal: '{value}'", line_num)
         else:
-            # Handle specific token types (LABELDEF, STRING, CHAR) as before...
-            if kind == TokenType.LABELDEF: value = value[:-1]
-            elif kind == TokenType.STRING: value = value[1:-1].encode().decode('unicode_escape')
-            elif kind == TokenType.CHAR:
-                value = value[1:-1].encode().decode('unicode_escape')
-                if len(value) != 1: raise ParserException(f"Invalid character literal: '{value}'", line_num)
-
-            tokens.append(Token(kind, value, line_num, column))
-    tokens.append(Token(TokenType.EOF, '', line_num, 0))
+            base = number_bases.get(kind)
+            if base is not None:
+                number = int(value, base) # int() accepts the 0x/0b prefix of its base
+
+        append(Token(kind, value, line_num, start - line_starts[line_num - 1], number))
+    tokens.append(Token(TokenType.EOF, '', len(line_starts), 0))
     return tokens
 
+def read_source(path: str) -> str:
+    """Reads a source file in one binary read and decodes it, with newlines normalized like text mode does."""
+    with open(path, 'rb') as f:
+        code = f.read().decode('utf-8')
+    if '\r' in code:
+        code = code.replace('\r\n', '\n').replace('\r', '\n')
+    return code
+
 
 # --- Parser Directives ---
 class Directive(ABC):
@@ -109,9 +159,8 @@ class DReg(Directive):
     def __init__(self): super().__init__(".reg", "alias Rs", "Sets an alias name for a register.")
     def do_work(self, parser: 'Parser', program: Program):
         alias = parser.parse_word()
-        program.add_pending_comment(f" {alias}")
         reg = parser.parse_reg()
-        program.add_pending_comment(f" {reg.name}")
+        program.add_pending_comment(f" {alias}", f" {reg.name}")
         parser.regs_map[alias] = reg
 class DWord(Directive):
     def __init__(self): super().__init__(".word", "addr", "Reserves a single word in the RAM. Its address is stored in addr.")
@@ -167,10 +216,12 @@ class DData(Directive):
         ident = parser.parse_word()
         program.add_pending_comment(f" {ident}")
         program.add_data_label(ident) # CORRECTED method name
-        parser._read_data_value(program)
+        # The comments of the values are added at once, the pending comment is not rebuilt per value
+        comments = [parser._read_data_value(program)]
         while parser.check_and_consume(','):
-            program.add_pending_comment(", ")
-            parser._read_data_value(program)
+            comments.append(", ")
+            comments.append(parser._read_data_value(program))
+        program.add_pending_comment(*comments)
 
 class DConst(Directive):
     def __init__(self): super().__init__(".const", "ident const", "Creates the given constant.")
@@ -199,42 +250,61 @@ class DInclude(Directive):
          include_path = os.path.join(os.path.dirname(parser.base_file), filename)
          program.add_pending_comment(f"\n; <<< Included: {filename} >>>\n")
          try:
-             with open(include_path, 'r', encoding='utf-8') as f:
-                  # Create a new parser instance for the included file
-                  inc_parser = Parser(f, base_file=include_path, existing_program=program)
-                  # Parse into the *existing* program object
-                  inc_parser.parse_program()
+             # Create a new parser instance for the included file
+             inc_parser = Parser(None, base_file=include_path, existing_program=program,
+                                 tokens=DInclude._tokens_of(include_path, parser.include_tokens),
+                                 include_tokens=parser.include_tokens)
+             # Parse into the *existing* program object
+             inc_parser.parse_program()
          except FileNotFoundError:
               raise parser.make_parser_exception(f"Include file not found: {include_path}")
          except Exception as e:
               raise parser.make_parser_exception(f"Error parsing include file {filename}: {e}") from e
          program.add_pending_comment(f"\n; <<< End Include: {filename} >>>\n")
 
+     @staticmethod
+     def _tokens_of(include_path: str, cache: Dict[str, Tuple[Tuple[int, int], List[Token]]]) -> List[Token]:
+         """Returns the tokens of the file, a file included again is only tokenized if it changed.
+         The cache belongs to one top level parser and holds the tokens by real path, with the
+         modification time and size of the file they were read from."""
+         real_path = os.path.realpath(include_path)
+         st = os.stat(real_path)
+         stamp = (st.st_mtime_ns, st.st_size)
+         cached = cache.get(real_path)
+         if cached is not None and cached[0] == stamp:
+             return cached[1]
+         tokens = tokenize(read_source(real_path))
+         cache[real_path] = (stamp, tokens)
+         return tokens
+
 
 # --- Parser Class ---
 class Parser:
+    __slots__ = ('base_file', 'tokens', 'token_index', 'current_token', 'regs_map', 'program', 'include_tokens')
+
     # Class-level dictionaries for macros and directives
-    MACROS: Dict[str, Macro] = {m.name.lower(): m for m in ALL_MACROS}
+    MACROS: Dict[str, Macro] = {sys.intern(m.name.lower()): m for m in ALL_MACROS}
     DIRECTIVES: Dict[str, Directive] = {
-        d.name.lower(): d for d in [
+        sys.intern(d.name.lower()): d for d in [
             DReg(), DWord(), DLong(), DWords(), DOrg(), DDOrg(), DData(), DConst(), DInclude()
         ]
     }
 
-    def __init__(self, source: Union[TextIO, str], base_file: Optional[str] = None, existing_program: Optional[Program] = None):
-        if isinstance(source, str):
-            self.reader = io.StringIO(source)
-            self.code = source
-        else:
-            self.reader = source
-            self.code = self.reader.read() # Read whole content for regex tokenizer
-            self.reader.seek(0) # Reset reader if needed elsewhere (not needed for tokenize)
+    def __init__(self, source: Union[TextIO, str, None], base_file: Optional[str] = None, existing_program: Optional[Program] = None,
+                 tokens: Optional[List[Token]] = None,
+                 include_tokens: Optional[Dict[str, Tuple[Tuple[int, int], List[Token]]]] = None):
+        """Parses the source, or the given tokens of an already tokenized source.
+        include_tokens is the token cache of the included files, shared with the parsers of includes."""
+        if tokens is None:
+            # The regex tokenizer needs the whole content, the text is dropped once it is tokenized
+            tokens = tokenize(source if isinstance(source, str) else source.read())
 
         self.base_file = base_file
-        self.tokens: List[Token] = tokenize(self.code)
+        self.tokens: List[Token] = tokens
         self.token_index: int = 0
         self.current_token: Token = self.tokens[0] if self.tokens else Token(TokenType.EOF,'',0,0)
         self.regs_map: Dict[str, Register] = {} # For .reg directive
+        self.include_tokens = include_tokens if include_tokens is not None else {}
 
         # Use existing program or create a new one
         self.program = existing_program if existing_program is not None else Program()
@@ -248,12 +318,11 @@ class Parser:
 
     def advance(self):
         """Move to the next token."""
-        self.token_index += 1
-        if self.token_index < len(self.tokens):
-            self.current_token = self.tokens[self.token_index]
-        else:
-             # Should already be EOF, but handle gracefully if called again
-             self.current_token = self.tokens[-1] # Stay at EOF
+        i = self.token_index + 1
+        self.token_index = i
+        tokens = self.tokens
+        # Past the end it should already be EOF, but handle gracefully if called again
+        self.current_token = tokens[i] if i < len(tokens) else tokens[-1] # Stay at EOF
 
     def make_parser_exception(self, message: str) -> ParserException:
         """Create a ParserException with the current line number."""
@@ -289,24 +358,12 @@ class Parser:
         return self.current_token.type != TokenType.EOF and self.current_token.value == value
 
     def is_eol(self) -> bool:
-         """Check if the current token indicates end of line or file."""
-         # Our tokenizer skips NEWLINE, so check for EOF or next significant token's line
-         if self.current_token.type == TokenType.EOF:
+         """Check if the current token is not on the line of the token before it, or starts a comment."""
+         # The tokenizer drops the newlines, the line numbers of the tokens tell where a line ends
+         token = self.current_token
+         if token.type is TokenType.EOF or token.type is TokenType.COMMENT:
               return True
-         # Look ahead slightly - if next token is on a new line, consider current EOL
-         if self.token_index + 1 < len(self.tokens):
-              next_token = self.tokens[self.token_index] # Current token is the one we check
-              peek_token = self.tokens[self.token_index + 1]
-              # Is the *next* token on a different line?
-              # No, check current token. Tokenizer gives us significant tokens only.
-              # If the *previous* token was on a different line, maybe?
-              # Simplest: Assume EOL logic is handled by main parsing loop structure.
-              # The Java version used eolIsSignificant. Our tokenizer doesn't.
-              # We rely on the parsing loop structure. This function might not be needed
-              # or needs to be implemented based on line numbers if essential.
-              # Let's assume it checks if the *current* token is EOF for now.
-              return False # Only EOF is true EOL in this tokenizer setup
-         return False # Should not happen if EOF is last
+         return self.token_index > 0 and self.tokens[self.token_index - 1].line != token.line
 
 
     def _check_and_attach_comment(self, processed_line: int):
@@ -314,79 +371,69 @@ class Parser:
            as the item just processed and attaches it to the last added program item."""
         # Loop to consume all comments on the same line
         attached_comment = False
-        while self.current_token.type == TokenType.COMMENT and self.current_token.line == processed_line:
-            comment_value = self.current_token.value
-            self.program.attach_same_line_comment_to_last(comment_value)
+        token = self.current_token
+        while token.type is TokenType.COMMENT and token.line == processed_line:
+            self.program.attach_same_line_comment_to_last(token.value)
             self.advance() # Consume the comment token
+            token = self.current_token
             attached_comment = True
         return attached_comment
 
     def parse_program(self) -> Program:
         """Parses the entire program from the token stream."""
-        while self.current_token.type != TokenType.EOF:
-            token = self.current_token
-            self.program.set_line_number(token.line)
-
-            if token.type == TokenType.LABELDEF:
-                self.program.set_pending_label(token.value)
-                self.advance() # Consume label definition
-                label_line = token.line
-                self._check_and_attach_comment(label_line)
-                # Label might be on its own line, continue loop
-                continue
-
-            elif token.type == TokenType.DOTCMD:
-                 cmd = token.value.lower()
-                 directive = Parser.DIRECTIVES.get(cmd)
-                 if not directive:
-                      raise self.make_parser_exception(f"Unknown directive: {token.value}")
-                 self.program.add_pending_comment(f"\n {token.value}") # Log directive use
-                 self.advance() # Consume directive token
-                 directive.do_work(self, self.program)
-                 directive_line = token.line
-                 self._check_and_attach_comment(directive_line)
-                 # Directives usually consume the rest of their line implicitly
-
-            elif token.type == TokenType.COMMENT:
-                # Attach comment to the program's pending state
-                self.program.add_pending_comment(token.value)
-                self.advance()
-                continue # Comments can be on their own line
-
-            elif token.type == TokenType.WORD:
-                word = token.value
-                word_lower = word.lower()
-                opcode = Opcode.parse_str(word)
-                macro = Parser.MACROS.get(word_lower)
-                instruction_line = token.line
-
-
-                if opcode:
-                    self.advance() # Consume opcode
-                    self._parse_instruction(opcode)
-                    self._check_and_attach_comment(instruction_line)
-                elif macro:
-                    self.advance() # Consume macro name
-                    macro.parse_macro(self.program, macro.name, self)
-                    self._check_and_attach_comment(instruction_line)
-                else:
-                    # Should have been caught as LABELDEF if followed by ':'
-                    # Otherwise, it's an error here.
-                     raise self.make_parser_exception(f"Unexpected identifier: {word}. Expected opcode, macro, or directive.")
-
-            elif token.type == TokenType.EOF:
-                 break # Should be caught by loop condition, but safe check
-            else:
+        handlers = Parser._STATEMENT_HANDLERS
+        set_line_number = self.program.set_line_number
+        EOF = TokenType.EOF
+        while (token := self.current_token).type is not EOF:
+            set_line_number(token.line)
+            handler = handlers.get(token.type)
+            if handler is None:
                  # Might be punctuation left from previous parse, or unexpected token
                  raise self.make_parser_exception(f"Unexpected token: {token.type} '{token.value}'")
-
-            # After processing a line (instruction, directive, macro), expect EOF or implicitly handled newline
-            if self.current_token.type != TokenType.EOF:
-                 # Our tokenizer skips explicit newlines. If not EOF, it should be start of next item.
-                 pass
-
+            handler(self, token)
+            # Our tokenizer skips explicit newlines, the next token starts the next item
         return self.program
 
+    def _parse_labeldef(self, token: Token):
+        self.program.set_pending_label(token.value)
+        self.advance() # Consume label definition
+        self._check_and_attach_comment(token.line)
+        # Label might be on its own line
+
+    def _parse_directive(self, token: Token):
+        directive = Parser.DIRECTIVES.get(token.value)
+        if directive is None:
+            directive = Parser.DIRECTIVES.get(token.value.lower()) # Mixed or upper case
+        if not directive:
+             raise self.make_parser_exception(f"Unknown directive: {token.value}")
+        self.program.add_pending_comment(f"\n {token.value}") # Log directive use
+        self.advance() # Consume directive token
+        directive.do_work(self, self.program)
+        self._check_and_attach_comment(token.line)
+        # Directives usually consume the rest of their line implicitly
+
+    def _parse_comment(self, token: Token):
+        # Attach comment to the program's pending state, comments can be on their own line
+        self.program.add_pending_comment(token.value)
+        self.advance()
+
+    def _parse_word(self, token: Token):
+        word = token.value
+        opcode = Opcode.parse_str(word)
+        if opcode:
+            self.advance() # Consume opcode
+            self._parse_instruction(opcode)
+        else:
+            macro = Parser.MACROS.get(word)
+            if macro is None:
+                macro = Parser.MACROS.get(word.lower()) # Mixed or upper case
+            if not macro:
+                # Should have been caught as LABELDEF if followed by ':'
+                # Otherwise, it's an error here.
+                raise self.make_parser_exception(f"Unexpected identifier: {word}. Expected opcode, macro, or directive.")
+            self.advance() # Consume macro name
+            macro.parse_macro(self.program, macro.name, self)
+        self._check_and_attach_comment(token.line)
 
     def _parse_instruction(self, opcode: Opcode):
         """Parses a standard instruction after the opcode has been consumed."""
@@ -402,117 +449,65 @@ class Parser:
                  e.set_line_number(self.current_token.line)
             raise e # Re-raise exceptions
 
-    def _read_data_value(self, program: Program):
-         """Helper to parse a single value for .data directive."""
+    def _read_data_value(self, program: Program) -> str:
+         """Helper to parse a single value for .data directive. Returns the comment for the value."""
          if self.current_token.type == TokenType.STRING:
               text = self.current_token.value
-              program.add_pending_comment(f" \"{self._escape_text(text)}\"")
-              for char in text:
-                   program.add_data(ord(char))
+              program.add_data_bulk(map(ord, text))
               self.advance()
+              return f" \"{self._escape_text(text)}\""
          else:
               # Assume integer expression
               expr = self.parse_expression()
               try:
                    value = expr.get_value(program.context)
-                   program.add_pending_comment(f" {value}")
                    program.add_data(value)
+                   return f" {value}"
               except ExpressionException as e:
                    raise self.make_parser_exception(f"Could not evaluate .data value: {e}") from e
 
     def _escape_text(self, text: str) -> str:
          """Escape text for comments, similar to Java version."""
-         escaped = ""
-         for char in text:
-             val = ord(char)
-             if 32 <= val < 127:
-                  if char == '"': escaped += '\\"'
-                  elif char == '\\': escaped += '\\\\'
-                  else: escaped += char
-             else:
-                  escape_map = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
-                  escaped += escape_map.get(char, f"\\x{val:02x}")
-         return escaped
-
-    # --- Expression Parsing (Recursive Descent) ---
-    # Based on standard operator precedence: PAREN > NOT/NEG > MUL/DIV > ADD/SUB > AND > XOR > OR
+         table = _ESCAPE_TABLE
+         return "".join([table[val] if val < 128 else f"\\x{val:02x}" for val in map(ord, text)])
 
-    def parse_expression(self) -> Expression:
-        return self._parse_or()
-
-    def _parse_or(self) -> Expression:
-        expr = self._parse_xor()
-        while self.check_and_consume('or'): # Assumes 'or' is tokenized as WORD 'or'
-            expr = Operate(expr, Operation.OR, self._parse_xor())
-        return expr
-
-    def _parse_xor(self) -> Expression:
-        expr = self._parse_and()
-        while self.check_and_consume('xor'): # Assumes 'xor' is tokenized as WORD 'xor'
-            expr = Operate(expr, Operation.XOR, self._parse_and())
-        return expr
-
-    def _parse_and(self) -> Expression:
-        expr = self._parse_add_sub()
-        while self.check_and_consume('and'): # Assumes 'and' is tokenized as WORD 'and'
-             expr = Operate(expr, Operation.AND, self._parse_add_sub())
-        return expr
-
-    def _parse_add_sub(self) -> Expression:
-        expr = self._parse_mul_div()
-        while self.current_token.value in ['+', '-']:
-            op_val = self.current_token.value
-            self.advance()
-            op = Operation.ADD if op_val == '+' else Operation.SUB
-            expr = Operate(expr, op, self._parse_mul_div())
-        return expr
+    # --- Expression Parsing (Precedence Climbing) ---
+    # Based on standard operator precedence: PAREN > NOT/NEG > MUL/DIV > ADD/SUB > AND > XOR > OR
 
-    def _parse_mul_div(self) -> Expression:
+    def parse_expression(self, min_precedence: int = 1) -> Expression:
+        """Parses an expression by precedence climbing, all binary operators are left-associative.
+        Only operators binding at least as tight as min_precedence are consumed."""
         expr = self._parse_unary()
-        while self.current_token.value in ['*', '/']:
-            op_val = self.current_token.value
+        while True:
+            binary = _BINARY_OPS.get(self.current_token.value)
+            if binary is None or binary[0] < min_precedence:
+                return expr
             self.advance()
-            op = Operation.MUL if op_val == '*' else Operation.DIV
-            expr = Operate(expr, op, self._parse_unary())
-        return expr
+            precedence, op = binary
+            expr = Operate(expr, op, self.parse_expression(precedence + 1))
 
     def _parse_unary(self) -> Expression:
-        if self.check_and_consume('-'):
-            return Neg(self._parse_unary()) # Recursively parse unary for -- or -~
-        if self.check_and_consume('~'):
+        value = self.current_token.value # The EOF token has an empty value
+        if value == '-':
+            self.advance()
+            return Neg.of(self._parse_unary()) # Recursively parse unary for -- or -~
+        if value == '~':
+            self.advance()
             return NotOp(self._parse_unary()) # Recursively parse unary
         return self._parse_primary()
 
     def _parse_primary(self) -> Expression:
         token = self.current_token
-        if token.type == TokenType.DEC:
-             val = int(token.value)
-             self.advance()
-             return Constant(val)
-        elif token.type == TokenType.HEX:
-             val = int(token.value, 16)
-             self.advance()
-             return Constant(val)
-        elif token.type == TokenType.BIN:
-             val = int(token.value, 2)
-             self.advance()
-             return Constant(val)
-        elif token.type == TokenType.CHAR:
-             val = token.value # Already decoded char
-             self.advance()
-             return Constant(val)
-        elif token.type == TokenType.WORD:
-             # Could be register or identifier
-             # Registers shouldn't appear in general expression. Assume identifier.
-             name = token.value
-             self.advance()
-             return Identifier(name)
-        elif self.check_and_consume('('):
+        handler = Parser._PRIMARY_HANDLERS.get(token.type)
+        if handler is not None:
+            self.advance()
+            return handler(token)
+        if token.value == '(':
+            self.advance()
             expr = self.parse_expression()
             self.consume(')')
             return expr
-        else:
-            raise self.make_parser_exception(f"Unexpected token in expression: {token.type} '{token.value}'")
+        raise self.make_parser_exception(f"Unexpected token in expression: {token.type} '{token.value}'")
 
     # --- Other Parsing Helpers ---
     def parse_reg(self) -> Register:
@@ -540,3 +535,21 @@ class Parser:
         val = self.current_token.value
         self.advance()
         return val
+
+    # Handlers of the tokens a statement can start with
+    _STATEMENT_HANDLERS: Dict[TokenType, Callable[['Parser', Token], None]] = {
+        TokenType.LABELDEF: _parse_labeldef,
+        TokenType.DOTCMD: _parse_directive,
+        TokenType.COMMENT: _parse_comment,
+        TokenType.WORD: _parse_word,
+    }
+
+    # Expressions built from a single token, the token is already consumed
+    _PRIMARY_HANDLERS: Dict[TokenType, Callable[[Token], Expression]] = {
+        TokenType.DEC: lambda token: Constant(token.number),
+        TokenType.HEX: lambda token: Constant(token.number),
+        TokenType.BIN: lambda token: Constant(token.number),
+        TokenType.CHAR: lambda token: Constant(token.value), # Already decoded char
+        # Registers shouldn't appear in general expression. Assume identifier.
+        TokenType.WORD: lambda token: Identifier(token.value),
+    }
@@ -1,122 +1,122 @@
+import io
 import sys
 import os
 import traceback
-import tempfile
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QSplitter, QMenuBar, QMenu, 
-                           QFileDialog, QTextEdit, QDockWidget, QListWidget, QMessageBox, 
-                           QTabWidget, QVBoxLayout, QHBoxLayout, QWidget, QPushButton, 
-                           QLabel, QComboBox, QToolBar, QStatusBar)
+import functools
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QSplitter,
+                           QFileDialog, QTextEdit, QPlainTextEdit, QDockWidget, QMessageBox,
+                           QVBoxLayout, QHBoxLayout, QWidget,
+                           QLabel, QComboBox, QToolBar)
 from PyQt6.QtGui import QFont, QColor, QAction, QSyntaxHighlighter, QTextCharFormat
 from PyQt6.QtCore import Qt, QRegularExpression
 
-# Import assembler components
-from assembler.parser import Parser
-from assembler.asm import Program
-from assembler.asm.formatters import HexFormatter, AsmFormatter
-from assembler.expression import ExpressionException
-from assembler.parser import ParserException
-from assembler.asm import InstructionException
+# The assembler components are imported by assemble_current_file, editing doesn't load them
+
+# Buffer size of the hex file, HexFormatter writes it in batches of lines
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+# All instructions from the PDF, used by the highlighter and the instruction reference
+INSTRUCTION_MNEMONICS = (
+    "NOP", "MOV", "ADD", "ADC", "SUB", "SBC", "AND", "OR", "EOR",
+    "LDI", "LDIs", "ADDI", "ADDIs", "ADCI", "ADCIs", "SUBI", "SUBIs",
+    "SBCI", "SBCIs", "NEG", "ANDI", "ANDIs", "ORI", "ORIs", "EORI",
+    "EORIs", "NOT", "MUL", "MULs", "MULSs", "CP", "CPI", "CPIs",
+    "JMP", "JMPI", "BRCS", "BRCC", "BRMI", "BRPL", "BREQ", "BRNE",
+    "BRVS", "BRVC", "BRLT", "BRGE", "BRLE", "BRGT", "BRK", "RETI",
+    "ST", "LD", "STS", "STSs", "LDS", "LDSs", "STD", "LDD", "LDDd",
+    "OUT", "OUTs", "OUTR", "IN", "INs", "INR"
+)
+MACRO_MNEMONICS = (
+    "POP", "RET", "CALL", "DEC", "LEAVE", "LEAVEI", "ENTER",
+    "ENTERI", "_SCALL", "PUSH", "INC"
+)
+
+def _word_alternation(words):
+    """Returns a regex matching any of the given words as a whole word."""
+    return QRegularExpression(r"\b(?:" + "|".join(sorted(words, key=len, reverse=True)) + r")\b")
+
+def _build_highlighting_rules():
+    """Returns the (regex, format) rules of the highlighter, later rules override earlier ones."""
+    rules = []
+    
+    # Instructions
+    instruction_format = QTextCharFormat()
+    instruction_format.setForeground(QColor("#0000FF"))  # Blue
+    instruction_format.setFontWeight(QFont.Weight.Bold)
+    
+    # One alternation per rule, so a block is scanned once per rule instead of once per name
+    rules.append((_word_alternation(INSTRUCTION_MNEMONICS), instruction_format))
+    
+    # Macros
+    macro_format = QTextCharFormat()
+    macro_format.setForeground(QColor("#0099CC"))  # Light blue
+    macro_format.setFontWeight(QFont.Weight.Bold)
+    
+    rules.append((_word_alternation(MACRO_MNEMONICS), macro_format))
+    
+    # Directives
+    directive_format = QTextCharFormat()
+    directive_format.setForeground(QColor("#FF6600"))  # Orange
+    directive_format.setFontWeight(QFont.Weight.Bold)
+    
+    directive_names = [
+        "reg", "long", "org", "const", "include", "word", "words", "dorg", "data"
+    ]
+    
+    # Whole names only, a prefix like .word in .words is not matched by itself
+    rules.append((QRegularExpression(r"\.(?:" + "|".join(directive_names) + r")\b"), directive_format))
+    
+    # Registers
+    register_format = QTextCharFormat()
+    register_format.setForeground(QColor("#AA00AA"))  # Purple
+    
+    # Standard registers (R0-R31) and special registers
+    rules.append((QRegularExpression(r"\b(?:R(?:[12]?[0-9]|3[01])|SP|PC|BP|RA)\b"), register_format))
+    
+    # Numbers
+    number_format = QTextCharFormat()
+    number_format.setForeground(QColor("#009900"))  # Green
+    
+    # Hex, binary and decimal numbers
+    rules.append((QRegularExpression(r"\b(?:0x[0-9A-Fa-f]+|0b[01]+|\d+)\b"), number_format))
+    
+    # Comments
+    comment_format = QTextCharFormat()
+    comment_format.setForeground(QColor("#808080"))  # Gray
+    rules.append((QRegularExpression(r";.*"), comment_format))
+    
+    # Labels
+    label_format = QTextCharFormat()
+    label_format.setForeground(QColor("#990099"))  # Magenta
+    rules.append((QRegularExpression(r"^\s*\w+:"), label_format))
+    
+    # Strings
+    string_format = QTextCharFormat()
+    string_format.setForeground(QColor("#990000"))  # Red
+    rules.append((QRegularExpression(r"\".*\""), string_format))
+
+    # Compile the patterns now, with the JIT where available, instead of on the first highlighted block
+    for regex, _ in rules:
+        regex.optimize()
+    return tuple(rules)
+
 
 class AssemblerHighlighter(QSyntaxHighlighter):
     """Custom syntax highlighter for the assembler language."""
-    
+
+    # The rules are static, all highlighters share the ones built by the first
+    _HIGHLIGHTING_RULES = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        
-        # Create highlighting rules
-        self.highlighting_rules = []
-        
-        # Instructions
-        instruction_format = QTextCharFormat()
-        instruction_format.setForeground(QColor("#0000FF"))  # Blue
-        instruction_format.setFontWeight(QFont.Weight.Bold)
-        
-        # Get all instructions from the PDF
-        instruction_patterns = [
-            "NOP", "MOV", "ADD", "ADC", "SUB", "SBC", "AND", "OR", "EOR", 
-            "LDI", "LDIs", "ADDI", "ADDIs", "ADCI", "ADCIs", "SUBI", "SUBIs", 
-            "SBCI", "SBCIs", "NEG", "ANDI", "ANDIs", "ORI", "ORIs", "EORI", 
-            "EORIs", "NOT", "MUL", "MULs", "MULSs", "CP", "CPI", "CPIs",
-            "JMP", "JMPI", "BRCS", "BRCC", "BRMI", "BRPL", "BREQ", "BRNE", 
-            "BRVS", "BRVC", "BRLT", "BRGE", "BRLE", "BRGT", "BRK", "RETI",
-            "ST", "LD", "STS", "STSs", "LDS", "LDSs", "STD", "LDD", "LDDd",
-            "OUT", "OUTs", "OUTR", "IN", "INs", "INR"
-        ]
-        
-        for pattern in instruction_patterns:
-            regex = QRegularExpression(r"\b" + pattern + r"\b")
-            self.highlighting_rules.append((regex, instruction_format))
-        
-        # Macros
-        macro_format = QTextCharFormat()
-        macro_format.setForeground(QColor("#0099CC"))  # Light blue
-        macro_format.setFontWeight(QFont.Weight.Bold)
-        
-        macro_patterns = [
-            "POP", "RET", "CALL", "DEC", "LEAVE", "LEAVEI", "ENTER", 
-            "ENTERI", "_SCALL", "PUSH", "INC"
-        ]
-        
-        for pattern in macro_patterns:
-            regex = QRegularExpression(r"\b" + pattern + r"\b")
-            self.highlighting_rules.append((regex, macro_format))
-        
-        # Directives
-        directive_format = QTextCharFormat()
-        directive_format.setForeground(QColor("#FF6600"))  # Orange
-        directive_format.setFontWeight(QFont.Weight.Bold)
-        
-        directive_patterns = [
-            r"\.reg", r"\.long", r"\.org", r"\.const", r"\.include", r"\.word", r"\.dorg", r"\.data"
-        ]
-        
-        for pattern in directive_patterns:
-            regex = QRegularExpression(pattern)
-            self.highlighting_rules.append((regex, directive_format))
-        
-        # Registers
-        register_format = QTextCharFormat()
-        register_format.setForeground(QColor("#AA00AA"))  # Purple
-        
-        # Standard registers (R0-R31) and special registers
-        for i in range(32):
-            regex = QRegularExpression(r"\bR" + str(i) + r"\b")
-            self.highlighting_rules.append((regex, register_format))
-        
-        # Special registers
-        special_registers = ["SP", "PC", "BP", "RA"]
-        for reg in special_registers:
-            regex = QRegularExpression(r"\b" + reg + r"\b")
-            self.highlighting_rules.append((regex, register_format))
-        
-        # Numbers
-        number_format = QTextCharFormat()
-        number_format.setForeground(QColor("#009900"))  # Green
-        
-        # Decimal numbers
-        self.highlighting_rules.append((QRegularExpression(r"\b\d+\b"), number_format))
-        # Hex numbers
-        self.highlighting_rules.append((QRegularExpression(r"\b0x[0-9A-Fa-f]+\b"), number_format))
-        # Binary numbers
-        self.highlighting_rules.append((QRegularExpression(r"\b0b[01]+\b"), number_format))
-        
-        # Comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#808080"))  # Gray
-        self.highlighting_rules.append((QRegularExpression(r";.*"), comment_format))
-        
-        # Labels
-        label_format = QTextCharFormat()
-        label_format.setForeground(QColor("#990099"))  # Magenta
-        self.highlighting_rules.append((QRegularExpression(r"^\s*\w+:"), label_format))
-        
-        # Strings
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#990000"))  # Red
-        self.highlighting_rules.append((QRegularExpression(r"\".*\""), string_format))
-    
+        if AssemblerHighlighter._HIGHLIGHTING_RULES is None:
+            AssemblerHighlighter._HIGHLIGHTING_RULES = _build_highlighting_rules()
+        self.highlighting_rules = AssemblerHighlighter._HIGHLIGHTING_RULES
+
     def highlightBlock(self, text):
         """Apply syntax highlighting to the given block of text."""
+        if not text or text.isspace():
+            return # No rule matches whitespace only
         for pattern, format in self.highlighting_rules:
             match_iterator = pattern.globalMatch(text)
             while match_iterator.hasNext():
@@ -124,7 +124,7 @@ class AssemblerHighlighter(QSyntaxHighlighter):
                 self.setFormat(match.capturedStart(), match.capturedLength(), format)
 
 
-class AssemblerEditor(QTextEdit):
+class AssemblerEditor(QPlainTextEdit):
     """Custom text editor for assembly code with line numbers."""
     
     def __init__(self, parent=None):
@@ -139,9 +139,6 @@ class AssemblerEditor(QTextEdit):
         
         # Set up the highlighter
         self.highlighter = AssemblerHighlighter(self.document())
-        
-        # Connect signals
-        self.textChanged.connect(self.on_text_changed)
     
     def setup_editor(self):
         """Configure the editor settings."""
@@ -153,9 +150,25 @@ class AssemblerEditor(QTextEdit):
         metrics = self.fontMetrics()
         self.setTabStopDistance(4 * metrics.horizontalAdvance(' '))
     
-    def on_text_changed(self):
-        """Handle text changes in the editor."""
-        self.modified = True
+    @property
+    def current_file(self):
+        """The path of the file being edited, or None."""
+        return self._current_file
+
+    @current_file.setter
+    def current_file(self, value):
+        self._current_file = value
+        # Resolved once here, assembler errors compare their file name against it
+        self.current_file_abspath = os.path.abspath(value) if value else None
+
+    @property
+    def modified(self):
+        """Whether the text changed since it was loaded or saved, tracked by the document itself."""
+        return self.document().isModified()
+
+    @modified.setter
+    def modified(self, value):
+        self.document().setModified(value)
     
     def new_file(self):
         """Create a new file."""
@@ -174,7 +187,10 @@ class AssemblerEditor(QTextEdit):
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
                     text = f.read()
-                self.setText(text)
+                # Detached while loading, the highlighter runs once over the whole document when it is reattached
+                self.highlighter.setDocument(None)
+                self.setPlainText(text) # Plain text, no rich text detection or HTML parsing
+                self.highlighter.setDocument(self.document())
                 self.current_file = filename
                 self.modified = False
                 return True
@@ -226,6 +242,17 @@ class LineNumberArea(QWidget):
         self.editor.line_number_area_paint_event(event)
 
 
+# Console colors by name, the messages use only a few
+_COLOR_CACHE = {}
+
+def _color(name):
+    """Returns the QColor of the given name, created once per name."""
+    color = _COLOR_CACHE.get(name)
+    if color is None:
+        color = _COLOR_CACHE[name] = QColor(name)
+    return color
+
+
 class OutputConsole(QTextEdit):
     """Console widget for displaying assembler output and errors."""
     
@@ -237,14 +264,129 @@ class OutputConsole(QTextEdit):
     
     def append_message(self, text, color="black"):
         """Append a colored message to the console."""
-        self.setTextColor(QColor(color))
+        self.setTextColor(_color(color))
         self.append(text)
+
+    def append_messages(self, messages):
+        """Append a list of (text, color) messages, the console is redrawn once afterwards."""
+        self.setUpdatesEnabled(False)
+        try:
+            for text, color in messages:
+                self.append_message(text, color)
+        finally:
+            self.setUpdatesEnabled(True)
+        self.ensureCursorVisible()
     
     def clear_console(self):
         """Clear the console."""
         self.clear()
 
 
+# Complete instruction set from the PDF
+_INSTRUCTION_DETAILS = {
+    # Regular instructions
+    "NOP": {"opcode": "0x0", "desc": "Does nothing."},
+    "MOV": {"opcode": "0x1", "desc": "Move the content of Rs to register Rd.", "format": "MOV Rd,Rs"},
+    "ADD": {"opcode": "0x2", "desc": "Adds the content of register Rs to register Rd without carry.", "format": "ADD Rd,Rs"},
+    "ADC": {"opcode": "0x3", "desc": "Adds the content of register Rs to register Rd with carry.", "format": "ADC Rd,Rs"},
+    "SUB": {"opcode": "0x4", "desc": "Subtracts the content of register Rs from register Rd without carry.", "format": "SUB Rd,Rs"},
+    "SBC": {"opcode": "0x5", "desc": "Subtracts the content of register Rs from register Rd with carry.", "format": "SBC Rd,Rs"},
+    "AND": {"opcode": "0x6", "desc": "Stores Rs and Rd in register Rd.", "format": "AND Rd,Rs"},
+    "OR": {"opcode": "0x7", "desc": "Stores Rs or Rd in register Rd.", "format": "OR Rd,Rs"},
+    "EOR": {"opcode": "0x8", "desc": "Stores Rs xor Rd in register Rd.", "format": "EOR Rd,Rs"},
+    "LDI": {"opcode": "0x9", "desc": "Loads Register Rd with the constant value [const].", "format": "LDI Rd,[const]"},
+    "LDIs": {"opcode": "0xa", "desc": "Loads Register Rd with the constant value [const]. (0<=[const]<=15)", "format": "LDIs Rd,[const]"},
+    "ADDI": {"opcode": "0xb", "desc": "Adds the constant [const] to register Rd without carry.", "format": "ADDI Rd,[const]"},
+    "ADDIs": {"opcode": "0xc", "desc": "Adds the constant [const] to register Rd without carry. (0<=[const]<=15)", "format": "ADDIs Rd,[const]"},
+    "ADCI": {"opcode": "0xd", "desc": "Adds the constant [const] to register Rd with carry.", "format": "ADCI Rd,[const]"},
+    "ADCIs": {"opcode": "0xe", "desc": "Adds the constant [const] to register Rd with carry. (0<=[const]<=15)", "format": "ADCIs Rd,[const]"},
+    "SUBI": {"opcode": "0xf", "desc": "Subtracts a constant [const] from register Rd without carry.", "format": "SUBI Rd,[const]"},
+    "SUBIs": {"opcode": "0x10", "desc": "Subtracts a constant [const] from register Rd without carry. (0<=[const]<=15)", "format": "SUBIs Rd,[const]"},
+    "SBCI": {"opcode": "0x11", "desc": "Subtracts a constant [const] from register Rd with carry.", "format": "SBCI Rd,[const]"},
+    "SBCIs": {"opcode": "0x12", "desc": "Subtracts a constant [const] from register Rd with carry. (0<=[const]<=15)", "format": "SBCIs Rd,[const]"},
+    "NEG": {"opcode": "0x13", "desc": "Stores the two's complement of Rd in register Rd.", "format": "NEG Rd"},
+    "ANDI": {"opcode": "0x14", "desc": "Stores Rd and [const] in register Rd.", "format": "ANDI Rd,[const]"},
+    "ANDIs": {"opcode": "0x15", "desc": "Stores Rd and [const] in register Rd. (0<=[const]<=15)", "format": "ANDIs Rd,[const]"},
+    "ORI": {"opcode": "0x16", "desc": "Stores Rd or [const] in register Rd.", "format": "ORI Rd,[const]"},
+    "ORIs": {"opcode": "0x17", "desc": "Stores Rd or [const] in register Rd. (0<=[const]<=15)", "format": "ORIs Rd,[const]"},
+    "EORI": {"opcode": "0x18", "desc": "Stores Rd xor [const] in register Rd.", "format": "EORI Rd,[const]"},
+    "EORIs": {"opcode": "0x19", "desc": "Stores Rd xor [const] in register Rd. (0<=[const]<=15)", "format": "EORIs Rd,[const]"},
+    "NOT": {"opcode": "0x1a", "desc": "Stores the one's complement of Rd in register Rd.", "format": "NOT Rd"},
+    "MUL": {"opcode": "0x1b", "desc": "Multiplies Rd and Rs and stores the result in Rd.", "format": "MUL Rd,Rs"},
+    "MULs": {"opcode": "0x1c", "desc": "Multiplies Rd and the constant [const] and stores the result in Rd.", "format": "MULs Rd,[const]"},
+    "MULSs": {"opcode": "0x1d", "desc": "Multiplies Rd and the constant [const] and stores the result in Rd. (0<=[const]<=15)", "format": "MULSs Rd,[const]"},
+    "CP": {"opcode": "0x1e", "desc": "Compares registers Rd and Rs.", "format": "CP Rd,Rs"},
+    "CPI": {"opcode": "0x1f", "desc": "Compares register Rd with the constant [const].", "format": "CPI Rd,[const]"},
+    "CPIs": {"opcode": "0x20", "desc": "Compares register Rd with the constant [const]. (0<=[const]<=15)", "format": "CPIs Rd,[const]"},
+    "JMP": {"opcode": "0x21", "desc": "Jumps to address given by register Rs.", "format": "JMP Rs"},
+    "JMPI": {"opcode": "0x22", "desc": "Jumps to address given by the constant [const].", "format": "JMPI [const]"},
+    "BRCS": {"opcode": "0x23", "desc": "Branch if carry set.", "format": "BRCS [const]"},
+    "BRCC": {"opcode": "0x24", "desc": "Branch if carry cleared.", "format": "BRCC [const]"},
+    "BRMI": {"opcode": "0x25", "desc": "Branch if minus.", "format": "BRMI [const]"},
+    "BRPL": {"opcode": "0x26", "desc": "Branch if plus.", "format": "BRPL [const]"},
+    "BREQ": {"opcode": "0x27", "desc": "Branch if equal.", "format": "BREQ [const]"},
+    "BRNE": {"opcode": "0x28", "desc": "Branch if not equal.", "format": "BRNE [const]"},
+    "BRVS": {"opcode": "0x29", "desc": "Branch if overflow set.", "format": "BRVS [const]"},
+    "BRVC": {"opcode": "0x2a", "desc": "Branch if overflow cleared.", "format": "BRVC [const]"},
+    "ST": {"opcode": "0x2b", "desc": "Stores the contents of register Rs to the memory address specified by register Rd.", "format": "ST Rd,Rs"},
+    "LD": {"opcode": "0x2c", "desc": "Loads register Rd with the memory value at the address held in register Rs.", "format": "LD Rd,Rs"},
+    "STS": {"opcode": "0x2d", "desc": "Stores the contents of register Rs to a memory location determined by a constant [const].", "format": "STS [const],Rs"},
+    "STSs": {"opcode": "0x2e", "desc": "Stores the contents of register Rs to a memory location determined by a constant [const]. (0<=[const]<=15)", "format": "STSs [const],Rs"},
+    "LDS": {"opcode": "0x2f", "desc": "Loads register Rd with the memory value at the address specified by the constant [const].", "format": "LDS Rd,[const]"},
+    "LDSs": {"opcode": "0x30", "desc": "Loads register Rd with the memory value at the address specified by the constant [const]. (0<=[const]<=15)", "format": "LDSs Rd,[const]"},
+    "STD": {"opcode": "0x31", "desc": "Stores data to a memory address calculated by adding a constant to the value in register Rd.", "format": "STD Rd+[const],Rs"},
+    "LDD": {"opcode": "0x32", "desc": "Loads data from a memory address calculated by adding a constant to the value in register Rs.", "format": "LDD Rd,Rs+[const]"},
+    "LDDd": {"opcode": "0x33", "desc": "Loads data from a memory address calculated by adding a constant to the value in register Rd (decreasing Rd).", "format": "LDDd Rd,[const]"},
+    "BRLT": {"opcode": "0x34", "desc": "Branch if less than (signed).", "format": "BRLT [const]"},
+    "BRGE": {"opcode": "0x35", "desc": "Branch if greater than or equal (signed).", "format": "BRGE [const]"},
+    "BRLE": {"opcode": "0x36", "desc": "Branch if less than or equal (signed).", "format": "BRLE [const]"},
+    "BRGT": {"opcode": "0x37", "desc": "Branch if greater than (signed).", "format": "BRGT [const]"},
+    "OUT": {"opcode": "0x3e", "desc": "Writes the content of register Rs to io location given by [const].", "format": "OUT [const],Rs"},
+    "OUTs": {"opcode": "0x3f", "desc": "Writes the content of register Rs to io location given by [const]. (0<=[const]<=15)", "format": "OUTs [const],Rs"},
+    "OUTR": {"opcode": "0x40", "desc": "Writes the content of register Rs to the io location [Rd].", "format": "OUTR [Rd],Rs"},
+    "IN": {"opcode": "0x41", "desc": "Reads the io location given by [const] and stores it in register Rd.", "format": "IN Rd,[const]"},
+    "INs": {"opcode": "0x42", "desc": "Reads the io location given by [const] and stores it in register Rd. (0<=[const]<=15)", "format": "INs Rd,[const]"},
+    "INR": {"opcode": "0x43", "desc": "Reads the io location given by (Rs) and stores it in register Rd.", "format": "INR Rd,[Rs]"},
+    "BRK": {"opcode": "0x44", "desc": "Stops execution by stopping the simulator.", "format": "BRK"},
+    "RETI": {"opcode": "0x45", "desc": "Return from Interrupt.", "format": "RETI"},
+    
+    # Macros
+    "POP": {"desc": "Copy value from the stack to the given register, adds one to the stack pointer.", "format": "POP Rd", "type": "macro"},
+    "RET": {"desc": "Jumps to the address which is stored on top of the stack. Decreases the stack pointer by 1+const. const is optional.", "format": "RET [const]", "type": "macro"},
+    "CALL": {"desc": "Jumps to the given Address, stores the return address on the stack.", "format": "CALL [const]", "type": "macro"},
+    "DEC": {"desc": "Decreases the given register by one.", "format": "DEC Rd", "type": "macro"},
+    "LEAVE": {"desc": "Moves BP to SP and pops BP from the stack.", "format": "LEAVE", "type": "macro"},
+    "LEAVEI": {"desc": "Pops R0 and the flags from the stack.", "format": "LEAVEI", "type": "macro"},
+    "ENTER": {"desc": "Pushes BP on stack, copies SP to BP and reduces SP by the given constant.", "format": "ENTER [const]", "type": "macro"},
+    "ENTERI": {"desc": "Pushes R0 and the flags to the stack.", "format": "ENTERI", "type": "macro"},
+    "_SCALL": {"desc": "Jumps to the address given in const and stores the return address in the register RA. Before that RA ist pushed to the stack, and after the return RA is poped of the stack again.", "format": "_SCALL [const]", "type": "macro"},
+    "PUSH": {"desc": "Copies the value in the given register to the stack, decreases the stack pointer by one.", "format": "PUSH Rs", "type": "macro"},
+    "INC": {"desc": "Increases the given register by one.", "format": "INC Rd", "type": "macro"}
+}
+_DEFAULT_DETAILS = {"opcode": "N/A", "desc": "No details available."}
+
+@functools.lru_cache(maxsize=256) # Keyed by whatever is typed, so bounded
+def _instruction_details_html(instruction):
+    """Returns the details page of the instruction, the name as typed into the search box."""
+    # The short forms like LDIs are only found with their exact spelling
+    details = _INSTRUCTION_DETAILS.get(instruction) or _INSTRUCTION_DETAILS.get(instruction.upper(), _DEFAULT_DETAILS)
+
+    html = f"""
+    <h2>{instruction.upper()}</h2>
+    """
+
+    if details.get("type") == "macro":
+        html += "<p><b>Type:</b> Macro</p>"
+    else:
+        html += f"<p><b>Opcode:</b> {details.get('opcode', 'N/A')}</p>"
+
+    html += f"<p><b>Description:</b> {details.get('desc', 'No description available.')}</p>"
+
+    if "format" in details:
+        html += f"<p><b>Format:</b> {details['format']}</p>"
+    return html
+
+
 class InstructionReferenceWidget(QWidget):
     """Widget for displaying instruction set reference."""
     
@@ -259,18 +401,7 @@ class InstructionReferenceWidget(QWidget):
         self.search_input.setEditable(True)
         
         # Add all instructions from the PDF
-        self.search_input.addItems([
-            "NOP", "MOV", "ADD", "ADC", "SUB", "SBC", "AND", "OR", "EOR", 
-            "LDI", "LDIs", "ADDI", "ADDIs", "ADCI", "ADCIs", "SUBI", "SUBIs", 
-            "SBCI", "SBCIs", "NEG", "ANDI", "ANDIs", "ORI", "ORIs", "EORI", 
-            "EORIs", "NOT", "MUL", "MULs", "MULSs", "CP", "CPI", "CPIs",
-            "JMP", "JMPI", "BRCS", "BRCC", "BRMI", "BRPL", "BREQ", "BRNE", 
-            "BRVS", "BRVC", "BRLT", "BRGE", "BRLE", "BRGT", "BRK", "RETI",
-            "ST", "LD", "STS", "STSs", "LDS", "LDSs", "STD", "LDD", "LDDd",
-            "OUT", "OUTs", "OUTR", "IN", "INs", "INR",
-            "POP", "RET", "CALL", "DEC", "LEAVE", "LEAVEI", "ENTER", 
-            "ENTERI", "_SCALL", "PUSH", "INC"
-        ])
+        self.search_input.addItems(list(INSTRUCTION_MNEMONICS + MACRO_MNEMONICS))
         
         self.search_input.currentTextChanged.connect(self.update_instruction_details)
         search_layout.addWidget(QLabel("Instruction:"))
@@ -289,105 +420,7 @@ class InstructionReferenceWidget(QWidget):
     
     def update_instruction_details(self, instruction):
         """Update the details for the selected instruction."""
-        # Complete instruction set from the PDF
-        instruction_details = {
-            # Regular instructions
-            "NOP": {"opcode": "0x0", "desc": "Does nothing."},
-            "MOV": {"opcode": "0x1", "desc": "Move the content of Rs to register Rd.", "format": "MOV Rd,Rs"},
-            "ADD": {"opcode": "0x2", "desc": "Adds the content of register Rs to register Rd without carry.", "format": "ADD Rd,Rs"},
-            "ADC": {"opcode": "0x3", "desc": "Adds the content of register Rs to register Rd with carry.", "format": "ADC Rd,Rs"},
-            "SUB": {"opcode": "0x4", "desc": "Subtracts the content of register Rs from register Rd without carry.", "format": "SUB Rd,Rs"},
-            "SBC": {"opcode": "0x5", "desc": "Subtracts the content of register Rs from register Rd with carry.", "format": "SBC Rd,Rs"},
-            "AND": {"opcode": "0x6", "desc": "Stores Rs and Rd in register Rd.", "format": "AND Rd,Rs"},
-            "OR": {"opcode": "0x7", "desc": "Stores Rs or Rd in register Rd.", "format": "OR Rd,Rs"},
-            "EOR": {"opcode": "0x8", "desc": "Stores Rs xor Rd in register Rd.", "format": "EOR Rd,Rs"},
-            "LDI": {"opcode": "0x9", "desc": "Loads Register Rd with the constant value [const].", "format": "LDI Rd,[const]"},
-            "LDIs": {"opcode": "0xa", "desc": "Loads Register Rd with the constant value [const]. (0<=[const]<=15)", "format": "LDIs Rd,[const]"},
-            "ADDI": {"opcode": "0xb", "desc": "Adds the constant [const] to register Rd without carry.", "format": "ADDI Rd,[const]"},
-            "ADDIs": {"opcode": "0xc", "desc": "Adds the constant [const] to register Rd without carry. (0<=[const]<=15)", "format": "ADDIs Rd,[const]"},
-            "ADCI": {"opcode": "0xd", "desc": "Adds the constant [const] to register Rd with carry.", "format": "ADCI Rd,[const]"},
-            "ADCIs": {"opcode": "0xe", "desc": "Adds the constant [const] to register Rd with carry. (0<=[const]<=15)", "format": "ADCIs Rd,[const]"},
-            "SUBI": {"opcode": "0xf", "desc": "Subtracts a constant [const] from register Rd without carry.", "format": "SUBI Rd,[const]"},
-            "SUBIs": {"opcode": "0x10", "desc": "Subtracts a constant [const] from register Rd without carry. (0<=[const]<=15)", "format": "SUBIs Rd,[const]"},
-            "SBCI": {"opcode": "0x11", "desc": "Subtracts a constant [const] from register Rd with carry.", "format": "SBCI Rd,[const]"},
-            "SBCIs": {"opcode": "0x12", "desc": "Subtracts a constant [const] from register Rd with carry. (0<=[const]<=15)", "format": "SBCIs Rd,[const]"},
-            "NEG": {"opcode": "0x13", "desc": "Stores the two's complement of Rd in register Rd.", "format": "NEG Rd"},
-            "ANDI": {"opcode": "0x14", "desc": "Stores Rd and [const] in register Rd.", "format": "ANDI Rd,[const]"},
-            "ANDIs": {"opcode": "0x15", "desc": "Stores Rd and [const] in register Rd. (0<=[const]<=15)", "format": "ANDIs Rd,[const]"},
-            "ORI": {"opcode": "0x16", "desc": "Stores Rd or [const] in register Rd.", "format": "ORI Rd,[const]"},
-            "ORIs": {"opcode": "0x17", "desc": "Stores Rd or [const] in register Rd. (0<=[const]<=15)", "format": "ORIs Rd,[const]"},
-            "EORI": {"opcode": "0x18", "desc": "Stores Rd xor [const] in register Rd.", "format": "EORI Rd,[const]"},
-            "EORIs": {"opcode": "0x19", "desc": "Stores Rd xor [const] in register Rd. (0<=[const]<=15)", "format": "EORIs Rd,[const]"},
-            "NOT": {"opcode": "0x1a", "desc": "Stores the one's complement of Rd in register Rd.", "format": "NOT Rd"},
-            "MUL": {"opcode": "0x1b", "desc": "Multiplies Rd and Rs and stores the result in Rd.", "format": "MUL Rd,Rs"},
-            "MULs": {"opcode": "0x1c", "desc": "Multiplies Rd and the constant [const] and stores the result in Rd.", "format": "MULs Rd,[const]"},
-            "MULSs": {"opcode": "0x1d", "desc": "Multiplies Rd and the constant [const] and stores the result in Rd. (0<=[const]<=15)", "format": "MULSs Rd,[const]"},
-            "CP": {"opcode": "0x1e", "desc": "Compares registers Rd and Rs.", "format": "CP Rd,Rs"},
-            "CPI": {"opcode": "0x1f", "desc": "Compares register Rd with the constant [const].", "format": "CPI Rd,[const]"},
-            "CPIs": {"opcode": "0x20", "desc": "Compares register Rd with the constant [const]. (0<=[const]<=15)", "format": "CPIs Rd,[const]"},
-            "JMP": {"opcode": "0x21", "desc": "Jumps to address given by register Rs.", "format": "JMP Rs"},
-            "JMPI": {"opcode": "0x22", "desc": "Jumps to address given by the constant [const].", "format": "JMPI [const]"},
-            "BRCS": {"opcode": "0x23", "desc": "Branch if carry set.", "format": "BRCS [const]"},
-            "BRCC": {"opcode": "0x24", "desc": "Branch if carry cleared.", "format": "BRCC [const]"},
-            "BRMI": {"opcode": "0x25", "desc": "Branch if minus.", "format": "BRMI [const]"},
-            "BRPL": {"opcode": "0x26", "desc": "Branch if plus.", "format": "BRPL [const]"},
-            "BREQ": {"opcode": "0x27", "desc": "Branch if equal.", "format": "BREQ [const]"},
-            "BRNE": {"opcode": "0x28", "desc": "Branch if not equal.", "format": "BRNE [const]"},
-            "BRVS": {"opcode": "0x29", "desc": "Branch if overflow set.", "format": "BRVS [const]"},
-            "BRVC": {"opcode": "0x2a", "desc": "Branch if overflow cleared.", "format": "BRVC [const]"},
-            "ST": {"opcode": "0x2b", "desc": "Stores the contents of register Rs to the memory address specified by register Rd.", "format": "ST Rd,Rs"},
-            "LD": {"opcode": "0x2c", "desc": "Loads register Rd with the memory value at the address held in register Rs.", "format": "LD Rd,Rs"},
-            "STS": {"opcode": "0x2d", "desc": "Stores the contents of register Rs to a memory location determined by a constant [const].", "format": "STS [const],Rs"},
-            "STSs": {"opcode": "0x2e", "desc": "Stores the contents of register Rs to a memory location determined by a constant [const]. (0<=[const]<=15)", "format": "STSs [const],Rs"},
-            "LDS": {"opcode": "0x2f", "desc": "Loads register Rd with the memory value at the address specified by the constant [const].", "format": "LDS Rd,[const]"},
-            "LDSs": {"opcode": "0x30", "desc": "Loads register Rd with the memory value at the address specified by the constant [const]. (0<=[const]<=15)", "format": "LDSs Rd,[const]"},
-            "STD": {"opcode": "0x31", "desc": "Stores data to a memory address calculated by adding a constant to the value in register Rd.", "format": "STD Rd+[const],Rs"},
-            "LDD": {"opcode": "0x32", "desc": "Loads data from a memory address calculated by adding a constant to the value in register Rs.", "format": "LDD Rd,Rs+[const]"},
-            "LDDd": {"opcode": "0x33", "desc": "Loads data from a memory address calculated by adding a constant to the value in register Rd (decreasing Rd).", "format": "LDDd Rd,[const]"},
-            "BRLT": {"opcode": "0x34", "desc": "Branch if less than (signed).", "format": "BRLT [const]"},
-            "BRGE": {"opcode": "0x35", "desc": "Branch if greater than or equal (signed).", "format": "BRGE [const]"},
-            "BRLE": {"opcode": "0x36", "desc": "Branch if less than or equal (signed).", "format": "BRLE [const]"},
-            "BRGT": {"opcode": "0x37", "desc": "Branch if greater than (signed).", "format": "BRGT [const]"},
-            "OUT": {"opcode": "0x3e", "desc": "Writes the content of register Rs to io location given by [const].", "format": "OUT [const],Rs"},
-            "OUTs": {"opcode": "0x3f", "desc": "Writes the content of register Rs to io location given by [const]. (0<=[const]<=15)", "format": "OUTs [const],Rs"},
-            "OUTR": {"opcode": "0x40", "desc": "Writes the content of register Rs to the io location [Rd].", "format": "OUTR [Rd],Rs"},
-            "IN": {"opcode": "0x41", "desc": "Reads the io location given by [const] and stores it in register Rd.", "format": "IN Rd,[const]"},
-            "INs": {"opcode": "0x42", "desc": "Reads the io location given by [const] and stores it in register Rd. (0<=[const]<=15)", "format": "INs Rd,[const]"},
-            "INR": {"opcode": "0x43", "desc": "Reads the io location given by (Rs) and stores it in register Rd.", "format": "INR Rd,[Rs]"},
-            "BRK": {"opcode": "0x44", "desc": "Stops execution by stopping the simulator.", "format": "BRK"},
-            "RETI": {"opcode": "0x45", "desc": "Return from Interrupt.", "format": "RETI"},
-            
-            # Macros
-            "POP": {"desc": "Copy value from the stack to the given register, adds one to the stack pointer.", "format": "POP Rd", "type": "macro"},
-            "RET": {"desc": "Jumps to the address which is stored on top of the stack. Decreases the stack pointer by 1+const. const is optional.", "format": "RET [const]", "type": "macro"},
-            "CALL": {"desc": "Jumps to the given Address, stores the return address on the stack.", "format": "CALL [const]", "type": "macro"},
-            "DEC": {"desc": "Decreases the given register by one.", "format": "DEC Rd", "type": "macro"},
-            "LEAVE": {"desc": "Moves BP to SP and pops BP from the stack.", "format": "LEAVE", "type": "macro"},
-            "LEAVEI": {"desc": "Pops R0 and the flags from the stack.", "format": "LEAVEI", "type": "macro"},
-            "ENTER": {"desc": "Pushes BP on stack, copies SP to BP and reduces SP by the given constant.", "format": "ENTER [const]", "type": "macro"},
-            "ENTERI": {"desc": "Pushes R0 and the flags to the stack.", "format": "ENTERI", "type": "macro"},
-            "_SCALL": {"desc": "Jumps to the address given in const and stores the return address in the register RA. Before that RA ist pushed to the stack, and after the return RA is poped of the stack again.", "format": "_SCALL [const]", "type": "macro"},
-            "PUSH": {"desc": "Copies the value in the given register to the stack, decreases the stack pointer by one.", "format": "PUSH Rs", "type": "macro"},
-            "INC": {"desc": "Increases the given register by one.", "format": "INC Rd", "type": "macro"}
-        }
-        
-        details = instruction_details.get(instruction.upper(), {"opcode": "N/A", "desc": "No details available."})
-        
-        html = f"""
-        <h2>{instruction.upper()}</h2>
-        """
-        
-        if details.get("type") == "macro":
-            html += "<p><b>Type:</b> Macro</p>"
-        else:
-            html += f"<p><b>Opcode:</b> {details.get('opcode', 'N/A')}</p>"
-            
-        html += f"<p><b>Description:</b> {details.get('desc', 'No description available.')}</p>"
-        
-        if "format" in details:
-            html += f"<p><b>Format:</b> {details['format']}</p>"
-        
-        self.details.setHtml(html)
+        self.details.setHtml(_instruction_details_html(instruction))
 
 
 class AssemblerGUI(QMainWindow):
@@ -594,6 +627,12 @@ class AssemblerGUI(QMainWindow):
     
     def assemble_current_file(self):
         """Assemble the current file."""
+        # Import assembler components
+        from assembler.parser import Parser, ParserException, read_source
+        from assembler.asm import InstructionException
+        from assembler.asm.formatters import HexFormatter, AsmFormatter
+        from assembler.expression import ExpressionException
+
         if not self.editor.current_file and not self.save_file():
             return
         
@@ -607,64 +646,80 @@ class AssemblerGUI(QMainWindow):
         gen_map = output_option in [3, 4]
         
         # Set up output filenames
-        input_base = self.editor.current_file.rsplit('.', 1)[0]
+        input_base = os.path.splitext(self.editor.current_file)[0]
         hex_file = f"{input_base}.hex" if gen_hex else None
         lst_file = f"{input_base}.lst" if gen_lst else None
         map_file = f"{input_base}.map" if gen_map else None
         
+        # Messages are collected and shown at once when assembling is done, it runs
+        # on the GUI thread, so the console could not be redrawn in between anyway
+        messages = []
+        def log(text, color):
+            messages.append((text, color))
+
         # Try to assemble
         try:
-            self.console.append_message(f"Assembling {self.editor.current_file}...", "blue")
+            log(f"Assembling {self.editor.current_file}...", "blue")
             
             # Save current file first
             self.editor.save_file()
             
             # Assemble the file using the imported assembler code
-            with open(self.editor.current_file, 'r', encoding='utf-8') as f:
-                parser = Parser(f, base_file=self.editor.current_file)
-                program = parser.parse_program()
-                self.console.append_message("Parsing complete. Optimizing and linking...", "blue")
-                program.optimize_and_link()
-                self.console.append_message("Linking complete.", "blue")
+            parser = Parser(read_source(self.editor.current_file), base_file=self.editor.current_file)
+            program = parser.parse_program()
+            log("Parsing complete. Optimizing and linking...", "blue")
+            program.optimize_and_link()
+            log("Linking complete.", "blue")
             
             if hex_file:
-                self.console.append_message(f"Writing hex file to {hex_file}...", "blue")
-                with open(hex_file, 'w', encoding='utf-8') as f:
+                log(f"Writing hex file to {hex_file}...", "blue")
+                with open(hex_file, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
                     formatter = HexFormatter(f)
                     program.traverse(formatter)
                     formatter.finalize()  # Important for HexFormatter
             
             if lst_file:
-                self.console.append_message(f"Writing listing file to {lst_file}...", "blue")
+                log(f"Writing listing file to {lst_file}...", "blue")
+                # The listing is built in memory and written at once, it is made of many small pieces
+                buf = io.StringIO()
+                formatter = AsmFormatter(buf)
+                program.traverse(formatter)
                 with open(lst_file, 'w', encoding='utf-8') as f:
-                    formatter = AsmFormatter(f)
-                    program.traverse(formatter)
+                    f.write(buf.getvalue())
 
             if map_file:
-                self.console.append_message(f"Not implemented", "blue")
+                log(f"Writing map file to {map_file}...", "blue")
+                program.write_addr_list(map_file)
             
             # Show success message
-            self.console.append_message(f"Assembly successful!", "green")
+            log(f"Assembly successful!", "green")
             
         except (ExpressionException, ParserException, InstructionException) as e:
             # Handle assembler errors
-            self.console.append_message(f"Error: {str(e)}", "red")
+            log(f"Error: {str(e)}", "red")
             
             # Try to extract line information
             if hasattr(e, 'lineno') and hasattr(e, 'filename'):
-                self.console.append_message(f"  at line {e.lineno} in {e.filename}", "red")
+                log(f"  at line {e.lineno} in {e.filename}", "red")
                 
                 # Highlight the error in the editor if it's the current file
-                if os.path.abspath(e.filename) == os.path.abspath(self.editor.current_file):
+                if os.path.abspath(e.filename) == self.editor.current_file_abspath:
                     cursor = self.editor.textCursor()
                     doc = self.editor.document()
                     cursor.setPosition(doc.findBlockByLineNumber(e.lineno - 1).position())
                     self.editor.setTextCursor(cursor)
             
+        except OSError as e:
+            # Output files (hex, listing, map) could not be written
+            log(f"Error writing output: {str(e)}", "red")
+
         except Exception as e:
             # Handle unexpected errors
-            self.console.append_message(f"Unexpected error: {str(e)}", "red")
-            self.console.append_message(traceback.format_exc(), "red")
+            log(f"Unexpected error: {str(e)}", "red")
+            log(traceback.format_exc(), "red")
+
+        finally:
+            self.console.append_messages(messages)
 
 
 def main():
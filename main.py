@@ -1,37 +1,45 @@
+import io
 import sys
 import argparse
 import traceback
-from assembler.parser import Parser
+from assembler.parser import Parser, read_source
 from assembler.asm import Program
 from assembler.asm.formatters import HexFormatter, AsmFormatter
 from assembler.expression import ExpressionException
 from assembler.parser import ParserException
 from assembler.asm import InstructionException
 
-def assemble_file(input_filename: str, output_hex: str = None, output_lst: str = None, output_map: str = None):
+# Buffer size of the hex file, HexFormatter writes it in batches of lines
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+def assemble_file(input_filename: str, output_hex: str = None, output_lst: str = None, output_map: str = None,
+                  merge_sp_adjust: bool = False):
     """Assembles a file and produces specified output files."""
     print(f"Assembling {input_filename}...")
     program = None
     try:
-        with open(input_filename, 'r', encoding='utf-8') as f:
-            parser = Parser(f, base_file=input_filename)
-            program = parser.parse_program()
-            print("Parsing complete. Optimizing and linking...")
-            program.optimize_and_link()
-            print("Linking complete.")
+        parser = Parser(read_source(input_filename), base_file=input_filename,
+                        existing_program=Program(merge_sp_adjust=merge_sp_adjust))
+        program = parser.parse_program()
+        print("Parsing complete. Optimizing and linking...")
+        program.optimize_and_link()
+        print("Linking complete.")
 
         if output_hex:
             print(f"Writing hex file to {output_hex}...")
-            with open(output_hex, 'w', encoding='utf-8') as f:
+            with open(output_hex, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
                 formatter = HexFormatter(f)
                 program.traverse(formatter)
                 formatter.finalize() # Important for HexFormatter
 
         if output_lst:
             print(f"Writing listing file to {output_lst}...")
+            # The listing is built in memory and written at once, it is made of many small pieces
+            buf = io.StringIO()
+            formatter = AsmFormatter(buf)
+            program.traverse(formatter)
             with open(output_lst, 'w', encoding='utf-8') as f:
-                formatter = AsmFormatter(f)
-                program.traverse(formatter)
+                f.write(buf.getvalue())
 
         if output_map:
              print(f"Writing map file to {output_map}...")
@@ -61,6 +69,9 @@ if __name__ == "__main__":
     arg_parser.add_argument("--lst", action="store_true", help="Generate .lst file.")
     arg_parser.add_argument("--map", action="store_true", help="Generate .map file.")
     arg_parser.add_argument("--all", action="store_true", help="Generate all output files (.hex, .lst, .map).")
+    arg_parser.add_argument("--merge-sp-adjust", action="store_true",
+                            help="Merge the SP adjustments of neighbouring PUSH/POP macros. Moves the code behind "
+                                 "them, so only use it if no label+offset address points behind such a macro.")
 
     args = arg_parser.parse_args()
 
@@ -79,4 +90,4 @@ if __name__ == "__main__":
     lst_file = f"{output_base}.lst" if gen_lst else None
     map_file = f"{output_base}.map" if gen_map else None
 
-    assemble_file(args.input_file, hex_file, lst_file, map_file)
+    assemble_file(args.input_file, hex_file, lst_file, map_file, args.merge_sp_adjust)
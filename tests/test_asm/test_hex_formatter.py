@@ -0,0 +1,68 @@
+import io
+from assembler.parser import Parser
+from assembler.asm.formatters import HexFormatter
+from assembler.asm.memory_image import MemoryImage
+
+def get_hex(code: str) -> str:
+    prog = Parser(code).parse_program().optimize_and_link()
+    out = io.StringIO()
+    formatter = HexFormatter(out)
+    prog.traverse(formatter)
+    formatter.finalize()
+    return out.getvalue()
+
+def test_empty_program():
+    assert get_hex("") == "v2.0 raw\n"
+
+def test_org_gap_filled_with_zero():
+    # NOP at 0, BRK at 3: addresses 1 and 2 must be padded with 0
+    assert get_hex("NOP\n.org 3\nBRK") == "v2.0 raw\n0\n0\n0\n4400\n"
+
+def test_large_org_grows_buffer():
+    out = get_hex(".org 5000\nBRK")
+    lines = out.splitlines()
+    assert len(lines) == 5002
+    assert lines[-1] == "4400"
+    assert set(lines[1:-1]) == {"0"}
+
+def test_output_spanning_several_write_chunks():
+    class CountingWriter(io.StringIO):
+        writes = 0
+        def write(self, s):
+            CountingWriter.writes += 1
+            return super().write(s)
+
+    prog = Parser(".org 20000\nBRK").parse_program().optimize_and_link()
+    out = CountingWriter()
+    formatter = HexFormatter(out)
+    prog.traverse(formatter)
+    formatter.finalize()
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "v2.0 raw"
+    assert len(lines) == 20002
+    assert lines[-1] == "4400"
+    assert CountingWriter.writes == 3
+
+def test_memory_image_matches_hex():
+    code = "NOP\n.org 3\nLDI R0,0x1234\nBRK"
+    prog = Parser(code).parse_program().optimize_and_link()
+    image = prog.create_memory_image()
+    assert image.size == 6
+    assert list(image.words) == [0, 0, 0, 0x9234, 0x900, 0x4400]
+    assert get_hex(code) == "v2.0 raw\n" + "".join(f"{w:x}\n" for w in image.words)
+
+def test_memory_image_runs():
+    prog = Parser("NOP\nNOP\n.org 10\nLDI R0,0x1234\n.org 20\nBRK").parse_program().optimize_and_link()
+    image = prog.create_memory_image()
+    assert image.runs == [(0, 2), (10, 12), (20, 21)]
+
+def test_memory_image_growth():
+    image = MemoryImage(4)
+    image.seek(4)
+    image.add(0x1234)
+    assert len(image._words) == 8 # Doubled once, one word per slot
+    image.seek(100)
+    image.add(0x5678)
+    assert len(image._words) == 128
+    assert image.size == 101
+    assert image.words[4] == 0x1234 and image.words[100] == 0x5678
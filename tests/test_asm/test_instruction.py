@@ -13,31 +13,31 @@ class MockMachineCodeListener(MachineCodeListener):
 def test_constant_ldss():
     mc = MockMachineCodeListener()
     # Valid short constant (0-15)
-    InstructionBuilder(Opcode.LDSs).set_dest(Register.R0).set_constant_int(15).build().create_machine_code(Context(), mc)
+    InstructionBuilder(Opcode.LDSs).set_dest(Register.R0).set_constant_int(15).build().create_machine_code(Context(), mc.add)
     assert len(mc.code) == 1
 
     mc = MockMachineCodeListener()
     with pytest.raises(ExpressionException, match="short constant too large"):
-        InstructionBuilder(Opcode.LDSs).set_dest(Register.R0).set_constant_int(16).build().create_machine_code(Context(), mc)
+        InstructionBuilder(Opcode.LDSs).set_dest(Register.R0).set_constant_int(16).build().create_machine_code(Context(), mc.add)
 
     mc = MockMachineCodeListener()
     with pytest.raises(ExpressionException, match="short constant too large"):
          # Negative numbers are invalid for unsigned short constants
-        InstructionBuilder(Opcode.LDSs).set_dest(Register.R0).set_constant_int(-1).build().create_machine_code(Context(), mc)
+        InstructionBuilder(Opcode.LDSs).set_dest(Register.R0).set_constant_int(-1).build().create_machine_code(Context(), mc.add)
 
 def test_constant_stss():
     mc = MockMachineCodeListener()
     # Valid short constant (0-15) for address
-    InstructionBuilder(Opcode.STSs).set_source(Register.R0).set_constant_int(15).build().create_machine_code(Context(), mc)
+    InstructionBuilder(Opcode.STSs).set_source(Register.R0).set_constant_int(15).build().create_machine_code(Context(), mc.add)
     assert len(mc.code) == 1
 
     mc = MockMachineCodeListener()
     with pytest.raises(ExpressionException, match="short constant too large"):
-        InstructionBuilder(Opcode.STSs).set_source(Register.R0).set_constant_int(16).build().create_machine_code(Context(), mc)
+        InstructionBuilder(Opcode.STSs).set_source(Register.R0).set_constant_int(16).build().create_machine_code(Context(), mc.add)
 
     mc = MockMachineCodeListener()
     with pytest.raises(ExpressionException, match="short constant too large"):
-        InstructionBuilder(Opcode.STSs).set_source(Register.R0).set_constant_int(-1).build().create_machine_code(Context(), mc)
+        InstructionBuilder(Opcode.STSs).set_source(Register.R0).set_constant_int(-1).build().create_machine_code(Context(), mc.add)
 
 def test_jmps_branch_range():
     mc = MockMachineCodeListener()
@@ -45,16 +45,62 @@ def test_jmps_branch_range():
 
     # Target = Addr + 1 + Offset => Offset = Target - Addr - 1
     # Max positive offset: 127 => Target = 1000 + 1 + 127 = 1128
-    InstructionBuilder(Opcode.JMPs).set_constant(Constant(1128)).build().create_machine_code(ctx, mc)
+    InstructionBuilder(Opcode.JMPs).set_constant(Constant(1128)).build().create_machine_code(ctx, mc.add)
     mc = MockMachineCodeListener()
     with pytest.raises(ExpressionException, match="branch target out of range"):
         # Offset 128
-        InstructionBuilder(Opcode.JMPs).set_constant(Constant(1129)).build().create_machine_code(ctx, mc)
+        InstructionBuilder(Opcode.JMPs).set_constant(Constant(1129)).build().create_machine_code(ctx, mc.add)
 
     mc = MockMachineCodeListener()
     # Min negative offset: -128 => Target = 1000 + 1 - 128 = 873
-    InstructionBuilder(Opcode.JMPs).set_constant(Constant(873)).build().create_machine_code(ctx, mc)
+    InstructionBuilder(Opcode.JMPs).set_constant(Constant(873)).build().create_machine_code(ctx, mc.add)
     mc = MockMachineCodeListener()
     with pytest.raises(ExpressionException, match="branch target out of range"):
         # Offset -129
-        InstructionBuilder(Opcode.JMPs).set_constant(Constant(872)).build().create_machine_code(ctx, mc)
+        InstructionBuilder(Opcode.JMPs).set_constant(Constant(872)).build().create_machine_code(ctx, mc.add)
+
+def test_size_follows_opcode_change():
+    instr = InstructionBuilder(Opcode.LDI).set_dest(Register.R1).set_constant_int(5).build()
+    assert instr.size == 2
+    instr.opcode = Opcode.LDIs
+    assert instr.size == 1
+    mc = MockMachineCodeListener()
+    instr.create_machine_code(Context(), mc.add)
+    assert mc.code == [(Opcode.LDIs.value << 8) | (1 << 4) | 5]
+
+def test_data_instruction_str():
+    from assembler.asm import DataInstruction
+    assert str(DataInstruction(65, 1, None)) == ".data 'A', 65"
+    assert str(DataInstruction(10, 1, None)) == ".data '\\n', 10"
+    assert str(DataInstruction(0, 1, None)) == ".data '\\0', 0"
+    assert str(DataInstruction(200, 1, None)) == ".data '#200', 200"
+
+def test_constant_value_follows_context_changes():
+    from assembler.expression import Identifier
+    instr = InstructionBuilder(Opcode.JMP).set_constant(Identifier("target")).build()
+    ctx = Context().add_identifier("target", 5)
+    assert instr.get_constant_value(ctx) == 5
+    ctx.set_identifier("target", 7)
+    assert instr.get_constant_value(ctx) == 7
+    # A fresh context must never reuse a value evaluated in another one
+    assert instr.get_constant_value(Context().add_identifier("target", 9)) == 9
+
+def test_built_instructions_are_independent():
+    a = InstructionBuilder(Opcode.LDI).set_dest(Register.R0).set_constant_int(5).build()
+    b = InstructionBuilder(Opcode.LDI).set_dest(Register.R0).set_constant_int(5).build()
+    assert a is not b
+    a.label = "start"
+    a.opcode = Opcode.LDIs
+    assert b.label is None
+    assert b.opcode == Opcode.LDI and b.size == 2
+    # A character constant keeps its own representation
+    c = InstructionBuilder(Opcode.LDI).set_dest(Register.R0).set_constant(Constant('A')).build()
+    d = InstructionBuilder(Opcode.LDI).set_dest(Register.R0).set_constant_int(65).build()
+    assert str(c.constant) == "'A'" and str(d.constant) == "65"
+
+def test_register_parse_str():
+    assert Register.parse_str("r0") is Register.R0
+    assert Register.parse_str("SP") is Register.SP
+    assert Register.parse_str("Ra") is Register.RA
+    assert Register.parse_str("r16") is None
+    assert Register.parse_str("loop") is None
@@ -1,5 +1,6 @@
 import pytest
 import io
+import dataclasses
 from assembler.asm import Opcode, SrcToBus, ALUToBus, ReadRam, ReadIO, StorePC, EnRegWrite, WriteIO, WriteRam, ALUBSel
 
 def check_const_access(op: Opcode):
@@ -81,3 +82,57 @@ def test_hex_output():
     assert out.getvalue().strip() == expected_hex.strip()
 
 # ... Add test_optimizer_jmp.py, test_optimizer_short.py similarly ...
+
+def test_stateless_arguments_are_singletons():
+    from assembler.asm.mnemonic_arguments import Nothing, Source, Dest, Const, MNEMONIC_ARG_LOOKUP
+    assert Source() is Source()
+    assert Dest() is not Source()
+    assert MNEMONIC_ARG_LOOKUP['DEST_SOURCE'].before is MNEMONIC_ARG_LOOKUP['DEST']
+    assert MNEMONIC_ARG_LOOKUP['CONST_SOURCE'].before is Const()
+    assert Nothing().has_const is False and Const().has_const is True
+
+def test_encoding_selectors_are_ints():
+    assert Opcode.LDI.alu_b_sel == 2
+    assert Opcode.LDI.imm_ext_mode == 2
+    assert Opcode.LDI.create_control_word() & 0x7 == Opcode.LDI.alu_b_sel
+
+def test_control_word_table_matches_builder():
+    for oc in Opcode:
+        assert oc.create_control_word() == oc.create_control_word(True)
+
+def test_control_signal_widths_fit_members():
+    for field in dataclasses.fields(Opcode.NOP.flags):
+        enum_type = field.type
+        assert len(enum_type) <= 1 << enum_type._BITS < 2 * len(enum_type)
+
+def test_opcodes_are_dense():
+    assert [op.value for op in Opcode] == list(range(len(Opcode)))
+    assert Opcode.parse_str("_raw_value") is None
+
+def test_parse_str():
+    assert Opcode.parse_str("ldi") is Opcode.LDI
+    assert Opcode.parse_str("Jmp") is Opcode.JMP
+    assert Opcode.parse_str("ldis") is None
+    assert Opcode.parse_str("LDIs") is None
+    assert Opcode.parse_str("LDI") is Opcode.LDI
+    assert Opcode.parse_str("loop") is None
+
+def test_description_const_limit():
+    assert Opcode.LDIs.description.endswith("(0<=[const]<=15)")
+    assert Opcode.JMPs.description.endswith("(-128<=[const]<=127)")
+    assert Opcode.LDI.description == "Loads Register Rd with the constant value [const]."
+
+def test_flags_equality():
+    from assembler.asm import Flags, ALUCmd
+    assert Flags(alu_cmd=ALUCmd.ADD) == Flags(alu_cmd=ALUCmd.ADD)
+    assert Flags(alu_cmd=ALUCmd.ADD) != Flags(alu_cmd=ALUCmd.SUB)
+    assert len({Flags(), Flags(), Opcode.NOP.flags}) == 1
+    assert Opcode.ADD.flags.control_word == Opcode.ADD.create_control_word()
+
+def test_from_value():
+    for oc in Opcode:
+        assert Opcode.from_value(oc.value) is oc
+    with pytest.raises(ValueError):
+        Opcode.from_value(len(Opcode))
+    with pytest.raises(ValueError):
+        Opcode.from_value(-1)
@@ -58,3 +58,72 @@ def test_to_string():
     assert str(parse_expr("~1")) == "~1"
     assert str(parse_expr("-(1+2)")) == "-(1+2)"
 
+
+def test_try_get_value():
+    c = Context().add_identifier("a", 3)
+    assert parse_expr("a+1").try_get_value(c) == 4
+    assert parse_expr("b+1").try_get_value(c) is None
+    assert Identifier("b").try_get_value(None) is None
+    assert Constant(5).try_get_value(None) == 5
+    assert parse_expr("-~b").try_get_value(c) is None
+    assert parse_expr("-~a").try_get_value(c) == 4
+    assert parse_expr("a/(a-3)").try_get_value(c) is None
+
+def test_identifier_in_several_contexts():
+    a = Context().add_identifier("Label", 1)
+    b = Context().add_identifier("label", 2)
+    ident = Identifier("LABEL")
+    assert ident.get_value(a) == 1
+    assert ident.get_value(b) == 2
+    with pytest.raises(ExpressionException):
+        ident.get_value(Context())
+
+def test_instr_addrs():
+    c = Context().set_instr_addrs(4, 5, 7, 8)
+    assert c.instr_addr == 4
+    assert parse_expr("_ADDR_+_NEXT_ADDR_+_SKIP_ADDR_+_SKIP2_ADDR_").get_value(c) == 24
+
+def test_compile():
+    c = Context().add_identifier("a", 6)
+    for code in ["1+2*3", "-(a-1)", "~a", "a/4|8", "0x10^a&3"]:
+        expr = parse_expr(code)
+        assert expr.compile()(c) == expr.get_value(c)
+    with pytest.raises(ExpressionException):
+        parse_expr("b+1").compile()(c)
+
+def test_set_slot():
+    c = Context()
+    c.set_slot(c.slot_of("Loop"), 12)
+    assert parse_expr("LOOP+1").get_value(c) == 13
+
+def test_slot_of_spellings():
+    c = Context()
+    slot = c.slot_of("MixedCase_Slot")
+    assert c.slot_of("mixedcase_slot") == slot
+    assert c.slot_of("MIXEDCASE_SLOT") == slot
+    assert c.slot_of("MixedCase_Slot") == slot
+    c.add_identifier("mixedCASE_slot", 3)
+    assert c.lookup_slot(slot) == 3
+
+def test_slots_per_context():
+    # Every context has its own name table, an identifier resolves its slot per table
+    alpha = Identifier("alpha")
+    assert alpha.try_get_value(Context().add_identifier("beta", 42)) is None
+    c1 = Context().add_identifier("beta", 1).add_identifier("alpha", 2)
+    c2 = Context().add_identifier("alpha", 3)
+    evaluate = alpha.compile()
+    assert [evaluate(c1), evaluate(c2), alpha.get_value(c1)] == [2, 3, 2]
+    assert len(Context()._names) == 4 # Only the special identifiers
+
+def test_fold_negative_constant():
+    expr = parse_expr("-5")
+    assert type(expr) is Constant and expr.get_value(None) == -5
+    for code in ["-5", "--5", "-0", "-'a'", "~255", "-(2*3)"]:
+        assert str(parse_expr(code)) == code
+    assert parse_expr("-(2*3)+~1").compile()(None) == -8
+
+def test_operator_precedence_and_associativity():
+    assert str(parse_expr("1 or 2 xor 3 and 4+5*6-7/8")) == "1|(2^(3&((4+(5*6))-(7/8))))"
+    assert str(parse_expr("8-4-2")) == "(8-4)-2"
+    assert parse_expr("8-4-2").get_value(None) == 2
+    assert parse_expr("(1 or 2) and 3").get_value(None) == 3
@@ -2,6 +2,7 @@ import pytest
 import io
 from assembler.parser import Parser
 from assembler.asm import Program, Opcode, Register, Instruction
+from assembler.asm.instruction_visitor import InstructionVisitor
 
 def parse_macro_prog(code: str) -> Program:
      # Don't link, just parse to check expansion
@@ -19,6 +20,24 @@ def test_call():
     assert prog.get_instruction(3).opcode == Opcode.JMP
     assert str(prog.get_instruction(3).constant) == "target"
 
+def test_call_return_addresses():
+    prog = Parser("call f\ncall f\nf: brk").parse_program().optimize_and_link()
+    assert prog.get_instruction(1).constant is prog.get_instruction(5).constant # Shared by the prototype
+
+    class ReturnAddresses(InstructionVisitor):
+        def __init__(self):
+            self.found = []
+        def visit(self, instr, context):
+            if instr.opcode == Opcode.JMPs:
+                self.found.append(context.instr_addr + 1)
+            elif instr.opcode in (Opcode.LDI, Opcode.LDIs):
+                self.found.append(instr.get_constant_value(context))
+            return True
+    visitor = ReturnAddresses()
+    prog.traverse(visitor)
+    assert visitor.found[0] == visitor.found[1]
+    assert visitor.found[2] == visitor.found[3]
+
 def test_dec():
     prog = parse_macro_prog("dec r0")
     assert prog.instruction_count == 1
@@ -81,8 +100,24 @@ def test_ret_const():
     assert prog.get_instruction(0).opcode == Opcode.LD
     assert prog.get_instruction(1).opcode == Opcode.ADDI # Uses long ADDI
     assert prog.get_instruction(1).constant.get_value(None) == 4
+    assert str(prog.get_instruction(1).constant) == "4" # Folded
     assert prog.get_instruction(2).opcode == Opcode.RRET
 
+def test_ret_const_symbolic():
+    prog = parse_macro_prog("ret n")
+    assert str(prog.get_instruction(1).constant) == "n+1"
+
+def test_ret_zero():
+    prog = parse_macro_prog("ret 0")
+    assert [prog.get_instruction(i).opcode for i in range(3)] == [Opcode.LD, Opcode.ADDIs, Opcode.RRET]
+
+def test_ret_end_of_line():
+    prog = parse_macro_prog("ret\nnop") # The next line is no const
+    assert [prog.get_instruction(i).opcode for i in range(4)] == [Opcode.LD, Opcode.ADDIs, Opcode.RRET, Opcode.NOP]
+    prog = parse_macro_prog("ret ; comment")
+    assert prog.instruction_count == 3
+    assert prog.get_instruction(2).comment == "; comment"
+
 def test_scall():
     prog = parse_macro_prog("_scall target") # PUSH RA (2) + RCALL + POP RA (2)
     assert prog.instruction_count == 5
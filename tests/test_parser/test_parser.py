@@ -1,6 +1,6 @@
 import pytest
 import io
-from assembler.parser import Parser, ParserException
+from assembler.parser import Parser, ParserException, read_source
 from assembler.asm import Program, Opcode, Register, Instruction, InstructionInterface
 from assembler.expression import Context, ExpressionException, Constant, Identifier, Operate, Operation
 
@@ -89,6 +89,46 @@ def test_macro_inc():
     assert instr.constant.get_value(None) == 1
     assert instr.macro_description == "INC R5"
 
+def test_macro_sp_adjust_merged():
+    prog = Parser("ENTERI\nPUSH R1\nPOP R1\nLEAVEI\na: PUSH R2",
+                  existing_program=Program(merge_sp_adjust=True)).parse_program()
+    ops = [prog.get_instruction(i).opcode for i in range(prog.instruction_count)]
+    assert ops == [Opcode.STD, Opcode.IN, Opcode.STD, Opcode.SUBIs, Opcode.ST,
+                   Opcode.LD, Opcode.ADDIs, Opcode.LDD, Opcode.OUT, Opcode.LDD,
+                   Opcode.SUBIs, Opcode.ST] # A label prevents merging
+    assert prog.get_instruction(3).constant.get_value(None) == 3
+    assert prog.get_instruction(4).macro_description == "PUSH R1"
+    assert prog.get_instruction(6).constant.get_value(None) == 3
+    assert prog.get_instruction(10).label == "a"
+
+def test_macro_sp_adjust_cancelled():
+    prog = Parser("ENTERI\nLEAVEI", existing_program=Program(merge_sp_adjust=True)).parse_program()
+    ops = [prog.get_instruction(i).opcode for i in range(prog.instruction_count)]
+    assert ops == [Opcode.STD, Opcode.IN, Opcode.STD, Opcode.LDD, Opcode.OUT, Opcode.LDD]
+    assert prog.get_instruction(3).macro_description == "LEAVEI"
+
+def test_macro_sp_adjust_not_merged_by_default():
+    prog = Parser("ENTERI\nLEAVEI").parse_program()
+    ops = [prog.get_instruction(i).opcode for i in range(prog.instruction_count)]
+    assert ops == [Opcode.STD, Opcode.IN, Opcode.STD, Opcode.SUBIs,
+                   Opcode.ADDIs, Opcode.LDD, Opcode.OUT, Opcode.LDD]
+
+def test_macro_sp_adjust_label_offset():
+    # f+2 must still land on the first instruction of PUSH R2, nothing is merged away
+    prog = Parser("f: POP R1\nPUSH R2\nBRK\njmp f+2").parse_program().optimize_and_link()
+    ops = [prog.get_instruction(i).opcode for i in range(prog.instruction_count)]
+    assert ops == [Opcode.LD, Opcode.ADDIs, Opcode.SUBIs, Opcode.ST, Opcode.BRK, Opcode.JMPs]
+    assert prog.get_instruction(5).constant.get_value(prog.context) == 2
+    assert prog.get_line_by_addr(2) == 2 # SUBIs of PUSH R2
+
+def test_macro_push_instructions_independent():
+    prog = Parser("a: PUSH R1\nb: PUSH R1").parse_program()
+    assert prog.instruction_count == 4
+    first, second = prog.get_instruction(0), prog.get_instruction(2)
+    assert first is not second
+    assert (first.label, second.label) == ("a", "b")
+    assert first.macro_description == second.macro_description == "PUSH R1"
+
 def test_directive_word():
     prog = Parser(".word A\n.word b").parse_program()
     ctx = prog.context
@@ -131,6 +171,31 @@ def test_self_jmp_optimize():
      assert instr.opcode == Opcode.JMPs
      assert instr.constant.get_value(prog.context) == 0
 
+def test_forward_jmp_optimize():
+     # Forward references are only known after the first linking pass
+     prog = Parser("jmp end\nldi r0,end\nend: nop").parse_program().optimize_and_link()
+     assert prog.get_instruction(0).opcode == Opcode.JMPs
+     assert prog.get_instruction(1).opcode == Opcode.LDIs
+     assert prog.context.get("end") == 2
+
+def test_shortened_constant_leaves_range():
+     # end - 28 fits at first, but drops below 0 when the instructions in between shrink
+     code = "ldi r2, 1\nldi r0, end - 28\n" + "ldi r1, b - a\n" * 20 + "end: nop\na: nop\nb: nop\n"
+     prog = Parser(code).parse_program().optimize_and_link()
+     assert prog.get_instruction(1).opcode == Opcode.LDI
+     assert prog.get_instruction(2).opcode == Opcode.LDIs
+     assert prog.context.get("end") == 23
+     prog.create_memory_image() # Encodes every constant
+
+def test_backward_label_constant_after_jmp_shrink():
+     # l1 - 9 fits when l1 is first seen, but drops below 0 once the jumps before it shrink
+     code = ("jmp l2\nnop\njmp l0\nl0: nop\nnop\nldi r1, l3 - 29\njmp l1\n"
+             "l1: nop\nnop\nnop\nldi r5, l1 - 9\nl2: nop\nl3: nop\n")
+     prog = Parser(code).parse_program().optimize_and_link()
+     assert prog.context.get("l1") == 8
+     assert prog.get_instruction(10).opcode == Opcode.LDI
+     prog.create_memory_image() # Encodes every constant
+
 def test_data_addr_harvard():
      prog = Parser(".data test \"Test\",0\n.data test2 \"Test\",0\njmp _ADDR_").parse_program()
      # In Harvard mode, .data allocates RAM and generates load code.
@@ -164,3 +229,81 @@ def test_address_plus_minus():
     assert prog.get_instruction(0).constant.get_value(None) == -5
 
 # ... Add more tests for directives, macros, error cases ...
+
+def test_jmp_optimize_after_shrink():
+     # The jump only fits once the LDIs in between have been shortened
+     code = "jmp end\n" + "ldi r0,1\n" * 100 + "end: nop"
+     prog = Parser(code).parse_program().optimize_and_link()
+     assert prog.get_instruction(0).opcode == Opcode.JMPs
+     assert prog.context.get("end") == 101
+
+def test_line_by_addr():
+    prog = Parser("NOP\nLDI R0,0x1234\n.org 10\nBRK").parse_program().optimize_and_link()
+    assert [prog.get_line_by_addr(a) for a in (0, 1, 2, 3, 10)] == [1, 2, -1, -1, 4]
+
+
+def test_write_addr_list(tmp_path):
+    prog = Parser("NOP\nLDI R0,0x1234").parse_program().optimize_and_link()
+    out = tmp_path / "prog.map"
+    prog.write_addr_list(str(out))
+    assert out.read_text() == '[\n  {"addr":0,"line":1},\n  {"addr":1,"line":2}\n]\n'
+    with pytest.raises(OSError):
+        prog.write_addr_list(str(tmp_path)) # A directory, the error reaches the caller
+def test_tokenize_numbers():
+    from assembler.parser.parser import tokenize, TokenType
+    tokens = tokenize("ldi r0, 0x1f+0b101-12")
+    assert [t.number for t in tokens if t.type in (TokenType.HEX, TokenType.BIN, TokenType.DEC)] == [31, 5, 12]
+    assert tokens[0].number is None
+
+def test_tokenize_interns_words():
+    from assembler.parser.parser import tokenize
+    tokens = tokenize("ldi r0, name\nldi r1, " + "".join(["na", "me"]))
+    assert tokens[3].value is tokens[7].value # Both 'name'
+    assert tokens[0].value is tokens[4].value # Both 'ldi'
+
+def test_tokenize_block_comments():
+    from assembler.parser.parser import tokenize, TokenType
+    tokens = tokenize("/* a * b\n ** c */ nop /**/ /* x */*/")
+    assert [(t.type, t.value) for t in tokens[:-1]] == [
+        (TokenType.COMMENT, "/* a * b\n ** c */"), (TokenType.WORD, "nop"),
+        (TokenType.COMMENT, "/**/"), (TokenType.COMMENT, "/* x */"),
+        (TokenType.OP, "*"), (TokenType.OP, "/")]
+
+def test_tokenize_lines():
+    from assembler.parser.parser import tokenize
+    tokens = tokenize("nop\r\n  /* a\n b */ ldi r0, 1 \n\n\tret \n ")
+    assert [(t.value, t.line, t.column) for t in tokens] == [
+        ("nop", 1, 0), ("/* a\n b */", 2, 2), ("ldi", 3, 6), ("r0", 3, 10),
+        (",", 3, 12), ("1", 3, 14), ("ret", 5, 1), ("", 6, 0)]
+
+def test_include_twice(tmp_path):
+    import os
+    inc = tmp_path / "inc.asm"
+    inc.write_text("ldi r0, 1\n")
+    main = tmp_path / "main.asm"
+    main.write_text('.include "inc.asm"\n.include "inc.asm"\n')
+    cache = {} # Shared like by the parsers of one assembly run
+    def parse_regs():
+        prog = Parser(main.read_text(), base_file=str(main), include_tokens=cache).parse_program()
+        return [prog.get_instruction(i).dest_reg for i in range(prog.instruction_count)]
+    assert parse_regs() == [Register.R0, Register.R0]
+    assert len(cache) == 1
+    # A changed include file is read again, even with the same modification time
+    mtime = os.stat(inc).st_mtime_ns
+    inc.write_text("ldi r10, 2\n")
+    os.utime(inc, ns=(mtime, mtime))
+    assert parse_regs() == [Register.R10, Register.R10]
+    # Without a shared cache every top level parser starts empty
+    assert Parser("").include_tokens == {}
+
+def test_read_source(tmp_path):
+    src = tmp_path / "crlf.asm"
+    src.write_bytes(b"nop\r\nnop\rnop\n")
+    assert read_source(str(src)) == "nop\nnop\nnop\n"
+
+def test_data_comment():
+    prog = Parser('.dorg 0x100\n.data d 1, "a"\nnop').parse_program()
+    assert prog.get_instruction(prog.instruction_count - 1).comment == '.dorg\n0x100\n.data\nd\n1\n,\n"a"'
+
+def test_escape_text():
+    assert Parser("")._escape_text('a"\\\n\r\t\x01\xe9Ā') == 'a\\"\\\\\\n\\r\\t\\x01\\xe9\\x100'
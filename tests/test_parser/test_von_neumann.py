@@ -80,8 +80,10 @@ def test_von_neumann_data():
 def test_von_neumann_word_error():
     # Cannot use .word after .dorg
     code = ".dorg 0x10\n.word test"
-    with pytest.raises(ExpressionException, match="Cannot use .word/.long/.words in Von Neumann mode"):
+    with pytest.raises(ExpressionException) as ei:
          get_hex(code)
+    # Plain substring check, the dots are literal and not regex wildcards
+    assert "Cannot use .word/.long/.words in Von Neumann mode" in str(ei.value)
 
 def test_von_neumann_dorg_after_data_error():
      # Cannot use .dorg after data defined in Harvard mode